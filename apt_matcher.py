@@ -0,0 +1,236 @@
+"""
+아파트 단지명 추출기.
+브랜드·접미어 사전(아파트, 단지, 래미안, 자이, 푸르지오 …)을 Aho–Corasick 자동자로 컴파일해
+제목/본문을 한 번만 훑으며 단지명 후보와 위치(span)를 찾는다.
+pyahocorasick이 설치돼 있으면 그것을, 없으면 순수 파이썬 자동자를 쓴다.
+
+후보는 사전 단어가 들어 있는 단어 덩어리(공백·기호로 나뉜 \\w 연속 구간) 전체다.
+단어마다 덩어리 안 최소 시작 위치(min_offset)가 있어, 접미어형 단어(APT_KEYWORDS)와 짧은 브랜드는
+앞에 한 글자 이상 붙어 있어야 하고 ('아파트' 단독, '현대화'의 '현대'는 제외),
+apt_mapping.csv 단지명에서 뽑은 세 글자 이상 브랜드(mapping_keywords)는 덩어리 맨 앞에서도 된다.
+extract_many / candidates_many는 열 전체를 한 문자열로 이어 자동자를 한 번만 돌린다.
+
+extract_apt_name(크롤링 결과용)은 기본 사전만 쓰며 기존 정규식 추출기
+    ([\\w가-힣]+(?:아파트|단지|…|포레나)[\\w가-힣]*), ([\\w가-힣]+\\d+단지)
+와 결과가 같다 (두 번째 패턴이 잡는 것은 모두 첫 번째 패턴이 먼저 잡는다).
+"""
+import bisect
+import csv
+import re
+from collections import Counter
+from pathlib import Path
+
+try:
+    import ahocorasick  # 선택 의존성 (pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+APT_MAPPING_CSV = OUTPUT_DIR / "apt_mapping.csv"
+
+APT_KEYWORDS = [
+    "아파트", "단지", "맨션", "빌라", "타운", "파크", "힐스", "캐슬", "자이", "래미안",
+    "e편한세상", "푸르지오", "더샵", "롯데캐슬", "코아루", "한신더휴", "포레나",
+]
+MIN_BRAND_COMPLEXES = 2  # 이만큼 여러 단지 이름에 나온 단어만 브랜드로 사전에 넣는다
+MIN_BRAND_LENGTH = 2
+MIN_LEADING_LENGTH = 3   # 이보다 짧은 브랜드(현대, 우성 …)는 덩어리 맨 앞에서는 잡지 않는다
+# 여러 단지 이름에 나오지만 브랜드가 아닌 말
+GENERIC_TOKENS = {
+    "주공", "주구", "한국", "하나", "마을", "타운", "주택", "임대", "시범", "신동", "선수촌", "BL", "블록",
+}
+
+WORD_RE = re.compile(r"\w+")
+NAME_NOISE_RE = re.compile(r"아파트|\d+(?:,\d+)*(?:차|단지)?|[^\w]")
+PLACE_SUFFIX_RE = re.compile(r"(?:동\d*가|광역시|특별시|동|리|구|군|읍|면|시)$")
+
+
+# ── 자동자 ──
+
+class PyAutomaton:
+    """순수 파이썬 Aho–Corasick. iter(text)는 (끝 인덱스, 값)을 pyahocorasick과 같은 순서로 낸다."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add_word(self, word: str, value):
+        node = 0
+        for ch in word:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node] = [value]  # 같은 단어를 다시 넣으면 값을 바꾼다 (pyahocorasick과 동일)
+
+    def make_automaton(self):
+        # 너비 우선으로 실패 링크를 잇고, 실패 노드의 출력을 물려받는다
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+                queue.append(child)
+
+    def iter(self, text: str):
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for value in out[node]:
+                yield i, value
+
+
+# ── 사전 ──
+
+def place_names(rows: list[dict]) -> set[str]:
+    """apt_mapping.csv의 시도/시군구/동리 이름과 행정 접미어를 뗀 어간 (부평구 → 부평)."""
+    names = set()
+    for row in rows:
+        for col in ("시도", "시군구", "동리"):
+            name = (row.get(col) or "").strip()
+            if name:
+                names.update((name, PLACE_SUFFIX_RE.sub("", name)))
+    names.discard("")
+    return names
+
+
+def mapping_keywords(path: Path = APT_MAPPING_CSV, min_complexes: int = MIN_BRAND_COMPLEXES) -> list[str]:
+    """apt_mapping.csv 단지명에서 여러 단지에 공통으로 나오는 브랜드 단어 (금호어울림, 힐스테이트 …).
+    지명 어간으로 시작하는 단어는 어간을 뗀 나머지도 센다 (검단힐스테이트 → 힐스테이트).
+    지명, 상투어(GENERIC_TOKENS), MIN_BRAND_LENGTH보다 짧은 단어는 뺀다."""
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    places = place_names(rows)
+    stems = sorted((p for p in places if len(p) >= 2 and not PLACE_SUFFIX_RE.search(p)), key=len, reverse=True)
+    counts = Counter()
+    for row in rows:
+        words = set()
+        for w in row.get("단지명", "").split():
+            w = NAME_NOISE_RE.sub("", w)
+            words.add(w)
+            stem = next((p for p in stems if w.startswith(p)), None)
+            if stem:
+                words.add(w[len(stem):])
+        counts.update(w for w in words if len(w) >= MIN_BRAND_LENGTH)
+    return sorted(
+        w for w, n in counts.items()
+        if n >= min_complexes and w not in places and w not in GENERIC_TOKENS and w not in APT_KEYWORDS
+    )
+
+
+# ── 추출기 ──
+
+class AptMatcher:
+    """사전 단어 → 단어 덩어리 안에서의 최소 시작 위치를 담은 자동자.
+    keywords는 앞에 min_offset 글자 이상이 필요한 접미어형, brands는 MIN_LEADING_LENGTH 이상이면 위치 제한이 없는 단어."""
+
+    def __init__(self, keywords: list[str] = APT_KEYWORDS, brands: list[str] = (), min_offset: int = 1):
+        self.automaton = ahocorasick.Automaton() if ahocorasick else PyAutomaton()
+        for word in brands:
+            self.automaton.add_word(word, (word, 0 if len(word) >= MIN_LEADING_LENGTH else min_offset))
+        for word in keywords:
+            self.automaton.add_word(word, (word, min_offset))  # 같은 단어가 양쪽에 있으면 접미어 규칙이 우선
+        self.automaton.make_automaton()
+
+    def candidates(self, text: str) -> list[tuple[int, int, str]]:
+        """단지명 후보 (시작, 끝, 이름) 목록. 텍스트 순서대로, 덩어리마다 한 번."""
+        if not text:
+            return []
+        hits = []  # (단어 시작 위치, 최소 오프셋)
+        for end, (word, min_offset) in self.automaton.iter(text):
+            hits.append((end - len(word) + 1, min_offset))
+        if not hits:
+            return []
+        found = []
+        hits.sort()
+        h = 0
+        for m in WORD_RE.finditer(text):
+            start, end = m.span()
+            while h < len(hits) and hits[h][0] < start:
+                h += 1
+            i = h
+            while i < len(hits) and hits[i][0] < end:
+                if hits[i][0] - start >= hits[i][1]:
+                    found.append((start, end, m.group()))
+                    break
+                i += 1
+            h = i
+            if h >= len(hits):
+                break
+        return found
+
+    def first(self, text: str) -> str | None:
+        found = self.candidates(text)
+        return found[0][2] if found else None
+
+    def extract(self, title: str, content_text: str = "") -> str:
+        """제목에서, 없으면 본문에서 첫 후보. 둘 다 없으면 제목 그대로."""
+        return self.first(title) or self.first(content_text) or title
+
+    def candidates_many(self, texts) -> list[list[tuple[int, int, str]]]:
+        """여러 텍스트(리스트나 pandas 열)의 후보를 한꺼번에. span은 각 텍스트 기준.
+        줄바꿈으로 이어 붙인 한 문자열을 자동자로 한 번 훑고, 후보를 시작 위치로 원래 텍스트에 나눠 준다
+        (줄바꿈은 \\w가 아니므로 후보가 두 텍스트에 걸치지 않는다)."""
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        starts, pos = [], 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t) + 1
+        found: list[list[tuple[int, int, str]]] = [[] for _ in texts]
+        for start, end, name in self.candidates("\n".join(texts)):
+            i = bisect.bisect_right(starts, start) - 1
+            found[i].append((start - starts[i], end - starts[i], name))
+        return found
+
+    def extract_many(self, titles, contents=None, default: str | None = None) -> list[str]:
+        """여러 게시글을 한꺼번에 (all_metadata.csv 제목 열 등). extract와 같은 규칙이고,
+        default를 주면 후보가 없는 행은 제목 대신 default."""
+        titles = [t if isinstance(t, str) else "" for t in titles]
+        names = [found[0][2] if found else None for found in self.candidates_many(titles)]
+        missing = [i for i, name in enumerate(names) if name is None]
+        if contents is not None and missing:
+            contents = list(contents)
+            for i, found in zip(missing, self.candidates_many(contents[i] for i in missing)):
+                if found:
+                    names[i] = found[0][2]
+        return [name if name is not None else (titles[i] if default is None else default)
+                for i, name in enumerate(names)]
+
+
+# ── 기본 추출기 ──
+
+_default = None
+_extended = None
+
+
+def default_matcher() -> AptMatcher:
+    """기존 정규식과 같은 사전만 쓰는 추출기 (크롤링 결과 apt_name용, 자동자는 처음 쓸 때 한 번만 만든다)."""
+    global _default
+    if _default is None:
+        _default = AptMatcher()
+    return _default
+
+
+def extended_matcher() -> AptMatcher:
+    """apt_mapping.csv 브랜드 단어까지 넣은 추출기 (단지 매칭·파싱 결과 단지명용)."""
+    global _extended
+    if _extended is None:
+        _extended = AptMatcher(brands=mapping_keywords())
+    return _extended
+
+
+def extract_apt_name(title: str, content_text: str = "") -> str:
+    return default_matcher().extract(title, content_text)
@@ -0,0 +1,450 @@
+"""
+파서 벤치마크.
+재현 가능한 합성 문서 묶음(XLSX, 표/텍스트 PDF, DOCX, PPTX, PrvText가 든 HWP,
+이미지, ZIP)을 만들고, 형식별 parsers.parse_* 함수를 직접 호출해
+실행 시간(wall / CPU)과 메모리 최고치(tracemalloc), 추출 행·열 수를 잰다.
+parse_file은 예외를 출력만 하고 삼키므로, 벤치마크에서는 파서를 직접 불러 예외를 그대로 기록한다.
+ZIP처럼 등록된 파서가 없는 첨부는 parse_file로 재서 형식 판별(sniff)과 건너뛰기 비용을 추적한다.
+
+    py -3 main.py bench                              # small 규모
+    py -3 main.py bench --scale medium --repeat 5
+    py -3 main.py bench --compare output/bench/bench_small_20250101_120000.json
+"""
+import contextlib
+import io
+import json
+import math
+import random
+import statistics
+import struct
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import parsers
+from formats import OLE_MAGIC
+
+BENCH_DIR = Path(__file__).parent / "output" / "bench"
+CORPUS_DIR = BENCH_DIR / "corpus"
+SEED = 20240101
+
+SCALES = {"small": 1, "medium": 5, "large": 25}  # 규모별 행/쪽 수 배수
+REPEAT = 3
+
+ITEMS = ["승강기 교체", "옥상 방수", "외벽 도장", "급수펌프 교체", "보도블럭 보수",
+         "소방설비 교체", "CCTV 교체", "배관 교체", "지하주차장 도장", "놀이터 보수"]
+METHODS = ["전면교체", "부분수리", "전면도장", "부분보수"]
+
+
+# ── 합성 문서 생성 ──
+
+def cost_rows(rng: random.Random, n: int) -> list[list[str]]:
+    """장기수선계획서 비용표와 비슷한 행 (헤더 + n행)."""
+    years = [str(y) for y in range(2025, 2031)]
+    rows = [["구분", "공사종별", "수선방법", "수선주기(년)"] + years]
+    for i in range(n):
+        cells = [f"{i // 10 + 1}", rng.choice(ITEMS), rng.choice(METHODS), str(rng.choice([5, 10, 15, 20, 25]))]
+        cells += [f"{rng.randrange(0, 50_000_000, 1000):,}" if rng.random() < 0.3 else "" for _ in years]
+        rows.append(cells)
+    return rows
+
+
+def text_lines(rng: random.Random, n: int) -> list[str]:
+    return [
+        f"{i + 1}. {rng.choice(ITEMS)} 공사는 {rng.choice(METHODS)} 방식으로 {rng.randint(2025, 2040)}년에 시행한다."
+        for i in range(n)
+    ]
+
+
+def make_xlsx(path: Path, rng: random.Random, scale: int):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for s in range(3):
+        ws = wb.create_sheet(f"총괄표{s + 1}")
+        for row in cost_rows(rng, 200 * scale):
+            ws.append(row)
+    wb.save(path)
+
+
+class PdfWriter:
+    """표(선 + 텍스트)와 텍스트만 있는 쪽을 그리는 최소 PDF 작성기 (Helvetica, ASCII 전용)."""
+    WIDTH, HEIGHT = 595, 842
+
+    def __init__(self):
+        self.pages: list[bytes] = []
+
+    def add_table_page(self, rows: list[list[str]], col_width: int = 70, row_height: int = 18):
+        ops = ["0.5 w"]
+        x0, top = 30, self.HEIGHT - 40
+        cols = max(len(r) for r in rows)
+        for r, row in enumerate(rows):
+            y = top - (r + 1) * row_height
+            for c in range(cols):
+                x = x0 + c * col_width
+                ops.append(f"{x} {y} {col_width} {row_height} re S")
+                text = row[c] if c < len(row) else ""
+                if text:
+                    ops.append(f"BT /F1 7 Tf {x + 2} {y + 5} Td ({self._escape(text)}) Tj ET")
+        self.pages.append("\n".join(ops).encode("latin-1"))
+
+    def add_text_page(self, lines: list[str]):
+        ops = ["BT /F1 9 Tf 12 TL 40 800 Td"]
+        ops += [f"({self._escape(line)}) Tj T*" for line in lines]
+        ops.append("ET")
+        self.pages.append("\n".join(ops).encode("latin-1"))
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        text = text.encode("ascii", "replace").decode("ascii")
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    def save(self, path: Path):
+        n = len(self.pages)
+        # 1 카탈로그, 2 페이지 트리, 3 글꼴, 4.. (페이지, 내용) 쌍
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                " ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n)).encode(),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        ]
+        for i, content in enumerate(self.pages):
+            objects.append((
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.WIDTH} {self.HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+            ).encode())
+            objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+        out = io.BytesIO()
+        out.write(b"%PDF-1.4\n")
+        offsets = []
+        for num, body in enumerate(objects, 1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for off in offsets:
+            out.write(b"%010d 00000 n \n" % off)
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+        path.write_bytes(out.getvalue())
+
+
+def ascii_rows(rows: list[list[str]]) -> list[list[str]]:
+    """PDF 기본 글꼴은 한글이 없으므로 항목명을 영문 코드로 바꾼다."""
+    table = {name: f"ITEM-{i:02d}" for i, name in enumerate(ITEMS)}
+    table.update({name: f"M{i}" for i, name in enumerate(METHODS)})
+    return [[table.get(c, c) for c in row] for row in rows]
+
+
+def make_pdf_tables(path: Path, rng: random.Random, scale: int):
+    pdf = PdfWriter()
+    for _ in range(4 * scale):
+        pdf.add_table_page(ascii_rows(cost_rows(rng, 35)))
+    pdf.save(path)
+
+
+def make_pdf_text(path: Path, rng: random.Random, scale: int):
+    pdf = PdfWriter()
+    for _ in range(4 * scale):
+        lines = [
+            f"{i + 1}. ITEM-{rng.randrange(len(ITEMS)):02d} repair in {rng.randint(2025, 2040)}, "
+            f"estimated {rng.randrange(1, 900) * 100_000:,} KRW"
+            for i in range(60)
+        ]
+        pdf.add_text_page(lines)
+    pdf.save(path)
+
+
+def ooxml_zip(path: Path, parts: dict[str, str]):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+
+
+DOCX_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def make_docx(path: Path, rng: random.Random, scale: int):
+    def para(text):
+        return f"<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>"
+
+    body = [para(line) for line in text_lines(rng, 20)]
+    for _ in range(2):
+        trs = "".join(
+            "<w:tr>" + "".join(f"<w:tc>{para(c)}</w:tc>" for c in row) + "</w:tr>"
+            for row in cost_rows(rng, 150 * scale)
+        )
+        body.append(f"<w:tbl>{trs}</w:tbl>")
+        body.append(para("(단위: 원)"))
+    ooxml_zip(path, {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType='
+            '"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/></Relationships>'
+        ),
+        "word/document.xml": (
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document {DOCX_NS}><w:body>{"".join(body)}</w:body></w:document>'
+        ),
+    })
+
+
+PPTX_NS = ('xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+           'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+           'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"')
+
+
+def make_pptx(path: Path, rng: random.Random, scale: int):
+    def text_shape(lines):
+        ps = "".join(f"<a:p><a:r><a:t>{escape(line)}</a:t></a:r></a:p>" for line in lines)
+        return f"<p:sp><p:txBody>{ps}</p:txBody></p:sp>"
+
+    def table_shape(rows):
+        trs = "".join(
+            "<a:tr>" + "".join(f"<a:tc><a:txBody><a:p><a:r><a:t>{escape(c)}</a:t></a:r></a:p></a:txBody></a:tc>"
+                               for c in row) + "</a:tr>"
+            for row in rows
+        )
+        return f"<p:graphicFrame><a:graphic><a:graphicData><a:tbl>{trs}</a:tbl></a:graphicData></a:graphic></p:graphicFrame>"
+
+    n_slides = 10 * scale
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/ppt/presentation.xml" ContentType='
+            '"application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"/></Types>'
+        ),
+        "ppt/presentation.xml": (
+            f'<?xml version="1.0" encoding="UTF-8"?><p:presentation {PPTX_NS}><p:sldIdLst>'
+            + "".join(f'<p:sldId id="{256 + i}" r:id="rId{i + 1}"/>' for i in range(n_slides))
+            + "</p:sldIdLst></p:presentation>"
+        ),
+        "ppt/_rels/presentation.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{i + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                f'relationships/slide" Target="slides/slide{i + 1}.xml"/>'
+                for i in range(n_slides)
+            )
+            + "</Relationships>"
+        ),
+    }
+    for i in range(n_slides):
+        shapes = text_shape(text_lines(rng, 3))
+        if i % 2 == 0:
+            shapes += table_shape(cost_rows(rng, 15))
+        parts[f"ppt/slides/slide{i + 1}.xml"] = (
+            f'<?xml version="1.0" encoding="UTF-8"?><p:sld {PPTX_NS}><p:cSld><p:spTree>{shapes}</p:spTree></p:cSld></p:sld>'
+        )
+    ooxml_zip(path, parts)
+
+
+# OLE 복합 문서(CFB v3) 상수
+SECTOR = 512
+FREESECT, ENDOFCHAIN, FATSECT, NOSTREAM = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD, 0xFFFFFFFF
+MINI_CUTOFF = 4096
+
+
+def cfb_dir_entry(name: str, kind: int, child=NOSTREAM, start=ENDOFCHAIN, size=0) -> bytes:
+    encoded = (name + "\0").encode("utf-16-le") if name else b""
+    return (
+        encoded.ljust(64, b"\0")
+        + struct.pack("<HBB", len(encoded), kind, 1)
+        + struct.pack("<III", NOSTREAM, NOSTREAM, child)
+        + b"\0" * 16 + b"\0" * 4 + b"\0" * 16
+        + struct.pack("<IQ", start, size)
+    )
+
+
+def write_cfb(path: Path, stream_name: str, data: bytes):
+    """스트림 하나만 담은 최소 OLE 복합 문서를 쓴다.
+    미니 스트림을 쓰지 않도록 data는 MINI_CUTOFF(4096) 바이트 이상이어야 한다."""
+    assert len(data) >= MINI_CUTOFF
+    n_data = math.ceil(len(data) / SECTOR)
+    n_fat = 1
+    while n_fat * (SECTOR // 4) < n_fat + 1 + n_data:
+        n_fat += 1
+    assert n_fat <= 109, "DIFAT 확장 섹터는 지원하지 않음"
+    dir_sect, data_start = n_fat, n_fat + 1
+
+    fat = [FATSECT] * n_fat + [ENDOFCHAIN]
+    fat += [data_start + i + 1 for i in range(n_data - 1)] + [ENDOFCHAIN]
+    fat += [FREESECT] * (n_fat * (SECTOR // 4) - len(fat))
+
+    header = (
+        OLE_MAGIC + b"\0" * 16
+        + struct.pack("<HHHHH", 0x3E, 3, 0xFFFE, 9, 6) + b"\0" * 6
+        + struct.pack("<IIIIIIIII", 0, n_fat, dir_sect, 0, MINI_CUTOFF, ENDOFCHAIN, 0, ENDOFCHAIN, 0)
+        + struct.pack("<109I", *(list(range(n_fat)) + [FREESECT] * (109 - n_fat)))
+    )
+    directory = (
+        cfb_dir_entry("Root Entry", 5, child=1)
+        + cfb_dir_entry(stream_name, 2, start=data_start, size=len(data))
+        + cfb_dir_entry("", 0, start=0) * 2
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(fat)}I", *fat))
+        f.write(directory)
+        f.write(data.ljust(n_data * SECTOR, b"\0"))
+
+
+def make_hwp(path: Path, rng: random.Random, scale: int):
+    lines = text_lines(rng, 40 * scale)
+    data = "\r\n".join(lines).encode("utf-16-le")
+    while len(data) < MINI_CUTOFF:
+        lines += text_lines(rng, 10)
+        data = "\r\n".join(lines).encode("utf-16-le")
+    write_cfb(path, "PrvText", data)
+
+
+def make_image(path: Path, rng: random.Random, scale: int):
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(img)
+    for i, row in enumerate(ascii_rows(cost_rows(rng, 40))):
+        draw.text((40, 40 + i * 30), "  ".join(row), fill="black")
+    img.save(path)
+
+
+def make_zip(path: Path, rng: random.Random, scale: int):
+    """다른 합성 문서 몇 개를 묶은 첨부 압축파일."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, maker in (("총괄표.xlsx", make_xlsx), ("계획서.docx", make_docx), ("안내.hwp", make_hwp)):
+            tmp = path.with_name(f"_{name}")
+            maker(tmp, rng, scale)
+            zf.write(tmp, name)
+            tmp.unlink()
+
+
+# 파일명 → (생성 함수, parsers 모듈의 파서 함수 이름)
+# ZIP은 레지스트리에 파서가 없으므로 parse_file(sniff → 미지원 형식 건너뜀) 경로를 잰다.
+CORPUS = {
+    "multi_sheet.xlsx": (make_xlsx, "parse_excel"),
+    "tables.pdf": (make_pdf_tables, "parse_pdf"),
+    "text_only.pdf": (make_pdf_text, "parse_pdf"),
+    "tables.docx": (make_docx, "parse_docx"),
+    "slides.pptx": (make_pptx, "parse_pptx"),
+    "prvtext.hwp": (make_hwp, "parse_hwp"),
+    "scan.png": (make_image, "parse_image"),
+    "scan.jpg": (make_image, "parse_image"),
+    "attachments.zip": (make_zip, "parse_file"),
+}
+
+
+def build_corpus(scale_name: str, regen: bool = False) -> Path:
+    """규모별 합성 문서 묶음을 만든다 (이미 있으면 재사용). 같은 SEED로 항상 같은 파일이 나온다."""
+    scale = SCALES[scale_name]
+    root = CORPUS_DIR / scale_name
+    root.mkdir(parents=True, exist_ok=True)
+    for i, (name, (maker, _)) in enumerate(CORPUS.items()):
+        path = root / name
+        if path.exists() and not regen:
+            continue
+        try:
+            maker(path, random.Random(SEED + i), scale)
+        except ImportError as e:
+            print(f"    [경고] {name} 생성 건너뜀 — {e.name} 미설치")
+    return root
+
+
+# ── 측정 ──
+
+def measure(func, path: Path, repeat: int) -> dict:
+    """repeat번 실행해 wall/CPU 시간 중앙값을 재고, 한 번 더 tracemalloc으로 메모리 최고치를 잰다.
+    (CPU 시간과 메모리는 현재 프로세스 기준 — PDF 배치 처리 자식 프로세스는 포함되지 않음)"""
+    walls, cpus = [], []
+    df = None
+    with contextlib.redirect_stdout(io.StringIO()):  # parse_file의 [건너뜀] 출력은 측정에서 뺀다
+        for _ in range(repeat):
+            w0, c0 = time.perf_counter(), time.process_time()
+            df = func(path)
+            walls.append(time.perf_counter() - w0)
+            cpus.append(time.process_time() - c0)
+
+        tracemalloc.start()
+        try:
+            func(path)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "wall_s": statistics.median(walls),
+        "cpu_s": statistics.median(cpus),
+        "peak_mb": peak / 2**20,
+        "rows": 0 if df is None else len(df),
+        "cols": 0 if df is None else df.shape[1],
+    }
+
+
+def run_bench(scale_name: str = "small", repeat: int = REPEAT, regen: bool = False) -> list[dict]:
+    root = build_corpus(scale_name, regen)
+    results = []
+    for name, (_, parser_name) in CORPUS.items():
+        path = root / name
+        result = {"file": name, "parser": parser_name, "size_kb": 0, "error": ""}
+        func = getattr(parsers, parser_name, None)
+        if not path.exists():
+            result["error"] = "문서 생성 실패"
+        elif func is None:
+            result["size_kb"] = path.stat().st_size / 1024
+            result["error"] = "파서 없음"
+        else:
+            result["size_kb"] = path.stat().st_size / 1024
+            try:
+                result.update(measure(func, path, repeat))
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+# ── 보고서 ──
+
+def print_report(results: list[dict], baseline: list[dict] | None = None):
+    base = {r["file"]: r for r in baseline or []}
+    print(f"\n{'파일':<20}{'파서':<13}{'크기KB':>9}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'행':>8}{'열':>5}"
+          + ("   wall 변화" if base else ""))
+    for r in results:
+        if r["error"]:
+            print(f"{r['file']:<20}{r['parser']:<13}{r['size_kb']:>9.1f}   [오류] {r['error']}")
+            continue
+        line = (f"{r['file']:<20}{r['parser']:<13}{r['size_kb']:>9.1f}{r['wall_s']:>9.3f}"
+                f"{r['cpu_s']:>9.3f}{r['peak_mb']:>9.1f}{r['rows']:>8}{r['cols']:>5}")
+        old = base.get(r["file"])
+        if old and old.get("wall_s"):
+            line += f"   {(r['wall_s'] / old['wall_s'] - 1) * 100:+.1f}%"
+        print(line)
+
+
+def save_report(results: list[dict], scale_name: str) -> Path:
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = BENCH_DIR / f"bench_{scale_name}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps({"scale": scale_name, "results": results}, ensure_ascii=False, indent=1),
+                    encoding="utf-8")
+    return path
+
+
+def bench(scale_name: str = "small", repeat: int = REPEAT, compare: Path | None = None, regen: bool = False):
+    if scale_name not in SCALES:
+        raise ValueError(f"알 수 없는 규모: {scale_name} ({', '.join(SCALES)})")
+    print(f"[벤치마크] 규모={scale_name}, 반복={repeat}")
+    results = run_bench(scale_name, repeat, regen)
+    baseline = json.loads(compare.read_text(encoding="utf-8"))["results"] if compare else None
+    print_report(results, baseline)
+    print(f"\n[완료] 결과 저장: {save_report(results, scale_name)}")
@@ -0,0 +1,186 @@
+"""
+브라우저 컨텍스트 수명 관리.
+한 페이지로 수천 건을 돌면 DextUpload 스크립트, 다운로드 핸들, 응답 리스너가 쌓여
+Chromium 프로세스의 RSS가 계속 늘어난다. BrowserSession은 N건마다, 또는 브라우저
+프로세스 트리의 RSS가 상한을 넘으면 컨텍스트와 페이지를 새로 만든다.
+
+RSS는 브라우저 전체 합이라 작업자마다 따로 보면 모두가 계속 재생성한다. 그래서 같은 브라우저를 쓰는
+세션들은 RssGuard 하나를 공유한다 — 상한을 넘으면 한 작업자만 재생성하고, 합이 하한(low-water) 아래로
+내려갈 때까지 메모리 사유 재생성을 멈춘다. 재생성 자체도 guard의 잠금으로 한 번에 하나씩만 한다.
+
+  - 세션 유지: 닫기 전 storage_state(쿠키, localStorage)를 받아 새 컨텍스트에 넘긴다
+  - 정리: 예전 컨텍스트를 닫아 페이지, 리스너, 남은 다운로드 핸들을 함께 해제한다
+    (다운로드 임시 파일은 save_download가 저장 직후 download.delete()로 지운다)
+  - 재설정: setup(page)으로 리소스 정책, dialog 처리, 첫 페이지 진입을 다시 한다
+
+사용:
+    guard = RssGuard()   # 같은 브라우저의 작업자들이 공유
+    session = BrowserSession(browser, setup, guard=guard, accept_downloads=True)
+    page = await session.open()
+    for item in items:
+        ...
+        page = await session.tick()   # 재활용했으면 새 페이지
+    await session.close()
+"""
+import asyncio
+import os
+from pathlib import Path
+
+RECYCLE_EVERY = 300       # 이 건수마다 컨텍스트 재생성
+MAX_BROWSER_RSS_MB = 1500  # 브라우저 프로세스 트리 RSS가 이를 넘으면 재생성
+RSS_LOW_WATER_MB = 1000    # 메모리 사유로 재생성한 뒤에는 RSS가 이 아래로 내려가야 다시 재생성
+RSS_CHECK_EVERY = 10      # RSS 확인 주기 (건) — /proc 전체를 훑으므로 매 건 하지 않는다
+
+
+# ── 메모리 측정 ──
+
+def browser_rss_mb(root_pid: int | None = None) -> float | None:
+    """root_pid(기본: 현재 프로세스)의 자손 프로세스 RSS 합 (MB).
+    Playwright 드라이버와 Chromium 프로세스가 모두 자손이다. /proc이 없으면 None."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    root_pid = root_pid or os.getpid()
+    children: dict[int, list[int]] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤부터 나눈다
+        ppid = int(stat[stat.rfind(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / 2**20
+
+
+# ── 다운로드 ──
+
+async def save_download(download, dest: Path):
+    """다운로드를 dest로 옮기고 Playwright 임시 파일을 바로 지운다
+    (컨텍스트가 닫힐 때까지 artifacts 디렉터리에 쌓이지 않게)."""
+    await download.save_as(str(dest))
+    try:
+        await download.delete()
+    except Exception:
+        pass
+
+
+# ── 컨텍스트 재활용 ──
+
+class RssGuard:
+    """같은 브라우저를 쓰는 세션들이 공유하는 메모리 감시 (히스테리시스 + 재생성 직렬화)."""
+
+    def __init__(self, high_mb: float | None = MAX_BROWSER_RSS_MB, low_mb: float = RSS_LOW_WATER_MB):
+        self.high_mb = high_mb
+        self.low_mb = min(low_mb, high_mb) if high_mb else low_mb
+        self.armed = True
+        self.lock = asyncio.Lock()
+
+    def over(self) -> bool:
+        """이번에 메모리 사유로 재생성할 차례면 True. 한 번 True를 돌려주면 하한 아래로 내려갈 때까지 False.
+        이벤트 루프 하나에서 await 없이 판정하므로 여러 작업자 중 하나만 True를 받는다."""
+        if not self.high_mb:
+            return False
+        rss = browser_rss_mb()
+        if rss is None:
+            return False
+        if not self.armed:
+            if rss < self.low_mb:
+                self.armed = True
+            return False
+        if rss >= self.high_mb:
+            self.armed = False
+            return True
+        return False
+
+
+class BrowserSession:
+    """브라우저 하나 위의 컨텍스트+페이지 한 벌. 주기적으로 세션을 유지한 채 새로 만든다.
+    setup은 새 페이지를 받아 리소스 정책 연결, 첫 페이지 진입 등을 하는 async 함수.
+    guard를 주지 않으면 이 세션 혼자 쓰는 RssGuard를 만든다."""
+
+    def __init__(
+        self,
+        browser,
+        setup,
+        recycle_every: int | None = RECYCLE_EVERY,
+        guard: RssGuard | None = None,
+        **context_options,
+    ):
+        self.browser = browser
+        self.setup = setup
+        self.recycle_every = recycle_every
+        self.guard = guard or RssGuard()
+        self.context_options = context_options
+        self.context = None
+        self.page = None
+        self.count = 0       # 현재 컨텍스트에서 처리한 건수
+        self.total = 0
+        self.recycled = {"count": 0, "rss": 0}  # 재생성 사유별 횟수
+
+    async def open(self, storage_state: dict | None = None):
+        options = dict(self.context_options)
+        if storage_state:
+            options["storage_state"] = storage_state
+        self.context = await self.browser.new_context(**options)
+        self.page = await self.context.new_page()
+        await self.setup(self.page)
+        self.count = 0
+        return self.page
+
+    def due(self) -> str | None:
+        """재생성이 필요하면 사유, 아니면 None."""
+        if self.recycle_every and self.count >= self.recycle_every:
+            return "count"
+        if self.count % RSS_CHECK_EVERY == 0 and self.guard.over():
+            return "rss"
+        return None
+
+    async def tick(self):
+        """한 건 처리 후 호출. 재생성 조건이면 새 페이지를, 아니면 현재 페이지를 반환."""
+        self.count += 1
+        self.total += 1
+        reason = self.due()
+        if reason:
+            self.recycled[reason] += 1
+            await self.recycle()
+        return self.page
+
+    async def recycle(self):
+        # 여러 작업자가 동시에 컨텍스트를 닫고 여는 일이 없게 한 번에 하나씩
+        async with self.guard.lock:
+            return await self._recycle()
+
+    async def _recycle(self):
+        state = None
+        try:
+            state = await self.context.storage_state()
+        except Exception as e:
+            print(f"    [경고] 세션 상태 저장 실패, 새 세션으로 시작: {e}")
+        await self.close()
+        return await self.open(state)
+
+    async def close(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+            self.context = self.page = None
+
+    def summary(self) -> str:
+        return (f"    [컨텍스트] {self.total}건 처리, 재생성 {sum(self.recycled.values())}회 "
+                f"(건수 {self.recycled['count']}, 메모리 {self.recycled['rss']})")
@@ -3,7 +3,6 @@ K-APT 장기수선계획서 메타데이터 수집기
 목록 페이지(683페이지)를 순회하며 전체 게시글 메타데이터를 CSV로 저장한다.
 """
 import asyncio
-import csv
 import json
 import re
 import time
@@ -11,6 +10,14 @@ from pathlib import Path
 
 from playwright.async_api import async_playwright
 
+from browser_lifecycle import BrowserSession
+from resource_policy import ResourcePolicy
+from response_cache import ResponseCache
+from result_sink import ResultSink
+from shard import Shard, merge_csv, read_checkpoints
+from shutdown import GracefulShutdown
+from waits import BOOT_READY, LIST_READY, goto, submit
+
 # ── 설정 ──
 BASE_URL = "https://www.k-apt.go.kr"
 BOARD_LIST_URL = f"{BASE_URL}/web/board/webRepairPlan/boardList.do"
@@ -22,23 +29,21 @@ METADATA_CSV = OUTPUT_DIR / "metadata.csv"
 CHECKPOINT_FILE = Path(__file__).parent / "checkpoint_meta.json"
 
 REQUEST_DELAY = 0.8  # 페이지 간 딜레이 (초)
+COMMIT_EVERY = 200    # 메타데이터/체크포인트 커밋 주기 (행)
+COMMIT_INTERVAL = 30  # 메타데이터/체크포인트 커밋 주기 (초)
+BLOCK_RESOURCES = True  # 목록 페이지는 HTML만 받고 나머지 리소스는 차단
+
+METADATA_FIELDS = ["seq", "display_num", "title", "date", "views", "board_secret"]
 
 
-def load_checkpoint() -> int:
+def load_checkpoint(path: Path = CHECKPOINT_FILE) -> int:
     """마지막으로 완료한 페이지 번호를 반환. 없으면 0."""
-    if CHECKPOINT_FILE.exists():
-        data = json.loads(CHECKPOINT_FILE.read_text(encoding="utf-8"))
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
         return data.get("last_page", 0)
     return 0
 
 
-def save_checkpoint(page_no: int):
-    CHECKPOINT_FILE.write_text(
-        json.dumps({"last_page": page_no}, ensure_ascii=False),
-        encoding="utf-8",
-    )
-
-
 def parse_list_page(html: str) -> list[dict]:
     """목록 페이지 HTML에서 게시글 메타데이터를 추출한다."""
     from bs4 import BeautifulSoup
@@ -117,120 +122,159 @@ def get_total_count(html: str) -> int:
     return 0
 
 
-async def collect_all_metadata():
-    last_done = load_checkpoint()
-    print(f"[시작] 체크포인트: {last_done}페이지까지 완료")
-
-    # CSV 파일 준비 (이어쓰기 또는 새로 생성)
-    csv_mode = "a" if last_done > 0 and METADATA_CSV.exists() else "w"
-    csv_file = open(METADATA_CSV, csv_mode, newline="", encoding="utf-8-sig")
-    writer = csv.DictWriter(
-        csv_file,
-        fieldnames=["seq", "display_num", "title", "date", "views", "board_secret"],
-    )
-    if csv_mode == "w":
-        writer.writeheader()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        # 팝업/alert 자동 닫기
-        page.on("dialog", lambda dialog: dialog.dismiss())
-
-        # 첫 페이지 접근 → 세션 + CSRF 확보
-        print("[1] 첫 페이지 접근 중...")
-        await page.goto(BOARD_LIST_URL, wait_until="networkidle")
-
-        # pagination이 렌더링될 때까지 대기
+async def collect_all_metadata(shard: Shard | None = None):
+    metadata_csv, checkpoint_file, delay = METADATA_CSV, CHECKPOINT_FILE, REQUEST_DELAY
+    if shard:
+        metadata_csv, checkpoint_file = shard.path(METADATA_CSV), shard.path(CHECKPOINT_FILE)
+        delay = shard.delay(REQUEST_DELAY)
+    last_done = load_checkpoint(checkpoint_file)
+    print(f"[시작{f' 샤드 {shard}' if shard else ''}] 체크포인트: {last_done}페이지까지 완료")
+
+    # CSV 파일 준비 (이어쓰기 또는 새로 생성) — 체크포인트와 함께 배치 커밋
+    progress = {"last_page": last_done}
+    cache = ResponseCache()
+    sink = ResultSink(
+        metadata_csv, METADATA_FIELDS, checkpoint_file,
+        state=lambda: dict(progress),
+        batch_size=COMMIT_EVERY, flush_interval=COMMIT_INTERVAL,
+    ).open(resume=last_done > 0)
+
+    with GracefulShutdown() as stop:
         try:
-            await page.wait_for_selector("div.pagination", timeout=10000)
-        except Exception:
-            pass
-        await page.wait_for_timeout(2000)
-
-        # "오늘 하루 보지 않기" 팝업 닫기 시도
-        for selector in [".popup_close", ".bClose", "[onclick*='closePopup']", ".close"]:
-            try:
-                btn = await page.query_selector(selector)
-                if btn:
-                    await btn.click()
-                    await page.wait_for_timeout(300)
-            except Exception:
-                pass
-
-        html = await page.content()
-        max_page = get_max_page(html)
-        total_count = get_total_count(html)
-
-        if max_page <= 1:
-            # fallback: JavaScript로 직접 확인
-            max_page = await page.evaluate("""() => {
-                const last = document.querySelector('.pagination .last');
-                if (last) {
-                    const m = last.getAttribute('href')?.match(/goList\\((\\d+)\\)/);
-                    return m ? parseInt(m[1]) : 1;
-                }
-                return 1;
-            }""")
-
-        print(f"    총 {max_page} 페이지, {total_count}건 확인")
-
-        # 첫 페이지 데이터 수집 (체크포인트 이후부터)
-        start_page = last_done + 1 if last_done > 0 else 1
-        total_collected = 0
-
-        if start_page == 1:
-            items = parse_list_page(html)
-            for item in items:
-                writer.writerow(item)
-            total_collected += len(items)
-            save_checkpoint(1)
-            print(f"    [1/{max_page}] {len(items)}건 수집 (누적: {total_collected})")
-            start_page = 2
-
-        # 나머지 페이지 순회
-        for page_no in range(start_page, max_page + 1):
-            try:
-                # goList(pageNo) 시뮬레이션: hidden input에 값 세팅 후 form submit
-                await page.evaluate(f"""() => {{
-                    document.listForm.pageNo.value = {page_no};
-                    document.listForm.action = '/web/board/webRepairPlan/boardList.do';
-                    document.listForm.submit();
-                }}""")
-                await page.wait_for_load_state("networkidle")
-                await page.wait_for_timeout(500)
+            async with async_playwright() as p:
+                # 신호는 GracefulShutdown이 처리한다 — Playwright 드라이버가 Ctrl+C에 브라우저를 먼저 닫지 않게
+                browser = await p.chromium.launch(
+                    headless=True, handle_sigint=False, handle_sigterm=False, handle_sighup=False,
+                )
+                policy = ResourcePolicy(stage="list", enabled=BLOCK_RESOURCES)
+
+                async def setup(page):
+                    """새 컨텍스트마다: 리소스 정책, 팝업 처리, 첫 페이지 진입."""
+                    await policy.attach(page.context)
+                    # 팝업/alert 자동 닫기
+                    page.on("dialog", lambda dialog: dialog.dismiss())
+                    await goto(page, BOARD_LIST_URL)
+
+                    # pagination이 붙을 때까지 대기
+                    try:
+                        await page.wait_for_selector(BOOT_READY, state="attached", timeout=10000)
+                    except Exception:
+                        pass
+
+                    # "오늘 하루 보지 않기" 팝업 닫기 시도
+                    for selector in [".popup_close", ".bClose", "[onclick*='closePopup']", ".close"]:
+                        try:
+                            btn = await page.query_selector(selector)
+                            if btn:
+                                await btn.click()
+                        except Exception:
+                            pass
+
+                # 첫 페이지 접근 → 세션 + CSRF 확보 (이후 주기적으로 컨텍스트를 새로 만들며 세션 유지)
+                print("[1] 첫 페이지 접근 중...")
+                session = BrowserSession(browser, setup)
+                page = await session.open()
 
                 html = await page.content()
-                items = parse_list_page(html)
-
-                for item in items:
-                    writer.writerow(item)
-                csv_file.flush()
-
-                total_collected += len(items)
-                save_checkpoint(page_no)
-
-                if page_no % 50 == 0 or page_no == max_page:
-                    print(f"    [{page_no}/{max_page}] {len(items)}건 수집 (누적: {total_collected})")
-
-            except Exception as e:
-                print(f"    [에러] {page_no}페이지: {e}")
-                # 페이지 복구 시도
-                try:
-                    await page.goto(BOARD_LIST_URL, wait_until="networkidle")
-                    await page.wait_for_timeout(2000)
-                except Exception:
-                    pass
-                continue
-
-            await asyncio.sleep(REQUEST_DELAY)
-
-        await browser.close()
-
-    csv_file.close()
-    print(f"\n[완료] 총 {total_collected}건 → {METADATA_CSV}")
+                max_page = get_max_page(html)
+                total_count = get_total_count(html)
+
+                if max_page <= 1:
+                    # fallback: JavaScript로 직접 확인
+                    max_page = await page.evaluate("""() => {
+                        const last = document.querySelector('.pagination .last');
+                        if (last) {
+                            const m = last.getAttribute('href')?.match(/goList\\((\\d+)\\)/);
+                            return m ? parseInt(m[1]) : 1;
+                        }
+                        return 1;
+                    }""")
+
+                print(f"    총 {max_page} 페이지, {total_count}건 확인")
+
+                # 샤드면 자기 몫의 연속 페이지 구간만 순회
+                pages = shard.page_range(1, max_page) if shard else range(1, max_page + 1)
+                progress["end_page"] = pages[-1] if pages else 0
+
+                # 첫 페이지 데이터 수집 (체크포인트 이후부터)
+                start_page = max(last_done + 1, pages.start)
+                total_collected = 0
+
+                if start_page == 1:
+                    cache.put("boardList", {"pageNo": 1}, html)
+                    items = parse_list_page(html)
+                    progress["last_page"] = 1
+                    sink.add(items)
+                    total_collected += len(items)
+                    print(f"    [1/{max_page}] {len(items)}건 수집 (누적: {total_collected})")
+                    start_page = 2
+
+                # 나머지 페이지 순회 (중단 신호를 받으면 현재 페이지까지 저장하고 멈춘다)
+                for page_no in range(start_page, pages.stop):
+                    if stop.requested:
+                        print(f"    [중단] {progress['last_page']}페이지까지 저장, 다음 실행에서 이어서 수집")
+                        break
+                    try:
+                        # goList(pageNo) 시뮬레이션: hidden input에 값 세팅 후 form submit
+                        await submit(page, f"""() => {{
+                            document.listForm.pageNo.value = {page_no};
+                            document.listForm.action = '/web/board/webRepairPlan/boardList.do';
+                            document.listForm.submit();
+                        }}""", LIST_READY)
+
+                        html = await page.content()
+                        cache.put("boardList", {"pageNo": page_no}, html)
+                        items = parse_list_page(html)
+
+                        progress["last_page"] = page_no
+                        sink.add(items)
+                        total_collected += len(items)
+
+                        if page_no % 50 == 0 or page_no == max_page:
+                            print(f"    [{page_no}/{max_page}] {len(items)}건 수집 (누적: {total_collected})")
+
+                    except Exception as e:
+                        print(f"    [에러] {page_no}페이지: {e}")
+                        # 페이지 복구 시도
+                        try:
+                            await goto(page, BOARD_LIST_URL, LIST_READY)
+                        except Exception:
+                            pass
+                        continue
+
+                    await asyncio.sleep(delay)
+                    page = await session.tick()
+
+                await session.close()
+                await browser.close()
+                print(policy.summary())
+                print(session.summary())
+        finally:
+            sink.close()
+            cache.close()
+
+    print(f"\n[완료] 총 {total_collected}건 → {metadata_csv}")
+
+
+def merge_shards():
+    """샤드별 metadata.csv를 하나로 합친다. 모든 샤드가 자기 구간을 끝냈으면
+    메인 체크포인트도 마지막 페이지로 갱신한다."""
+    count = merge_csv(METADATA_CSV, METADATA_FIELDS)
+    if not count:
+        print("합칠 샤드 결과가 없습니다.")
+        return
+    states = read_checkpoints(CHECKPOINT_FILE)
+    last_page = load_checkpoint()
+    if states and all(s.get("last_page", 0) >= s.get("end_page", 1) for s in states):
+        last_page = max(last_page, max(s["end_page"] for s in states))
+    CHECKPOINT_FILE.write_text(
+        json.dumps(
+            {"last_page": last_page, "csv_offset": METADATA_CSV.stat().st_size},
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    print(f"[병합] metadata.csv {count}건, 체크포인트 {last_page}페이지")
 
 
 if __name__ == "__main__":
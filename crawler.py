@@ -6,25 +6,51 @@ DextUpload 네트워크 인터셉트로 파일 목록을 수집,
 """
 import asyncio
 import csv
+import hashlib
 import json
 import re
+import urllib.request
 from pathlib import Path
 
 from playwright.async_api import async_playwright
 
+from apt_matcher import extract_apt_name
+from browser_lifecycle import BrowserSession, RssGuard, save_download
+from resource_policy import ResourcePolicy
+from response_cache import ResponseCache
+from result_sink import ResultSink
+from scheduler import MAX_RETRIES, Pacer, Scheduler
+from shard import Shard, merge_csv, read_checkpoints
+from shutdown import GracefulShutdown
+import storage
+from waits import BOOT_READY, LIST_READY, goto, submit, submit_for_json
+
 # ── 설정 ──
 BASE_URL = "https://www.k-apt.go.kr"
 BOARD_LIST_URL = f"{BASE_URL}/web/board/webRepairPlan/boardList.do"
 BOARD_TYPE = "15"
 
+FILE_DOWNLOAD_PATH = "/board/getFileDownload.do"
+
 BASE_DIR = Path(__file__).parent
 DOWNLOAD_DIR = BASE_DIR / "downloads"
+MANIFEST_FILE = DOWNLOAD_DIR / "manifest.json"
 OUTPUT_DIR = BASE_DIR / "output"
 METADATA_CSV = OUTPUT_DIR / "metadata.csv"
 RESULT_CSV = OUTPUT_DIR / "result.csv"
 CHECKPOINT_FILE = BASE_DIR / "checkpoint_crawl.json"
 
 REQUEST_DELAY = 1.5  # 요청 간 딜레이 (초)
+COMMIT_EVERY = 20     # 결과/체크포인트 커밋 주기 (건)
+COMMIT_INTERVAL = 30  # 결과/체크포인트 커밋 주기 (초)
+BLOCK_RESOURCES = True  # 이미지/폰트/CSS/외부 분석 스크립트 등 불필요한 리소스 차단
+CRAWL_WORKERS = {"small": 1, "large": 1}  # 대기열별 동시 작업자 수 (요청 간격은 전체가 공유)
+PROBE_TIMEOUT = 15  # 파일 크기 확인 요청 제한 시간 (초)
+
+RESULT_FIELDS = [
+    "seq", "display_num", "title", "date", "apt_name",
+    "file_count", "file_names", "file_paths", "download_status",
+]
 
 DOWNLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -32,18 +58,303 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 # ── 체크포인트 ──
 
-def load_checkpoint() -> set:
-    if CHECKPOINT_FILE.exists():
-        data = json.loads(CHECKPOINT_FILE.read_text(encoding="utf-8"))
+def load_checkpoint(path: Path = CHECKPOINT_FILE) -> set:
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
         return set(str(s) for s in data.get("done_seqs", []))
     return set()
 
 
-def save_checkpoint(done_seqs: set):
-    CHECKPOINT_FILE.write_text(
-        json.dumps({"done_seqs": sorted(done_seqs)}, ensure_ascii=False),
-        encoding="utf-8",
-    )
+def load_retries(path: Path = CHECKPOINT_FILE) -> dict[str, int]:
+    """seq → FAIL 재시도 횟수."""
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return {str(k): int(v) for k, v in data.get("retries", {}).items()}
+    return {}
+
+
+def load_failed(path: Path = RESULT_CSV) -> set[str]:
+    """마지막 결과가 FAIL인 seq (재시도로 같은 seq 행이 여러 번 있으면 마지막 행 기준)."""
+    if not path.exists():
+        return set()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        latest = {r["seq"]: r.get("download_status") for r in csv.DictReader(f)}
+    return {seq for seq, status in latest.items() if status == "FAIL"}
+
+
+# ── 다운로드 검증 ──
+
+def load_manifest() -> dict:
+    """검증 완료된 다운로드 파일의 크기·SHA-256 기록을 반환한다."""
+    if MANIFEST_FILE.exists():
+        return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_manifest(manifest: dict):
+    tmp = MANIFEST_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(MANIFEST_FILE)
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def record_file(manifest: dict, dest: Path):
+    st = dest.stat()
+    manifest[dest.name] = {"size": st.st_size, "sha256": file_sha256(dest), "mtime_ns": st.st_mtime_ns}
+    storage.discard_compressed(dest)  # 새로 받은 원본이 예전 압축본을 대체
+
+
+def part_path(dest: Path) -> Path:
+    """직접 URL(getFileDownload.do)로 받는 중인 파일의 임시 경로. 완전히 받은 뒤에만 dest로 이름을 바꾼다.
+    이 파일만 Range로 이어받는다."""
+    return dest.with_name(dest.name + ".part")
+
+
+def browser_part_path(dest: Path) -> Path:
+    """브라우저 다운로드(#btn-all-files)를 받는 임시 경로. 내용이 직접 URL과 같다는 보장이 없으므로
+    크기가 맞지 않으면 이어받지 않고 버린다."""
+    return dest.with_name(dest.name + ".browser.part")
+
+
+def finish_download(manifest: dict, part: Path, dest: Path) -> Path:
+    part.replace(dest)
+    record_file(manifest, dest)
+    return dest
+
+
+def reported_size(f: dict) -> int | None:
+    """fileListData.do 항목에 들어 있는 파일 크기(바이트). 없으면 None."""
+    for key in ("fileSize", "file_size", "size"):
+        value = str(f.get(key, "")).replace(",", "").strip()
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+def download_url(bseq, fseq) -> str:
+    return f"{BASE_URL}{FILE_DOWNLOAD_PATH}?seq={bseq}&boardType={BOARD_TYPE}&file_num={fseq}"
+
+
+def probe_range(url: str, headers: dict, timeout: float = PROBE_TIMEOUT) -> int | None:
+    """1바이트 Range 요청의 응답 헤더만 읽고 본문은 읽지 않은 채 연결을 닫는다.
+    206이면 Content-Range의 전체 크기, Range를 무시하고 200을 주면 Content-Length."""
+    req = urllib.request.Request(url, headers={**headers, "Range": "bytes=0-0"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        if resp.status == 206:
+            # Content-Range: bytes 0-0/123456
+            m = re.search(r"/(\d+)$", resp.headers.get("Content-Range", ""))
+            return int(m.group(1)) if m else None
+        length = resp.headers.get("Content-Length", "")
+        if resp.status == 200 and length.isdigit():
+            return int(length)
+    return None
+
+
+async def session_headers(page, url: str) -> dict:
+    """브라우저 세션 밖에서 요청할 때 쓸 쿠키·User-Agent 헤더."""
+    headers = {"User-Agent": await page.evaluate("navigator.userAgent")}
+    cookies = await page.context.cookies(url)
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+    return headers
+
+
+async def probe_size(page, url: str) -> int | None:
+    """HEAD 요청(실패 시 1바이트 Range 요청)으로 서버 측 파일 크기를 확인한다.
+    Range 요청은 Playwright가 본문 전체를 받아 버리지 않도록 헤더만 읽고 끊는 별도 연결로 보낸다."""
+    try:
+        resp = await page.request.head(url)
+        length = resp.headers.get("content-length", "")
+        if resp.ok and length.isdigit() and int(length) > 0:
+            return int(length)
+    except Exception:
+        pass
+    try:
+        return await asyncio.to_thread(probe_range, url, await session_headers(page, url))
+    except Exception:
+        return None
+
+
+def check_local(dest: Path, expected: int | None, manifest: dict) -> str:
+    """로컬 파일 상태를 판정한다.
+
+    complete — 크기(및 기록된 체크섬)가 일치해 다시 받을 필요 없음
+    partial  — 검증 기록이 없는 파일이 서버 크기보다 작음 (예전 버전이 남긴 잘린 파일, 이어받기 대상)
+    stale    — 크기/체크섬 불일치, 또는 검증된 파일인데 서버 쪽 크기가 바뀜 (처음부터 새로 받아야 함)
+    missing  — 파일 없음
+    """
+    if not dest.exists() or dest.stat().st_size == 0:
+        return "missing"
+    st = dest.stat()
+    size = st.st_size
+    entry = manifest.get(dest.name)
+    if entry:
+        # 기록된 파일과 같은가 — 기록 이후 수정되지 않은 파일(크기·mtime 동일)은 다시 해시하지 않는다
+        if entry.get("size") != size:
+            return "stale"
+        if entry.get("mtime_ns") != st.st_mtime_ns:
+            if entry.get("sha256") != file_sha256(dest):
+                return "stale"
+            entry["mtime_ns"] = st.st_mtime_ns
+        # 완전히 받았던 파일이므로 서버 크기가 다르면 서버 쪽이 다시 올라온 것 — 이어받으면 안 된다
+        return "complete" if expected is None or expected == size else "stale"
+    if expected is None:
+        # 비교 기준이 전혀 없으면 기존처럼 존재 여부만으로 판단
+        return "complete"
+    if size < expected:
+        return "partial"
+    if size > expected:
+        return "stale"
+    return "complete"
+
+
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-\d+/(?:\d+|\*)")
+
+
+def range_start(resp) -> int | None:
+    """206 응답의 Content-Range 시작 위치. 헤더가 없거나 형식이 다르면 None."""
+    m = CONTENT_RANGE_RE.match(resp.headers.get("content-range", "").strip())
+    return int(m.group(1)) if m else None
+
+
+async def download_direct(page, url: str, dest: Path, expected: int | None) -> bool:
+    """직접 URL로 파일 전체를 처음부터 받아 dest에 쓴다. 크기를 알면 맞을 때만 쓴다."""
+    try:
+        resp = await page.request.get(url)
+        body = await resp.body()
+    except Exception:
+        return False
+    if resp.status != 200 or not body or (expected and len(body) != expected):
+        return False
+    dest.write_bytes(body)
+    return True
+
+
+async def resume_download(page, url: str, dest: Path, expected: int) -> bool:
+    """Range 요청으로 잘린 파일의 나머지 부분만 받아 이어 붙인다.
+    서버가 돌려준 Content-Range 시작이 현재 크기와 다르면 이어 붙이지 않고 처음부터 다시 받는다."""
+    offset = dest.stat().st_size
+    try:
+        resp = await page.request.get(url, headers={"Range": f"bytes={offset}-"})
+        body = await resp.body()
+    except Exception:
+        return False
+    if resp.status == 206 and range_start(resp) == offset:
+        with open(dest, "ab") as f:
+            f.write(body)
+    elif resp.status == 200 and len(body) == expected:
+        # Range 미지원 서버 — 전체 본문을 받았으면 그대로 교체
+        dest.write_bytes(body)
+    elif resp.status == 206:
+        print(f"    [재시도] {dest.name}: Content-Range가 {offset}바이트부터가 아님 — 처음부터 다시 받음")
+        return await download_direct(page, url, dest, expected)
+    else:
+        return False
+    return dest.stat().st_size == expected
+
+
+async def download_via_browser(page, dest: Path, bseq, fseq):
+    """DextUpload 전체 다운로드 버튼, 실패 시 a 태그 다운로드로 파일을 받는다."""
+    try:
+        async with page.expect_download(timeout=30000) as dl_info:
+            await page.click("#btn-all-files")
+        download = await dl_info.value
+        await save_download(download, dest)
+    except Exception:
+        # fallback: a 태그 생성
+        async with page.expect_download(timeout=30000) as dl_info:
+            await page.evaluate(f"""() => {{
+                const a = document.createElement('a');
+                a.href = '{FILE_DOWNLOAD_PATH}?seq={bseq}&boardType={BOARD_TYPE}&file_num={fseq}';
+                a.download = '';
+                document.body.appendChild(a);
+                a.click();
+                a.remove();
+            }}""")
+        download = await dl_info.value
+        await save_download(download, dest)
+
+
+def cached_file_sizes(cache: ResponseCache) -> dict[str, int]:
+    """캐시된 fileListData.do 응답에서 게시글별 첨부 크기 합을 구한다 (스케줄러 힌트)."""
+    sizes = {}
+    for params, body in cache.entries("fileListData"):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            continue
+        if data.get("code") != "SCC":
+            continue
+        reported = [reported_size(f) for f in data.get("data", [])]
+        if reported and all(s is not None for s in reported):
+            sizes[params["seq"]] = sum(reported)
+    return sizes
+
+
+def file_dest(f: dict, seq: str) -> Path:
+    """fileListData.do 항목의 로컬 저장 경로."""
+    safe_name = re.sub(r'[<>:"/\\|?*]', '_', f.get("fileName", "unknown"))
+    return DOWNLOAD_DIR / f"{f.get('boardSeq', seq)}_{f.get('seq', 1)}_{safe_name}"
+
+
+async def fetch_file(page, f: dict, seq: str, manifest: dict) -> Path | None:
+    """파일 하나를 검증하고 필요한 만큼만 받는다. 실패 시 None.
+    새로 받는 내용은 임시 파일에 쓰고 크기 검증을 통과한 뒤에만 dest로 옮기므로,
+    중단되더라도 dest에 잘린 파일이 남지 않는다. 직접 URL로 받던 .part만 다음 실행에서 이어받고,
+    브라우저 다운로드가 짧게 끝나면 버리고 직접 URL로 처음부터 받는다."""
+    fseq = f.get("seq", 1)
+    bseq = f.get("boardSeq", seq)
+    dest = file_dest(f, seq)
+    part = part_path(dest)
+    url = download_url(bseq, fseq)
+
+    expected = reported_size(f)
+    stored = storage.resolve(dest)
+    if stored is not None and storage.is_compressed(stored):
+        # compact로 압축 저장된 파일 — 원본 크기가 맞으면 그대로 사용 (경로는 원래 이름으로 기록)
+        if expected is None or storage.original_size(stored) == expected:
+            return dest
+    if expected is None and (dest.exists() or part.exists()):
+        expected = await probe_size(page, url)
+    if expected is None and dest.name in manifest:
+        expected = manifest[dest.name].get("size")
+
+    state = check_local(dest, expected, manifest)
+    if state == "complete":
+        if dest.name not in manifest:
+            record_file(manifest, dest)
+        return dest
+    if state == "stale":
+        part.unlink(missing_ok=True)  # 서버 파일이 바뀌었으면 예전 .part도 이어받을 수 없다
+    elif state == "partial":
+        dest.replace(part)  # 이전 버전이 dest에 남긴 (검증 기록 없는) 잘린 파일도 .part로 옮겨 이어받는다
+    if part.exists() and expected and 0 < part.stat().st_size < expected:
+        if await resume_download(page, url, part, expected):
+            return finish_download(manifest, part, dest)
+    part.unlink(missing_ok=True)
+
+    browser_part = browser_part_path(dest)
+    try:
+        await download_via_browser(page, browser_part, bseq, fseq)
+    except Exception:
+        pass
+    if browser_part.exists() and browser_part.stat().st_size > 0 and (
+            not expected or browser_part.stat().st_size == expected):
+        return finish_download(manifest, browser_part, dest)
+    browser_part.unlink(missing_ok=True)
+
+    # 브라우저 다운로드 실패/크기 불일치 — 직접 URL로 처음부터
+    if await download_direct(page, url, part, expected):
+        return finish_download(manifest, part, dest)
+    part.unlink(missing_ok=True)
+    return None
 
 
 # ── 메타데이터 로드 ──
@@ -60,196 +371,205 @@ def load_metadata() -> list[dict]:
     return rows
 
 
-# ── 단지 정보 추출 ──
+# ── 결과 행 (단지명 추출은 apt_matcher) ──
 
-APT_PATTERNS = [
-    r"([\w가-힣]+(?:아파트|단지|맨션|빌라|타운|파크|힐스|캐슬|자이|래미안|e편한세상|푸르지오|더샵|롯데캐슬|코아루|한신더휴|포레나)[\w가-힣]*)",
-    r"([\w가-힣]+\d+단지)",
-]
-
-
-def extract_apt_name(title: str, content_text: str = "") -> str:
-    for text in [title, content_text]:
-        for pat in APT_PATTERNS:
-            m = re.search(pat, text)
-            if m:
-                return m.group(1)
-    return title  # fallback
+def result_row(item: dict, apt_name: str, files: list, file_names: list, file_paths: list, status: str) -> dict:
+    return {
+        "seq": item["seq"],
+        "display_num": item.get("display_num", ""),
+        "title": item["title"],
+        "date": item.get("date", ""),
+        "apt_name": apt_name,
+        "file_count": len(files),
+        "file_names": " | ".join(file_names),
+        "file_paths": " | ".join(file_paths),
+        "download_status": status,
+    }
 
 
 # ── 메인 크롤링 루프 ──
 
-async def crawl():
-    metadata = load_metadata()
-    done_seqs = load_checkpoint()
-    remaining = [m for m in metadata if m["seq"] not in done_seqs]
-
-    print(f"[시작] 전체 {len(metadata)}건, 완료 {len(done_seqs)}건, 남은 {len(remaining)}건")
+async def crawl(shard: Shard | None = None, targets: list[dict] | None = None, prefer: set[str] | None = None):
+    """targets가 주어지면 metadata.csv 대신 그 게시글만 처리한다 (targeting.select_posts 결과).
+    prefer는 우선 처리할 관심 지역 게시글 seq 집합."""
+    metadata = load_metadata() if targets is None else targets
+    result_csv, checkpoint_file, delay = RESULT_CSV, CHECKPOINT_FILE, REQUEST_DELAY
+    skip_seqs = set()
+    if shard:
+        # 샤드는 자기 몫의 seq만 처리하고, 단일 실행에서 이미 끝난 seq는 건너뛴다
+        metadata = [m for m in metadata if shard.owns_seq(m["seq"])]
+        result_csv, checkpoint_file = shard.path(RESULT_CSV), shard.path(CHECKPOINT_FILE)
+        delay = shard.delay(REQUEST_DELAY)
+        skip_seqs = load_checkpoint()
+    done_seqs = load_checkpoint(checkpoint_file)
+    retries = load_retries(checkpoint_file)
+    manifest = load_manifest()
+    cache = ResponseCache()
+    # 이전 실행에서 FAIL로 끝난 게시글은 재시도 한도까지 다시 대기열에 넣는다
+    retry_seqs = {s for s in load_failed(result_csv) if retries.get(s, 0) < MAX_RETRIES}
+    skip_seqs = (skip_seqs | done_seqs) - retry_seqs
+    remaining = [m for m in metadata if m["seq"] not in skip_seqs]
+
+    label = f"[시작{f' 샤드 {shard}' if shard else ''}]"
+    print(f"{label} 전체 {len(metadata)}건, 완료 {len(metadata) - len(remaining)}건, "
+          f"남은 {len(remaining)}건 (재시도 {len(retry_seqs & {m['seq'] for m in remaining})}건)")
     if not remaining:
         print("처리할 게시글이 없습니다.")
         return
 
-    # 결과 CSV
-    result_fields = [
-        "seq", "display_num", "title", "date", "apt_name",
-        "file_count", "file_names", "file_paths", "download_status",
-    ]
-    csv_mode = "a" if RESULT_CSV.exists() and len(done_seqs) > 0 else "w"
-    csv_file = open(RESULT_CSV, csv_mode, newline="", encoding="utf-8-sig")
-    writer = csv.DictWriter(csv_file, fieldnames=result_fields)
-    if csv_mode == "w":
-        writer.writeheader()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(accept_downloads=True)
-        page = await context.new_page()
-        page.on("dialog", lambda d: d.dismiss())
-
-        # ── 파일 목록 네트워크 인터셉트 ──
-        captured_files = {}
-
-        async def on_response(response):
-            if "fileListData.do" in response.url:
-                try:
-                    body = await response.json()
-                    if body.get("code") == "SCC":
-                        captured_files["data"] = body.get("data", [])
-                except Exception:
-                    pass
-
-        page.on("response", on_response)
-
-        # 세션 확보
-        print("[1] 세션 확보 중...")
-        await page.goto(BOARD_LIST_URL, wait_until="networkidle")
-        await page.wait_for_selector("div.pagination", timeout=10000)
-        await page.wait_for_timeout(2000)
-
-        processed = 0
-        errors = 0
-
-        for item in remaining:
-            seq = item["seq"]
-            title = item["title"]
-            captured_files.clear()
-
+    scheduler = Scheduler(remaining, sizes=cached_file_sizes(cache), region_seqs=prefer, retries=retries)
+    print(scheduler.summary())
+    pacer = Pacer(delay)
+
+    # 결과 CSV + 체크포인트 (배치 커밋)
+    sink = ResultSink(
+        result_csv, RESULT_FIELDS, checkpoint_file,
+        state=lambda: {"done_seqs": sorted(done_seqs), "retries": retries},
+        batch_size=COMMIT_EVERY, flush_interval=COMMIT_INTERVAL,
+    ).open(resume=len(done_seqs) > 0)
+
+    stats = {"processed": 0, "errors": 0}
+    total = len(remaining)
+
+    async def process(page, policy: ResourcePolicy, item: dict):
+        seq = item["seq"]
+        title = item["title"]
+        if seq in retry_seqs:
+            retries[seq] = retries.get(seq, 0) + 1
+
+        # ── 상세 페이지 진입 ──
+        # DextUpload가 호출하는 fileListData.do 응답이 오는 즉시 진행 (상한 15초)
+        policy.stage = "detail"
+        file_list = await submit_for_json(page, f"""() => {{
+            document.listForm.seq.value = '{seq}';
+            document.listForm.boardSecret.value = '0';
+            document.listForm.action = '/web/board/webRepairPlan/boardView.do';
+            document.listForm.submit();
+        }}""", "fileListData.do")
+        cache.put("boardView", {"seq": seq}, await page.content())
+        if file_list is not None:
+            cache.put("fileListData", {"seq": seq}, json.dumps(file_list, ensure_ascii=False))
+
+        # 단지명 추출
+        content_text = await page.evaluate("""() => {
+            const el = document.querySelector('.boardV_cont');
+            return el ? el.textContent : '';
+        }""")
+        apt_name = extract_apt_name(title, content_text)
+
+        files = []
+        if file_list and file_list.get("code") == "SCC":
+            files = file_list.get("data", [])
+        file_names = []
+        file_paths = []
+        status = "NO_FILE"
+
+        if files:
+            for f in files:
+                file_names.append(f.get("fileName", "unknown"))
+                dest = await fetch_file(page, f, seq, manifest)
+                if dest is not None:
+                    file_paths.append(str(dest))
+                    status = "OK"
+                else:
+                    file_paths.append("")
+                    status = "FAIL"
+            save_manifest(manifest)
+
+        done_seqs.add(seq)
+        sink.add([result_row(item, apt_name, files, file_names, file_paths, status)])
+        stats["processed"] += 1
+
+        if stats["processed"] % 5 == 0:
+            print(f"    [{stats['processed']}/{total}] {title[:50]} → {status}")
+
+        # 목록 페이지로 복귀
+        policy.stage = "list"
+        await submit(page, """() => {
+            document.listForm.action = '/web/board/webRepairPlan/boardList.do';
+            document.listForm.submit();
+        }""", LIST_READY)
+
+    async def worker(browser, lane: str, guard: RssGuard) -> tuple[ResourcePolicy, BrowserSession]:
+        """lane 대기열을 우선 처리하는 작업자. 작업자마다 별도 컨텍스트(세션, 리소스 정책)를 쓰고,
+        컨텍스트는 BrowserSession이 주기적으로 새로 만든다 (메모리 감시 guard는 작업자들이 공유)."""
+        policy = ResourcePolicy(stage="list", enabled=BLOCK_RESOURCES)
+
+        async def setup(page):
+            policy.stage = "list"
+            await policy.attach(page.context)
+            page.on("dialog", lambda d: d.dismiss())
+            await goto(page, BOARD_LIST_URL, BOOT_READY)
+
+        session = BrowserSession(browser, setup, guard=guard, accept_downloads=True)
+        page = await session.open()
+
+        while not stop.requested and (item := scheduler.next(lane)) is not None:
+            await pacer.wait()
             try:
-                # ── 상세 페이지 진입 ──
-                await page.evaluate(f"""() => {{
-                    document.listForm.seq.value = '{seq}';
-                    document.listForm.boardSecret.value = '0';
-                    document.listForm.action = '/web/board/webRepairPlan/boardView.do';
-                    document.listForm.submit();
-                }}""")
-                await page.wait_for_load_state("networkidle")
-
-                # DextUpload 파일 목록 로딩 대기 (최대 15초)
-                for _ in range(30):
-                    if "data" in captured_files:
-                        break
-                    await page.wait_for_timeout(500)
-
-                # 단지명 추출
-                content_text = await page.evaluate("""() => {
-                    const el = document.querySelector('.boardV_cont');
-                    return el ? el.textContent : '';
-                }""")
-                apt_name = extract_apt_name(title, content_text)
-
-                files = captured_files.get("data", [])
-                file_names = []
-                file_paths = []
-                status = "NO_FILE"
-
-                if files:
-                    for f in files:
-                        fname = f.get("fileName", "unknown")
-                        fseq = f.get("seq", 1)
-                        bseq = f.get("boardSeq", seq)
-                        file_names.append(fname)
-
-                        safe_name = re.sub(r'[<>:"/\\|?*]', '_', fname)
-                        dest = DOWNLOAD_DIR / f"{bseq}_{fseq}_{safe_name}"
-
-                        if dest.exists() and dest.stat().st_size > 0:
-                            file_paths.append(str(dest))
-                            status = "OK"
-                            continue
-
-                        # 다운로드: 전체 다운로드 버튼 클릭
-                        try:
-                            async with page.expect_download(timeout=30000) as dl_info:
-                                await page.click("#btn-all-files")
-                            download = await dl_info.value
-                            await download.save_as(str(dest))
-                            file_paths.append(str(dest))
-                            status = "OK"
-                        except Exception:
-                            # fallback: a 태그 생성
-                            try:
-                                async with page.expect_download(timeout=30000) as dl_info:
-                                    await page.evaluate(f"""() => {{
-                                        const a = document.createElement('a');
-                                        a.href = '/board/getFileDownload.do?seq={bseq}&boardType={BOARD_TYPE}&file_num={fseq}';
-                                        a.download = '';
-                                        document.body.appendChild(a);
-                                        a.click();
-                                        a.remove();
-                                    }}""")
-                                download = await dl_info.value
-                                await download.save_as(str(dest))
-                                file_paths.append(str(dest))
-                                status = "OK"
-                            except Exception:
-                                file_paths.append("")
-                                status = "FAIL"
-
-                writer.writerow({
-                    "seq": seq,
-                    "display_num": item.get("display_num", ""),
-                    "title": title,
-                    "date": item.get("date", ""),
-                    "apt_name": apt_name,
-                    "file_count": len(files),
-                    "file_names": " | ".join(file_names),
-                    "file_paths": " | ".join(file_paths),
-                    "download_status": status,
-                })
-                csv_file.flush()
-
-                done_seqs.add(seq)
-                processed += 1
-
-                if processed % 5 == 0:
-                    save_checkpoint(done_seqs)
-                    print(f"    [{processed}/{len(remaining)}] {title[:50]} → {status}")
-
-                # 목록 페이지로 복귀
-                await page.evaluate("""() => {
-                    document.listForm.action = '/web/board/webRepairPlan/boardList.do';
-                    document.listForm.submit();
-                }""")
-                await page.wait_for_load_state("networkidle")
-                await page.wait_for_timeout(500)
-
+                await process(page, policy, item)
             except Exception as e:
-                errors += 1
-                print(f"    [에러 {errors}] seq={seq}: {e}")
+                stats["errors"] += 1
+                print(f"    [에러 {stats['errors']}] seq={item['seq']}: {e}")
+                policy.stage = "list"
                 try:
-                    await page.goto(BOARD_LIST_URL, wait_until="networkidle")
-                    await page.wait_for_timeout(2000)
+                    await goto(page, BOARD_LIST_URL, LIST_READY)
                 except Exception:
                     pass
-                continue
-
-            await asyncio.sleep(REQUEST_DELAY)
-
-        save_checkpoint(done_seqs)
-        await browser.close()
-
-    csv_file.close()
-    print(f"\n[완료] {processed}건 처리, {errors}건 에러 → {RESULT_CSV}")
+            page = await session.tick()
+        await session.close()
+        return policy, session
+
+    # 중단 신호를 받으면 작업자가 진행 중인 게시글까지만 끝내고, 결과/체크포인트를 커밋한 뒤 종료
+    with GracefulShutdown() as stop:
+        try:
+            async with async_playwright() as p:
+                # 신호는 GracefulShutdown이 처리한다 — Playwright 드라이버가 Ctrl+C에 브라우저를 먼저 닫지 않게
+                browser = await p.chromium.launch(
+                    headless=True, handle_sigint=False, handle_sigterm=False, handle_sighup=False,
+                )
+
+                # 세션 확보
+                print(f"[1] 세션 확보 중... (작업자: {', '.join(f'{lane} {n}' for lane, n in CRAWL_WORKERS.items())})")
+                guard = RssGuard()
+                workers = await asyncio.gather(*(
+                    worker(browser, lane, guard) for lane, n in CRAWL_WORKERS.items() for _ in range(n)
+                ))
+                await browser.close()
+                for policy, session in workers:
+                    print(policy.summary())
+                    print(session.summary())
+        finally:
+            sink.close()
+            cache.close()
+            save_manifest(manifest)
+
+    if stop.requested:
+        print(f"\n[중단] {stats['processed']}건 처리 후 저장, 남은 {len(scheduler)}건은 다음 실행에서 이어서 처리 → {result_csv}")
+    else:
+        print(f"\n[완료] {stats['processed']}건 처리, {stats['errors']}건 에러 → {result_csv}")
+
+
+def merge_shards():
+    """샤드별 result.csv를 하나로 합치고, 완료 seq를 메인 체크포인트에 반영한다."""
+    count = merge_csv(RESULT_CSV, RESULT_FIELDS)
+    if not count:
+        print("합칠 샤드 결과가 없습니다.")
+        return
+    done_seqs = load_checkpoint()
+    retries = load_retries()
+    for data in read_checkpoints(CHECKPOINT_FILE):
+        done_seqs.update(str(s) for s in data.get("done_seqs", []))
+        for seq, n in data.get("retries", {}).items():
+            retries[seq] = max(retries.get(seq, 0), n)
+    CHECKPOINT_FILE.write_text(
+        json.dumps(
+            {"done_seqs": sorted(done_seqs), "retries": retries, "csv_offset": RESULT_CSV.stat().st_size},
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    print(f"[병합] result.csv {count}건, 완료 seq {len(done_seqs)}건")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+"""
+통합 SQLite 데이터베이스 내보내기 (output/kapt.sqlite).
+흩어져 있는 CSV(all_metadata / metadata / result / apt_mapping / incheon_metadata_result)와
+parsed/*.csv를 정규화된 테이블로 증분 upsert 한다.
+
+  complexes    — 단지 (kaptCode, 시도/시군구 등)
+  posts        — 게시글 (seq, 제목, 날짜, 단지명, kaptCode, 다운로드 상태)
+  files        — 첨부파일 (seq, file_seq, 로컬 경로, 크기, SHA-256)
+  parsed_rows  — 파싱 결과 행 (seq, file_seq, row_no, 셀 목록 JSON)
+
+원본 파일의 수정시각/크기를 sources 테이블에 기록해 바뀐 것만 다시 넣는다.
+
+예) 강화군의 2024년 이후 정상 다운로드 파일:
+    SELECT p.seq, p.date, c.name, f.file_name FROM files f
+    JOIN posts p ON p.seq = f.seq JOIN complexes c ON c.kapt_code = p.kapt_code
+    WHERE c.sigungu = '강화군' AND p.date >= '2024-01-01' AND f.status = 'OK';
+"""
+import csv
+import json
+import re
+import sqlite3
+from pathlib import Path
+
+import storage
+import targeting
+
+BASE_DIR = Path(__file__).parent
+OUTPUT_DIR = BASE_DIR / "output"
+DB_PATH = OUTPUT_DIR / "kapt.sqlite"
+PARSED_DIR = OUTPUT_DIR / "parsed"
+DOWNLOAD_MANIFEST = BASE_DIR / "downloads" / "manifest.json"
+
+ALL_METADATA_CSV = OUTPUT_DIR / "all_metadata.csv"
+METADATA_CSV = OUTPUT_DIR / "metadata.csv"
+RESULT_CSV = OUTPUT_DIR / "result.csv"
+APT_MAPPING_CSV = OUTPUT_DIR / "apt_mapping.csv"
+KNOWN_CODE_CSVS = [OUTPUT_DIR / "incheon_metadata_result.csv"]
+
+META_COLUMNS = {"_seq", "_apt_name", "_title", "_date", "_file_name", "_sheet"}
+PARSED_NAME_RE = re.compile(r"^(\d+)_(\d+)\.csv$")
+FILE_NAME_RE = re.compile(r"^(\d+)_(\d+)_")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS complexes (
+    kapt_code TEXT PRIMARY KEY,
+    name TEXT, address TEXT, phone TEXT, households REAL,
+    sido TEXT, sigungu TEXT, dong TEXT,
+    manager TEXT, builder TEXT, built_year TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_complexes_region ON complexes (sido, sigungu);
+CREATE INDEX IF NOT EXISTS idx_complexes_sigungu ON complexes (sigungu);
+
+CREATE TABLE IF NOT EXISTS posts (
+    seq INTEGER PRIMARY KEY,
+    display_num INTEGER, title TEXT, date TEXT, views INTEGER, board_secret INTEGER,
+    apt_name TEXT, kapt_code TEXT,
+    file_count INTEGER, download_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_date ON posts (date);
+CREATE INDEX IF NOT EXISTS idx_posts_kapt_code ON posts (kapt_code);
+CREATE INDEX IF NOT EXISTS idx_posts_status ON posts (download_status);
+
+CREATE TABLE IF NOT EXISTS files (
+    seq INTEGER NOT NULL,
+    file_seq INTEGER NOT NULL,
+    file_name TEXT, file_path TEXT, status TEXT,
+    size INTEGER, sha256 TEXT,
+    PRIMARY KEY (seq, file_seq)
+);
+CREATE INDEX IF NOT EXISTS idx_files_status ON files (status);
+
+CREATE TABLE IF NOT EXISTS parsed_rows (
+    seq INTEGER NOT NULL,
+    file_seq INTEGER NOT NULL,
+    row_no INTEGER NOT NULL,
+    sheet TEXT,
+    cells TEXT NOT NULL,          -- JSON 배열
+    PRIMARY KEY (seq, file_seq, row_no)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def to_int(value) -> int | None:
+    value = str(value or "").replace(",", "").strip()
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def to_float(value) -> float | None:
+    try:
+        return float(str(value or "").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def read_csv(path: Path) -> list[dict]:
+    with storage.open_text(path) as f:
+        return list(csv.DictReader(f))
+
+
+class ExportDB:
+    def __init__(self, path: Path = DB_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # ── 변경 추적 ──
+
+    def changed(self, name: str, path: Path) -> bool:
+        if not path.exists():
+            return False
+        st = path.stat()
+        row = self.db.execute("SELECT mtime, size FROM sources WHERE name = ?", (name,)).fetchone()
+        return row != (st.st_mtime, st.st_size)
+
+    def mark(self, name: str, path: Path):
+        st = path.stat()
+        self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (name, st.st_mtime, st.st_size))
+
+    # ── CSV 원본 ──
+
+    def export_complexes(self) -> int:
+        rows = [(
+            r["kaptCode"], r.get("단지명"), r.get("주소"), r.get("전화번호"), to_float(r.get("세대수")),
+            r.get("시도"), r.get("시군구"), r.get("동리"), r.get("관리업체"), r.get("시공사"), r.get("준공년도"),
+        ) for r in read_csv(APT_MAPPING_CSV) if r.get("kaptCode")]
+        self.db.executemany("""
+            INSERT INTO complexes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kapt_code) DO UPDATE SET
+                name = excluded.name, address = excluded.address, phone = excluded.phone,
+                households = excluded.households, sido = excluded.sido, sigungu = excluded.sigungu,
+                dong = excluded.dong, manager = excluded.manager, builder = excluded.builder,
+                built_year = excluded.built_year
+        """, rows)
+        return len(rows)
+
+    def export_posts(self, path: Path) -> int:
+        """목록 메타데이터 → posts (크롤링 결과 컬럼은 건드리지 않음)."""
+        rows = [(
+            to_int(r["seq"]), to_int(r.get("display_num")), r.get("title"), r.get("date"),
+            to_int(r.get("views")), to_int(r.get("board_secret")),
+        ) for r in read_csv(path)]
+        self.db.executemany("""
+            INSERT INTO posts (seq, display_num, title, date, views, board_secret) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (seq) DO UPDATE SET
+                display_num = excluded.display_num, title = excluded.title, date = excluded.date,
+                views = excluded.views, board_secret = excluded.board_secret
+        """, rows)
+        return len(rows)
+
+    def export_results(self) -> int:
+        """result.csv → posts의 단지명/다운로드 상태 + files. 같은 seq는 마지막 행 기준."""
+        latest = {r["seq"]: r for r in read_csv(RESULT_CSV)}
+        manifest = json.loads(DOWNLOAD_MANIFEST.read_text(encoding="utf-8")) if DOWNLOAD_MANIFEST.exists() else {}
+
+        posts, files = [], []
+        for seq, r in latest.items():
+            posts.append((
+                to_int(seq), to_int(r.get("display_num")), r.get("title"), r.get("date"),
+                r.get("apt_name"), to_int(r.get("file_count")), r.get("download_status"),
+            ))
+            names = (r.get("file_names") or "").split(" | ")
+            paths = (r.get("file_paths") or "").split(" | ")
+            for i, name in enumerate(names):
+                if not name:
+                    continue
+                path = paths[i] if i < len(paths) else ""
+                m = FILE_NAME_RE.match(Path(path).name) if path else None
+                entry = manifest.get(Path(path).name, {}) if path else {}
+                files.append((
+                    to_int(seq), int(m.group(2)) if m else i + 1, name, path or None,
+                    "OK" if path else "FAIL", entry.get("size"), entry.get("sha256"),
+                ))
+
+        self.db.executemany("""
+            INSERT INTO posts (seq, display_num, title, date, apt_name, file_count, download_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (seq) DO UPDATE SET
+                apt_name = excluded.apt_name, file_count = excluded.file_count,
+                download_status = excluded.download_status,
+                title = coalesce(posts.title, excluded.title), date = coalesce(posts.date, excluded.date)
+        """, posts)
+        self.db.executemany("DELETE FROM files WHERE seq = ?", [(p[0],) for p in posts])
+        self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", files)
+        return len(files)
+
+    def export_codes(self) -> int:
+        """게시글 ↔ kaptCode 연결 (확인된 결과 CSV + 단지명 매칭이 한 단지로 좁혀진 경우)."""
+        rows = [{"seq": str(seq), "title": title or ""}
+                for seq, title in self.db.execute("SELECT seq, title FROM posts")]
+        updates = [(r["_codes"][0], int(r["seq"])) for r in targeting.annotate(rows) if len(r["_codes"]) == 1]
+        self.db.executemany("UPDATE posts SET kapt_code = ? WHERE seq = ?", updates)
+        return len(updates)
+
+    # ── 파싱 결과 ──
+
+    def export_parsed_file(self, path: Path) -> int:
+        m = PARSED_NAME_RE.match(storage.logical_path(path).name)
+        if not m:
+            return 0
+        seq, file_seq = int(m.group(1)), int(m.group(2))
+        rows = []
+        with storage.open_text(path) as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            sheet_col = header.index("_sheet") if "_sheet" in header else None
+            body = [i for i, name in enumerate(header) if name not in META_COLUMNS]
+            for row_no, cells in enumerate(reader, 1):
+                values = [cells[i] if i < len(cells) else "" for i in body]
+                while values and not values[-1]:
+                    values.pop()
+                sheet = cells[sheet_col] if sheet_col is not None and sheet_col < len(cells) else None
+                rows.append((seq, file_seq, row_no, sheet, json.dumps(values, ensure_ascii=False)))
+        self.db.execute("DELETE FROM parsed_rows WHERE seq = ? AND file_seq = ?", (seq, file_seq))
+        self.db.executemany("INSERT INTO parsed_rows VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def export_parsed(self, parsed_dir: Path = PARSED_DIR) -> tuple[int, int]:
+        """바뀐 파싱 CSV만 다시 넣고, 사라진 파일의 행은 지운다. (파일 수, 행 수) 반환."""
+        names = {storage.logical_path(p).name for p in parsed_dir.glob("*.csv*")} if parsed_dir.exists() else set()
+        names = {n for n in names if PARSED_NAME_RE.match(n)}
+        files = rows = 0
+        for name in sorted(names):
+            path = storage.resolve(parsed_dir / name)
+            if self.changed(f"parsed/{name}", path):
+                rows += self.export_parsed_file(path)
+                self.mark(f"parsed/{name}", path)
+                files += 1
+        for (source,) in self.db.execute("SELECT name FROM sources WHERE name LIKE 'parsed/%'").fetchall():
+            name = source.split("/", 1)[1]
+            if name not in names:
+                seq, file_seq = PARSED_NAME_RE.match(name).groups()
+                self.db.execute("DELETE FROM parsed_rows WHERE seq = ? AND file_seq = ?", (int(seq), int(file_seq)))
+                self.db.execute("DELETE FROM sources WHERE name = ?", (source,))
+        return files, rows
+
+    # ── 전체 ──
+
+    def export_all(self) -> dict:
+        counts = {}
+        with self.db:
+            if self.changed("apt_mapping", APT_MAPPING_CSV):
+                counts["complexes"] = self.export_complexes()
+                self.mark("apt_mapping", APT_MAPPING_CSV)
+
+            posts_changed = False
+            for name, path in (("all_metadata", ALL_METADATA_CSV), ("metadata", METADATA_CSV)):
+                if self.changed(name, path):
+                    counts[name] = self.export_posts(path)
+                    self.mark(name, path)
+                    posts_changed = True
+
+            if self.changed("result", RESULT_CSV) or (posts_changed and RESULT_CSV.exists()):
+                counts["files"] = self.export_results()
+                self.mark("result", RESULT_CSV)
+                posts_changed = True
+
+            codes_changed = [self.changed(f"codes/{p.name}", p) for p in KNOWN_CODE_CSVS]
+            if posts_changed or any(codes_changed) or "complexes" in counts:
+                counts["kapt_codes"] = self.export_codes()
+                for p in KNOWN_CODE_CSVS:
+                    if p.exists():
+                        self.mark(f"codes/{p.name}", p)
+
+        with self.db:
+            counts["parsed_files"], counts["parsed_rows"] = self.export_parsed()
+        return counts
+
+    def close(self):
+        self.db.close()
+
+
+def export_db():
+    db = ExportDB()
+    try:
+        print(f"[DB 내보내기] {DB_PATH}")
+        counts = db.export_all()
+        for name, count in counts.items():
+            print(f"    {name}: {count}")
+        totals = {t: db.db.execute(f"SELECT count(*) FROM {t}").fetchone()[0]
+                  for t in ("complexes", "posts", "files", "parsed_rows")}
+        print("[완료] " + ", ".join(f"{t} {n}건" for t, n in totals.items()))
+    finally:
+        db.close()
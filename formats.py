@@ -0,0 +1,128 @@
+"""
+파일 형식 판별.
+확장자 대신 앞부분 바이트(시그니처)와 컨테이너 목록으로 실제 형식을 알아낸다.
+  - OLE 복합 문서: 스트림 이름으로 hwp / doc / xls / ppt 구분 (olefile 없으면 확장자로 추정)
+  - ZIP: mimetype / [Content_Types].xml 파트 목록으로 hwpx / docx / xlsx / pptx 구분
+  - PDF, PNG, JPEG, GIF, BMP, TIFF 시그니처
+HWPX를 .hwp로, PDF를 확장자 없이, ZIP을 .pdf로 올린 첨부도 제 파서로 보내고,
+지원하지 않는 내용은 파일을 열어 보기 전에 걸러낸다.
+"""
+import zipfile
+from pathlib import Path
+
+import storage
+
+HEAD_BYTES = 4096
+PDF_SEARCH = 1024  # %PDF- 앞에 쓰레기 바이트가 붙은 파일도 있으므로 이 범위 안에서 찾는다
+
+OLE_MAGIC = bytes.fromhex("D0CF11E0A1B11AE1")
+SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"HWP Document File", "hwp3"),  # 한글 97 이전 형식 (미지원)
+    (b"Rar!", "rar"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+]
+
+# OLE 스트림 이름 → 형식
+OLE_STREAMS = [
+    ("FileHeader", "hwp"),
+    ("DocInfo", "hwp"),
+    ("PrvText", "hwp"),
+    ("WordDocument", "doc"),
+    ("Workbook", "xls"),
+    ("Book", "xls"),
+    ("PowerPoint Document", "ppt"),
+]
+
+# OOXML 본문 파트 → 형식
+ZIP_PARTS = [
+    ("word/document.xml", "docx"),
+    ("xl/workbook.xml", "xlsx"),
+    ("ppt/presentation.xml", "pptx"),
+]
+
+# 확장자 → 기대 형식 (확장자와 내용이 다른지 알리는 용도)
+EXTENSION_FORMATS = {
+    ".jpg": "jpeg", ".jpeg": "jpeg", ".tif": "tiff", ".tiff": "tiff",
+}
+
+
+def expected_format(path: Path) -> str:
+    suffix = storage.logical_path(path).suffix.lower()
+    return EXTENSION_FORMATS.get(suffix, suffix.lstrip("."))
+
+
+def sniff(path: Path) -> str | None:
+    """파일 내용으로 판별한 형식 이름. 알 수 없는 바이너리면 None."""
+    with storage.open_blob(path) as f:
+        head = f.read(HEAD_BYTES)
+    if not head:
+        return None
+    if head.startswith(OLE_MAGIC):
+        return sniff_ole(path)
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return sniff_zip(path)
+    if b"%PDF-" in head[:PDF_SEARCH]:
+        return "pdf"
+    for magic, name in SIGNATURES:
+        if head.startswith(magic):
+            return name
+    if head.startswith(b"BM") and len(head) > 14 and head[6:10] == b"\x00\x00\x00\x00":
+        return "bmp"
+    if looks_like_text(head) and expected_format(path) in ("", "txt"):
+        return "txt"
+    return None
+
+
+def sniff_ole(path: Path) -> str:
+    try:
+        import olefile
+    except ImportError:
+        guess = expected_format(path)
+        return guess if guess in {name for _, name in OLE_STREAMS} else "ole"
+    source = storage.seekable_source(path)
+    with olefile.OleFileIO(str(source) if isinstance(source, Path) else source) as ole:
+        streams = {"/".join(entry) for entry in ole.listdir()}
+    for stream, name in OLE_STREAMS:
+        if stream in streams:
+            return name
+    return "ole"
+
+
+def sniff_zip(path: Path) -> str:
+    try:
+        with zipfile.ZipFile(storage.seekable_source(path)) as zf:
+            names = set(zf.namelist())
+            if "mimetype" in names and zf.read("mimetype").strip() == b"application/hwp+zip":
+                return "hwpx"
+    except zipfile.BadZipFile:
+        return "zip"
+    if "[Content_Types].xml" in names:
+        for part, name in ZIP_PARTS:
+            if part in names:
+                return name
+    if "Contents/section0.xml" in names:
+        return "hwpx"
+    return "zip"
+
+
+def looks_like_text(head: bytes) -> bool:
+    if b"\x00" in head:
+        return False
+    for enc in ("utf-8", "cp949"):
+        try:
+            head.decode(enc)
+            return True
+        except UnicodeDecodeError:
+            # 잘린 멀티바이트 문자 때문일 수 있으므로 끝 몇 바이트를 빼고 한 번 더
+            try:
+                head[:-3].decode(enc)
+                return True
+            except UnicodeDecodeError:
+                continue
+    return False
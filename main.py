@@ -4,77 +4,399 @@ K-APT 장기수선계획서 크롤러 — 메인 실행 스크립트
 사용법:
     py -3 main.py metadata   # 1단계: 게시글 메타데이터 수집
     py -3 main.py crawl      # 2단계: 상세 진입 + 파일 다운로드
-    py -3 main.py parse      # 3단계: 다운로드 파일 → CSV 변환
+    py -3 main.py parse      # 3단계: 다운로드 파일 → CSV 변환 (+ 비용표 정규화)
+    py -3 main.py parse --profile   # 파일별 시간/메모리 측정, 상한 초과 파일은 지연 대기열로
+    py -3 main.py parse --deferred  # 지연 대기열 파일만 상한 없이 처리
     py -3 main.py all        # 전체 실행
+    py -3 main.py merge      # 샤드별 결과 → metadata.csv / result.csv 병합
+    py -3 main.py reparse    # 응답 캐시만으로 metadata.csv / result.csv 재생성 (네트워크 없음)
+    py -3 main.py watch      # downloads/ 감시 — 새 파일이 생기는 즉시 파싱/색인
+    py -3 main.py index      # 파싱 결과 전문 검색 인덱스 증분 갱신
+    py -3 main.py search 승강기 교체   # 파싱 결과 전문 검색
+    py -3 main.py export-db  # 게시글/파일/단지/파싱 결과 → output/kapt.sqlite 증분 upsert
+    py -3 main.py history    # 정규화 비용표 → 단지별 개정 이력 (output/plan_history.sqlite, 바뀐 개정본만 diff 반영)
+    py -3 main.py history --kapt-code A41782301   # 한 단지의 개정본 목록과 연도별 계획 금액
+    py -3 main.py compact    # downloads/, parsed/, normalized/ 형식별 압축 (zstandard 없으면 gzip, --verify로 해제 검증)
+    py -3 main.py bench      # 합성 문서로 형식별 파서 성능 측정 (--scale small|medium|large, --repeat N, --compare 이전결과.json)
+
+대상 지정 크롤링 (apt_mapping.csv 기준, 여러 kaptCode는 쉼표로 구분):
+    py -3 main.py crawl --sido 인천광역시 --sigungu 강화군
+    py -3 main.py crawl --kapt-code A41782301,A41782302
+
+단지별 최신 개정본만 크롤링 (--latest K: 단지마다 최신 K건, 다른 조건과 함께 사용 가능):
+    py -3 main.py crawl --latest 1
+    py -3 main.py crawl --sido 인천광역시 --latest 2
+    (예전 개정본이 필요하면 --latest 없이 --kapt-code로 해당 단지 전체를 받는다)
+
+관심 지역 우선 처리 (전체를 크롤링하되 해당 지역 게시글을 먼저):
+    py -3 main.py crawl --prefer-sido 인천광역시 --prefer-sigungu 연수구
+
+파싱 프로파일 옵션 (--profile과 함께):
+    --timeout 초        파일당 시간 상한 (기본 300)
+    --max-mem MB        파일당 메모리 상한 (기본 2048, Linux)
+    --cprofile 초       이보다 오래 걸린 파일의 cProfile 통계를 output/profiles/에 저장
+    --tracemalloc       파이썬 할당 최고치도 측정 (파싱이 느려짐)
+
+샤드 분할 실행 (여러 프로세스/호스트에서 i = 1..N 각각 실행 후 merge):
+    py -3 main.py metadata --shard 1/4
+    py -3 main.py crawl --shard 1/4
 """
+import re
 import sys
 import asyncio
 from pathlib import Path
 
+BASE_DIR = Path(__file__).parent
+DOWNLOADS_DIR = BASE_DIR / "downloads"
+OUTPUT_DIR = BASE_DIR / "output"
+RESULT_CSV = OUTPUT_DIR / "result.csv"
+PARSED_DIR = OUTPUT_DIR / "parsed"
+NORMALIZED_DIR = OUTPUT_DIR / "normalized"
+
+DOWNLOAD_NAME_RE = re.compile(r"^(\d+)_(\d+)_")  # {boardSeq}_{fileSeq}_{파일명}
+
+
+def get_option(name: str) -> str | None:
+    """`--name value` 형식의 명령행 옵션 값을 반환한다."""
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return None
+
+
+def get_shard():
+    from shard import Shard
+    value = get_option("--shard")
+    return Shard.parse(value) if value else None
+
 
 def run_metadata():
     from collect_metadata import collect_all_metadata
-    asyncio.run(collect_all_metadata())
+    asyncio.run(collect_all_metadata(get_shard()))
+
+
+def get_targets():
+    """--sido / --sigungu / --kapt-code / --latest 조건이 있으면 해당 게시글 목록, 없으면 None."""
+    sido, sigungu, codes = get_option("--sido"), get_option("--sigungu"), get_option("--kapt-code")
+    latest = get_option("--latest")
+    if not (sido or sigungu or codes or latest):
+        return None
+    from targeting import annotate, latest_per_complex, load_posts, select_posts
+    if sido or sigungu or codes:
+        kapt_codes = {c.strip() for c in codes.split(",") if c.strip()} if codes else None
+        targets = select_posts(load_posts(), sido=sido, sigungu=sigungu, kapt_codes=kapt_codes)
+        print(f"[대상 선정] {len(targets)}건 (시도={sido or '-'}, 시군구={sigungu or '-'}, kaptCode={codes or '-'})")
+    else:
+        targets = annotate(load_posts())
+    if latest:
+        before = len(targets)
+        targets = latest_per_complex(targets, int(latest))
+        unmatched = sum(1 for t in targets if not t.get("_codes"))
+        print(f"[최신 개정본] 단지별 최신 {latest}건 → {before}건 중 {len(targets)}건 (단지 미확인 {unmatched}건 포함)")
+    return targets
+
+
+def get_preferred() -> set[str] | None:
+    """--prefer-sido / --prefer-sigungu에 해당하는 게시글 seq (스케줄러 우선순위용)."""
+    sido, sigungu = get_option("--prefer-sido"), get_option("--prefer-sigungu")
+    if not (sido or sigungu):
+        return None
+    from targeting import load_posts, select_posts
+    return {row["seq"] for row in select_posts(load_posts(), sido=sido, sigungu=sigungu)}
 
 
 def run_crawl():
     from crawler import crawl
-    asyncio.run(crawl())
+    asyncio.run(crawl(get_shard(), get_targets(), get_preferred()))
 
 
-def run_parse():
-    """다운로드된 파일들을 CSV로 변환한다."""
+def run_merge():
+    import collect_metadata
+    import crawler
+    collect_metadata.merge_shards()
+    crawler.merge_shards()
+
+
+def run_reparse():
+    from reparse import reparse_all
+    reparse_all()
+
+
+def load_parse_targets() -> list[dict]:
+    """result.csv의 게시글 행을 다운로드된 파일 단위 행으로 펼친다.
+    (file_paths / file_names는 ' | '로 이어진 목록, 실패한 파일은 빈 경로)"""
     import csv
-    import pandas as pd
-    from parsers import parse_file, save_as_csv
+    with open(RESULT_CSV, "r", encoding="utf-8-sig") as f:
+        # FAIL 재시도로 같은 seq가 다시 기록되면 마지막 행 기준
+        latest = {row["seq"]: row for row in csv.DictReader(f)}
+
+    targets = []
+    for row in latest.values():
+        paths = (row.get("file_paths") or row.get("file_path") or "").split(" | ")
+        names = (row.get("file_names") or row.get("file_name") or "").split(" | ")
+        for i, path in enumerate(paths):
+            if not path:
+                continue
+            m = DOWNLOAD_NAME_RE.match(Path(path).name)
+            targets.append({
+                **row,
+                "file_path": path,
+                "file_name": names[i] if i < len(names) else Path(path).name,
+                "file_seq": m.group(2) if m else str(i + 1),
+            })
+    return targets
+
+
+def save_parsed(df, row: dict, index) -> Path:
+    """파싱 결과를 parsed/ (+ 정규화 비용표는 normalized/)에 저장하고 검색 인덱스에 반영한다."""
+    import storage
+    from normalize import normalize_table
+    from parsers import save_as_csv
+
+    PARSED_DIR.mkdir(exist_ok=True)
+    NORMALIZED_DIR.mkdir(exist_ok=True)
+    seq = row["seq"]
+    apt_name = row.get("apt_name", "")
+    out_name = f"{seq}_{row.get('file_seq', '1')}.csv"
+
+    # 비용표 정규화 (표가 아니면 빈 결과)
+    norm = normalize_table(df)
+    if not norm.empty:
+        norm.insert(0, "_seq", seq)
+        norm.insert(1, "_apt_name", apt_name)
+        save_as_csv(norm, NORMALIZED_DIR / out_name)
+        storage.discard_compressed(NORMALIZED_DIR / out_name)
+
+    # 메타데이터 컬럼 추가
+    df.insert(0, "_seq", seq)
+    df.insert(1, "_apt_name", apt_name)
+    df.insert(2, "_title", row.get("title", ""))
+    df.insert(3, "_date", row.get("date", ""))
+    df.insert(4, "_file_name", row.get("file_name", ""))
+
+    save_as_csv(df, PARSED_DIR / out_name)
+    storage.discard_compressed(PARSED_DIR / out_name)
+    index.index_csv(PARSED_DIR / out_name)
+    return PARSED_DIR / out_name
 
-    downloads_dir = Path(__file__).parent / "downloads"
-    output_dir = Path(__file__).parent / "output"
-    result_csv = output_dir / "result.csv"
-    parsed_dir = output_dir / "parsed"
-    parsed_dir.mkdir(exist_ok=True)
 
-    if not result_csv.exists():
+def run_parse():
+    """다운로드된 파일들을 CSV로 변환한다.
+    --profile이면 파일마다 격리 프로세스에서 측정하며 파싱하고, 상한을 넘긴 파일은 지연 대기열로 보낸다.
+    --deferred면 지연 대기열에 있는 파일만 처리한다."""
+    import storage
+    import profiling
+    from parsers import parse_file
+    from search_index import SearchIndex
+    from shutdown import GracefulShutdown
+
+    if not RESULT_CSV.exists():
         print("result.csv가 없습니다. 먼저 crawl을 실행하세요.")
         return
 
-    # result.csv에서 다운로드된 파일 목록 로드
-    with open(result_csv, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        rows = [r for r in reader if r.get("download_status") == "OK" and r.get("file_path")]
+    # result.csv에서 다운로드된 파일 목록 로드 (지연 대기열 파일은 본 배치에서 제외)
+    rows = load_parse_targets()
+    deferred = profiling.load_deferred()
+    deferred_only = "--deferred" in sys.argv
+    rows = [r for r in rows if (r["file_path"] in deferred) == deferred_only]
 
-    print(f"[파싱] 대상 파일 {len(rows)}개")
+    runner = None
+    if "--profile" in sys.argv:
+        cprofile_over = get_option("--cprofile")
+        # 지연 대기열은 상한 없이 측정만 한다
+        runner = profiling.ProfiledRunner(
+            timeout=None if deferred_only else float(get_option("--timeout") or profiling.PARSE_TIMEOUT),
+            max_mb=None if deferred_only else int(get_option("--max-mem") or profiling.MAX_MEMORY_MB),
+            cprofile_over=float(cprofile_over) if cprofile_over else None,
+            trace_memory="--tracemalloc" in sys.argv,
+        )
+
+    print(f"[파싱] 대상 파일 {len(rows)}개{' (지연 대기열)' if deferred_only else ''}")
+    index = SearchIndex()
+    report = []
 
     success = 0
     fail = 0
-    for row in rows:
-        fpath = Path(row["file_path"])
-        if not fpath.exists():
-            continue
-
-        seq = row["seq"]
-        file_seq = row.get("file_seq", "1")
-        apt_name = row.get("apt_name", "")
-        title = row.get("title", "")
-
-        df = parse_file(fpath)
-        if df is not None and not df.empty:
-            # 메타데이터 컬럼 추가
-            df.insert(0, "_seq", seq)
-            df.insert(1, "_apt_name", apt_name)
-            df.insert(2, "_title", title)
-            df.insert(3, "_date", row.get("date", ""))
-            df.insert(4, "_file_name", row.get("file_name", ""))
-
-            out_name = f"{seq}_{file_seq}.csv"
-            save_as_csv(df, parsed_dir / out_name)
-            success += 1
-        else:
-            fail += 1
-            print(f"    [원본 보존] {fpath.name} — 파싱 불가")
-
-    print(f"\n[완료] 파싱 성공: {success}, 원본 보존: {fail}")
-    print(f"    CSV 파일: {parsed_dir}")
+    quarantined = 0
+    # 중단 신호를 받으면 지금 파일까지만 파싱하고 멈춘다 (CSV는 임시 파일 교체로 저장되므로 잘린 결과가 없다)
+    with GracefulShutdown() as stop:
+        for row in rows:
+            if stop.requested:
+                print(f"    [중단] 파싱 성공 {success}건까지 저장, 나머지는 다음 실행에서 처리")
+                break
+            fpath = storage.resolve(Path(row["file_path"]))  # compact된 파일은 압축본 경로
+            if fpath is None:
+                continue
+
+            if runner:
+                df, stats = runner.run(fpath)
+                report.append(stats)
+                if stats["status"] in profiling.QUARANTINE:
+                    profiling.defer(deferred, row["file_path"], stats)
+                    profiling.save_deferred(deferred)
+                    quarantined += 1
+                    print(f"    [지연] {fpath.name} — {stats['status']} ({stats['wall_s']}s)")
+                    continue
+                if stats["error"]:
+                    print(f"    [파싱 실패] {fpath.name}: {stats['error']}")
+            else:
+                df = parse_file(fpath)
+            if df is not None and not df.empty:
+                save_parsed(df, row, index)
+                success += 1
+                if deferred_only:
+                    deferred.pop(row["file_path"], None)
+                    profiling.save_deferred(deferred)
+            else:
+                fail += 1
+                print(f"    [원본 보존] {fpath.name} — 파싱 불가")
+
+    index.close()
+    print(f"\n[완료] 파싱 성공: {success}, 원본 보존: {fail}" + (f", 지연: {quarantined}" if quarantined else ""))
+    if report:
+        profiling.write_report(report)
+        profiling.print_slowest(report)
+        print(f"    프로파일: {profiling.PROFILE_CSV}")
+    print(f"    CSV 파일: {PARSED_DIR}")
+    print(f"    정규화 비용표: {NORMALIZED_DIR}")
+
+
+WATCH_WORKERS = 2  # watch 모드 파싱 프로세스 수
+
+
+def run_watch():
+    """downloads/를 감시하며 새로 도착한 파일을 바로 파싱하고 색인한다."""
+    import csv
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    import storage
+    from apt_matcher import extended_matcher
+    from parsers import parse_file
+    from search_index import SearchIndex
+    from watcher import DownloadWatcher
+
+    DOWNLOADS_DIR.mkdir(exist_ok=True)
+    index = SearchIndex()
+
+    # result.csv는 크롤러가 배치로 커밋하므로, 아직 없는 파일은 파일명 + metadata.csv로 메타데이터를 채운다
+    targets, targets_mtime = {}, None
+    metadata = {}
+    metadata_csv = OUTPUT_DIR / "metadata.csv"
+    if metadata_csv.exists():
+        with open(metadata_csv, "r", encoding="utf-8-sig") as f:
+            metadata = {r["seq"]: r for r in csv.DictReader(f)}
+        # 상세 본문 없이 제목에서만 단지명을 뽑아 둔다 (열 전체를 한 번에)
+        titles = [r.get("title", "") for r in metadata.values()]
+        for r, name in zip(metadata.values(), extended_matcher().extract_many(titles, default="")):
+            r["apt_name"] = name
+
+    def lookup(path: Path) -> dict:
+        nonlocal targets, targets_mtime
+        if RESULT_CSV.exists() and RESULT_CSV.stat().st_mtime != targets_mtime:
+            targets_mtime = RESULT_CSV.stat().st_mtime
+            targets = {Path(t["file_path"]).name: t for t in load_parse_targets()}
+        name = storage.logical_path(path).name
+        if name in targets:
+            return targets[name]
+        seq, file_seq = DOWNLOAD_NAME_RE.match(name).groups()
+        meta = metadata.get(seq, {})
+        return {
+            "seq": seq, "file_seq": file_seq, "title": meta.get("title", ""),
+            "date": meta.get("date", ""), "apt_name": meta.get("apt_name", ""),
+            "file_name": name.split("_", 2)[2],
+        }
+
+    def is_parsed(path: Path) -> bool:
+        seq, file_seq = DOWNLOAD_NAME_RE.match(path.name).groups()
+        out = storage.resolve(PARSED_DIR / f"{seq}_{file_seq}.csv")
+        return out is not None and out.stat().st_mtime >= path.stat().st_mtime
+
+    watcher = DownloadWatcher(DOWNLOADS_DIR, accept=lambda p: bool(DOWNLOAD_NAME_RE.match(p.name))).start()
+    running = {}
+    print(f"[감시] {DOWNLOADS_DIR} — Ctrl+C로 종료")
+    try:
+        with ProcessPoolExecutor(max_workers=WATCH_WORKERS) as pool:
+            while True:
+                for path in watcher.poll():
+                    if not is_parsed(path):
+                        running[pool.submit(parse_file, path)] = path
+                for future in [f for f in running if f.done()]:
+                    path = running.pop(future)
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        print(f"    [경고] {path.name} 파싱 실패: {e}")
+                        continue
+                    if df is not None and not df.empty:
+                        out = save_parsed(df, lookup(path), index)
+                        print(f"    [파싱] {path.name} → {out.name}")
+                    else:
+                        print(f"    [원본 보존] {path.name} — 파싱 불가")
+                time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n[감시 종료]")
+    finally:
+        watcher.stop()
+        index.close()
+
+
+def run_index():
+    from search_index import SearchIndex
+    index = SearchIndex()
+    changed = index.update()
+    index.close()
+    print(f"[색인] {changed}개 파일 새로 색인")
+
+
+def run_search(query: str):
+    import time
+    from search_index import SearchIndex
+    index = SearchIndex()
+    start = time.perf_counter()
+    hits = index.search(query)
+    elapsed = (time.perf_counter() - start) * 1000
+    index.close()
+    print(f"[검색] '{query}' — {len(hits)}개 파일 ({elapsed:.1f} ms)")
+    for hit in hits:
+        print(f"    seq={hit['seq']}  {hit['apt_name']}  {hit['file']}  ({hit['rows']}행)  {hit['snippet']}")
+
+
+def run_export_db():
+    from export_db import export_db
+    export_db()
+
+
+def run_history():
+    from plan_history import print_history, update_history
+    code = get_option("--kapt-code")
+    if code:
+        print_history(code)
+    else:
+        update_history()
+
+
+def run_compact():
+    """원본 다운로드와 파싱 결과를 형식별 수준으로 압축한다. 압축본은 parse/index/crawl이 그대로 읽는다."""
+    import storage
+    print(f"[압축] 방식: {storage.default_codec()}")
+    for root in (DOWNLOADS_DIR, PARSED_DIR, NORMALIZED_DIR):
+        count, saved = storage.compact(root)
+        print(f"    {root.name}/: {count}개 압축, {saved / 2**20:.1f} MB 절약")
+        bad = storage.verify(root) if "--verify" in sys.argv else []
+        if bad:
+            print(f"    [경고] {root.name}/ 체크섬 불일치 {len(bad)}개: {', '.join(bad[:5])}")
+
+
+def run_bench():
+    from bench_parsers import REPEAT, bench
+    compare = get_option("--compare")
+    bench(
+        get_option("--scale") or "small",
+        int(get_option("--repeat") or REPEAT),
+        Path(compare) if compare else None,
+        regen="--regen" in sys.argv,
+    )
 
 
 def main():
@@ -90,6 +412,24 @@ def main():
         run_crawl()
     elif cmd == "parse":
         run_parse()
+    elif cmd == "merge":
+        run_merge()
+    elif cmd == "reparse":
+        run_reparse()
+    elif cmd == "watch":
+        run_watch()
+    elif cmd == "index":
+        run_index()
+    elif cmd == "search":
+        run_search(" ".join(sys.argv[2:]))
+    elif cmd == "export-db":
+        run_export_db()
+    elif cmd == "history":
+        run_history()
+    elif cmd == "compact":
+        run_compact()
+    elif cmd == "bench":
+        run_bench()
     elif cmd == "all":
         run_metadata()
         run_crawl()
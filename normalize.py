@@ -0,0 +1,240 @@
+"""
+장기수선계획 비용표 정규화.
+parse_file이 돌려준 원시 표(DataFrame)를 받아
+  1) 헤더 행(다단 헤더 포함)을 찾고
+  2) 여러 줄로 나뉜 셀/행과 세로 병합 셀을 합치고
+  3) 금액(콤마·원 표기)·연도·수선주기를 숫자로 변환한 뒤
+  4) 공통 long-format 스키마(NORMALIZED_COLUMNS)로 내보낸다.
+숫자 변환은 셀 단위 루프 대신 표 전체를 한 번에 처리하는 pandas 문자열 연산을 쓴다.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+NORMALIZED_COLUMNS = [
+    "_sheet", "row", "section", "item", "method",
+    "cycle_years", "column", "year", "value", "raw",
+]
+
+HEADER_SCAN_ROWS = 15  # 헤더를 찾을 상단 행 수
+
+HEADER_RE = re.compile(
+    r"공종|항목|구분|품명|수선방법|수선주기|주기|수량|단위|단가|금액|수선율|비용|합계|소계|년도|연도|비고|규격"
+)
+ITEM_RE = re.compile(r"공종|항목|품명|내용|명칭")
+SECTION_RE = re.compile(r"구분")
+METHOD_RE = re.compile(r"방법")
+CYCLE_RE = re.compile(r"주기")
+NOTE_RE = re.compile(r"비고|단위|규격")
+AMOUNT_RE = re.compile(r"금액|비용|단가|합계|소계|원|수량|수선율|%")
+YEAR_RE = r"(?<!\d)((?:19|20)\d{2})(?:\.0)?(?!\d)"
+
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=NORMALIZED_COLUMNS)
+
+
+def normalize_table(df: pd.DataFrame | None) -> pd.DataFrame:
+    """parse_file 결과를 long-format 비용표로 변환한다. 표가 아니면 빈 DataFrame."""
+    if df is None or df.empty:
+        return empty_frame()
+    if "_sheet" in df.columns:
+        blocks = [(str(name), g.drop(columns="_sheet")) for name, g in df.groupby("_sheet", sort=False)]
+    else:
+        blocks = [("", df)]
+    parts = [normalize_block(block, sheet) for sheet, block in blocks]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return empty_frame()
+    return pd.concat(parts, ignore_index=True)[NORMALIZED_COLUMNS]
+
+
+# ── 셀 정리 / 숫자 변환 ──
+
+def clean_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """모든 셀을 문자열로 바꾸고 셀 내부 줄바꿈을 공백으로 합친다."""
+    cells = df.astype(object).where(df.notna(), "").astype(str)
+    cells = cells.apply(lambda s: s.str.replace(r"\s*\n\s*", " ", regex=True).str.strip())
+    cells = cells.replace({"None": "", "nan": ""})
+    # 완전히 빈 행/열 제거
+    filled = cells.ne("")
+    cells = cells.loc[filled.any(axis=1), filled.any(axis=0)]
+    cells.columns = range(cells.shape[1])
+    return cells.reset_index(drop=True)
+
+
+def to_number(s: pd.Series) -> pd.Series:
+    """'1,234,000원', '(5,000)', '12.5%' 같은 문자열 Series를 float로 변환한다."""
+    t = s.str.replace(r"[,\s원₩%]", "", regex=True)
+    negative = t.str.fullmatch(r"\(.*\)|-\d.*")
+    t = t.str.replace(r"^\((.*)\)$", r"\1", regex=True)
+    num = pd.to_numeric(t, errors="coerce")
+    return num.where(~negative.fillna(False).astype(bool), -num.abs())
+
+
+def numeric_cells(cells: pd.DataFrame) -> pd.DataFrame:
+    """표 전체를 한 번에(열 단위가 아니라 쌓은 Series로) 숫자 변환한다."""
+    stacked = cells.stack()
+    return to_number(stacked).unstack().reindex(index=cells.index, columns=cells.columns)
+
+
+# ── 헤더 탐지 ──
+
+def header_hits(cells: pd.DataFrame) -> pd.Series:
+    head = cells.iloc[:HEADER_SCAN_ROWS]
+    keyword = head.apply(lambda s: s.str.contains(HEADER_RE)).sum(axis=1)
+    year = head.apply(lambda s: s.str.fullmatch(YEAR_RE + r"\s*년?")).sum(axis=1)
+    return keyword + year
+
+
+def detect_header(cells: pd.DataFrame) -> tuple[list[str], int, pd.DataFrame]:
+    """헤더 열 이름, 데이터가 시작되는 행 번호, 헤더 원본 행(반복 헤더 비교용)을 반환한다.
+    바로 아래 행도 헤더처럼 보이면(병합 헤더 + 연도 행 등) 두 행을 합친다."""
+    hits = header_hits(cells)
+    if hits.empty or hits.max() < 2:
+        return [f"col_{i}" for i in cells.columns], 0, cells.iloc[:0]
+
+    h = int(hits.idxmax())
+    names = cells.iloc[h]
+    start = h + 1
+    if start < len(cells) and hits.get(start, 0) >= 1:
+        # 가로 병합된 상단 헤더는 오른쪽으로 채운 뒤 하단 헤더와 결합
+        top = names.replace("", np.nan).ffill().fillna("")
+        sub = cells.iloc[start]
+        names = (top + " " + sub).str.strip().where(sub.ne(""), names)
+        start += 1
+
+    result, seen = [], {}
+    for i, name in enumerate(names):
+        name = name or f"col_{i}"
+        seen[name] = seen.get(name, 0) + 1
+        result.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return result, start, cells.iloc[h:start]
+
+
+def header_key(cells: pd.DataFrame) -> pd.DataFrame:
+    """반복 헤더 비교용 셀 값 ('2025 년' → '2025')."""
+    return cells.apply(lambda s: s.str.replace(r"\s+", "", regex=True).str.replace(r"년$", "", regex=True))
+
+
+def repeated_header(body: pd.DataFrame, header: pd.DataFrame) -> pd.Series:
+    """페이지마다 다시 나오는 헤더 행. 채워진 셀의 80% 이상(최소 2개)이 같은 열의 헤더 셀과
+    같으면 반복 헤더로 본다 (연도 셀은 숫자로도 읽히므로 값 유무로는 가를 수 없다)."""
+    repeated = pd.Series(False, index=body.index)
+    if header.empty:
+        return repeated
+    keys = header_key(body).to_numpy()
+    filled = body.ne("").to_numpy()
+    counts = filled.sum(axis=1)
+    for row in header_key(header).to_numpy():
+        same = ((keys == row) & filled).sum(axis=1)
+        repeated |= (same >= 2) & (same >= 0.8 * counts)
+    return repeated
+
+
+# ── 본문 정규화 ──
+
+def normalize_block(df: pd.DataFrame, sheet: str = "") -> pd.DataFrame:
+    cells = clean_cells(df)
+    if cells.empty or cells.shape[1] < 2:
+        return empty_frame()
+
+    names, start, header = detect_header(cells)
+    body = cells.iloc[start:].reset_index(drop=True)
+    body.columns = names
+    if body.empty:
+        return empty_frame()
+    nums = numeric_cells(body)
+
+    # 열 역할 분류
+    headers = pd.Series(names, index=names)
+    years = headers.str.extract(YEAR_RE, expand=False)
+    is_year = years.notna()
+    is_cycle = headers.str.contains(CYCLE_RE)
+    is_method = headers.str.contains(METHOD_RE)
+    is_note = headers.str.contains(NOTE_RE)
+    # 구분/항목 헤더는 값이 숫자(구분 번호 1, 2 …)여도 값 열로 추정하지 않고 항상 section/item으로 보낸다
+    is_named_label = (headers.str.contains(SECTION_RE) | headers.str.contains(ITEM_RE)) & ~is_year & ~headers.str.contains(AMOUNT_RE)
+    filled = body.ne("")
+    numeric_ratio = nums.notna().sum() / filled.sum().replace(0, np.nan)
+    is_value = ~is_cycle & ~is_named_label & (is_year | headers.str.contains(AMOUNT_RE) | numeric_ratio.gt(0.5))
+    is_label = is_named_label | ~(is_value | is_cycle | is_method | is_note)
+    if not is_value.any():
+        return empty_frame()
+
+    value_cols = headers.index[is_value]
+    label_cols = headers.index[is_label]
+    # 구분 열은 section으로, 항목은 공종/항목 열에서만 (없으면 구분이 아닌 첫 라벨 열)
+    section_cols = [c for c in label_cols if SECTION_RE.search(c) and not ITEM_RE.search(c)]
+    item_cols = (
+        [c for c in label_cols if ITEM_RE.search(c)]
+        or [c for c in label_cols if c not in section_cols][:1]
+        or list(label_cols[:1])
+    )
+
+    # 페이지마다 반복되는 헤더 행 제거 (헤더 원본 행과 셀 단위로 비교)
+    repeated = repeated_header(body, header)
+    body, nums = body[~repeated].reset_index(drop=True), nums[~repeated].reset_index(drop=True)
+    if body.empty:
+        return empty_frame()
+    filled = body.ne("")
+    has_value = nums[value_cols].notna().any(axis=1)
+    text_cols = headers.index[~is_value]
+    has_text = filled[text_cols].any(axis=1)
+    first_only = (
+        has_text & ~filled[text_cols[1:]].any(axis=1) & filled[text_cols[0]]
+        if len(text_cols) else has_text
+    )
+
+    # 1) 줄바꿈으로 쪼개진 행: 숫자 없이 첫 열 이외에 텍스트가 있으면 윗행에 이어붙임
+    #    (첫 열에만 텍스트가 있는 행은 '1. 건물외부' 같은 구분 행으로 남긴다)
+    continuation = ~has_value & has_text & ~first_only
+    continuation.iloc[0] = False
+    group = (~continuation).cumsum()
+    text = body.where(filled, None)
+    merged = text.groupby(group).agg(lambda s: " ".join(s.dropna()))
+    merged_nums = nums.groupby(group).first()
+    has_value = merged_nums[value_cols].notna().any(axis=1)
+
+    # 2) 숫자가 없는 행은 구분(섹션) 행, 세로 병합으로 비어 있는 항목은 윗행 값으로 채움
+    label_text = merged[list(label_cols)].replace("", np.nan)
+    section_text = label_text.bfill(axis=1).iloc[:, 0] if len(label_cols) else pd.Series(np.nan, index=merged.index)
+    section = section_text.where(~has_value).ffill()
+    if section_cols and section_cols != item_cols:
+        # 구분 열 값(세로 병합이면 윗행 값)이 있으면 그것을 우선한다
+        section_col = merged[section_cols[0]].replace("", np.nan).ffill()
+        section = section_col.fillna(section)
+    label_text = label_text.where(has_value).ffill()
+    item = (
+        label_text[item_cols].fillna("").agg(" ".join, axis=1).str.strip()
+        if item_cols else pd.Series("", index=merged.index)
+    )
+    method_cols = list(headers.index[is_method])
+    method = merged[method_cols].agg(" ".join, axis=1).str.strip() if method_cols else pd.Series("", index=merged.index)
+    cycle_cols = list(headers.index[is_cycle])
+    cycle = (
+        merged[cycle_cols[0]].str.extract(r"(\d+(?:\.\d+)?)", expand=False).astype(float)
+        if cycle_cols else pd.Series(np.nan, index=merged.index)
+    )
+
+    rows = pd.DataFrame({
+        "row": np.arange(1, len(merged) + 1),
+        "section": section.fillna(""),
+        "item": item,
+        "method": method,
+        "cycle_years": cycle,
+    }, index=merged.index)[has_value]
+
+    # 3) 값 열을 long-format으로 펼침
+    values = merged_nums.loc[has_value, value_cols]
+    long = values.stack().dropna().rename("value").reset_index()
+    long.columns = ["_group", "column", "value"]
+    raw = merged.loc[has_value, value_cols].stack().rename("raw").reset_index()
+    raw.columns = ["_group", "column", "raw"]
+    long = long.merge(raw, on=["_group", "column"], how="left")
+    long = long.join(rows, on="_group").drop(columns="_group")
+    long["value"] = long["value"].astype(float)
+    long["year"] = pd.to_numeric(long["column"].map(years)).astype("Int64")
+    long["_sheet"] = sheet
+    return long[NORMALIZED_COLUMNS]
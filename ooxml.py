@@ -0,0 +1,230 @@
+"""
+DOCX / PPTX / HWPX 직접 XML 추출기.
+python-docx / python-pptx 객체 모델을 만들지 않고 ZIP 안의 XML 파트를
+iterparse로 한 번 훑으면서 표 행과 단락 텍스트를 내보낸다.
+병합 셀은 python-docx와 같게 처리한다 (gridSpan은 열 수만큼 반복,
+vMerge continue는 위 행의 같은 열 값을 반복).
+HWPX 표도 같은 모양으로 만든다 (colSpan/rowSpan 영역에 셀 값을 반복).
+"""
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import fromstring, iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+# ── DOCX ──
+
+def iter_docx(source) -> tuple[list[list[str]], list[str]]:
+    """word/document.xml에서 (최상위 표 행 목록, 본문 단락 목록)을 추출한다."""
+    rows: list[list[str]] = []
+    paragraphs: list[str] = []
+
+    depth = 0                 # 표 중첩 깊이
+    row: list[str] = []
+    prev_row: list[str] = []
+    cell_text: list[str] = []
+    para_text: list[str] = []
+    span = 1
+    vmerge_continue = False
+
+    with zipfile.ZipFile(source) as zf, zf.open("word/document.xml") as f:
+        for event, el in iterparse(f, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if tag == W + "tbl":
+                    depth += 1
+                elif depth == 1 and tag == W + "tc":
+                    cell_text, span, vmerge_continue = [], 1, False
+                continue
+
+            if tag == W + "t":
+                para_text.append(el.text or "")
+            elif tag == W + "tab":
+                para_text.append("\t")
+            elif tag in (W + "br", W + "cr"):
+                para_text.append("\n")
+            elif tag == W + "p":
+                text = "".join(para_text)
+                para_text = []
+                if depth == 0:
+                    if text.strip():
+                        paragraphs.append(text.strip())
+                elif depth == 1:
+                    cell_text.append(text)
+            elif depth == 1 and tag == W + "gridSpan":
+                span = int(el.get(W + "val", "1"))
+            elif depth == 1 and tag == W + "vMerge":
+                vmerge_continue = el.get(W + "val", "continue") == "continue"
+            elif depth == 1 and tag == W + "tc":
+                col = len(row)
+                if vmerge_continue and col < len(prev_row):
+                    text = prev_row[col]
+                else:
+                    text = "\n".join(cell_text).strip()
+                row.extend([text] * span)
+            elif depth == 1 and tag == W + "tr":
+                rows.append(row)
+                prev_row, row = row, []
+                el.clear()  # 큰 표도 행 단위로 해제 (표 요소는 끝날 때 비운다)
+            elif tag == W + "tbl":
+                depth -= 1
+                if depth == 0:
+                    prev_row = []
+            elif tag == W + "body":
+                break
+
+            if depth == 0 and tag in (W + "p", W + "tbl"):
+                el.clear()  # 처리가 끝난 최상위 요소는 메모리에서 해제
+
+    return rows, paragraphs
+
+
+# ── PPTX ──
+
+def slide_parts(zf: zipfile.ZipFile) -> list[str]:
+    """presentation.xml의 슬라이드 순서대로 슬라이드 파트 경로를 반환한다."""
+    rels = fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {
+        rel.get("Id"): posixpath.normpath(posixpath.join("ppt", rel.get("Target")))
+        for rel in rels.iter(PKG_REL + "Relationship")
+    }
+    pres = fromstring(zf.read("ppt/presentation.xml"))
+    lst = pres.find(P + "sldIdLst")
+    if lst is None:
+        return []
+    return [targets[s.get(R + "id")] for s in lst if s.get(R + "id") in targets]
+
+
+def paragraph_text(p) -> str:
+    return "".join(
+        (t.text or "") if t.tag == A + "t" else "\n"
+        for t in p.iter() if t.tag in (A + "t", A + "br")
+    )
+
+
+def shape_items(shape):
+    """spTree 바로 아래 도형 하나에서 표 행(list)과 텍스트 단락(str)을 꺼낸다."""
+    if shape.tag == P + "graphicFrame":
+        tbl = shape.find(f".//{A}tbl")
+        if tbl is not None:
+            for tr in tbl.iter(A + "tr"):
+                yield [
+                    "\n".join(paragraph_text(p) for p in tc.iter(A + "p")).strip()
+                    for tc in tr.findall(A + "tc")
+                ]
+    elif shape.tag == P + "sp":
+        body = shape.find(P + "txBody")
+        if body is not None:
+            for p in body.findall(A + "p"):
+                text = paragraph_text(p).strip()
+                if text:
+                    yield text
+
+
+def iter_pptx(source):
+    """슬라이드 번호와 함께 표 행(list)과 텍스트 단락(str)을 순서대로 내보낸다.
+    python-pptx의 slide.shapes처럼 spTree 바로 아래 도형만 보고,
+    도형 하나가 끝날 때마다 처리한 뒤 메모리에서 해제한다."""
+    shape_path = [P + "cSld", P + "spTree"]
+    with zipfile.ZipFile(source) as zf:
+        for slide_num, part in enumerate(slide_parts(zf), 1):
+            stack: list[str] = []   # 루트(p:sld)부터 현재 요소까지의 태그
+            with zf.open(part) as f:
+                for event, el in iterparse(f, events=("start", "end")):
+                    if event == "start":
+                        stack.append(el.tag)
+                        continue
+                    if len(stack) == 4 and stack[1:3] == shape_path:
+                        for item in shape_items(el):
+                            yield slide_num, item
+                        el.clear()  # 처리가 끝난 도형은 해제
+                    stack.pop()
+
+
+# ── HWPX ──
+
+def local_name(tag: str) -> str:
+    """네임스페이스를 뗀 태그 이름 (HWPX는 버전마다 네임스페이스 URI가 다를 수 있다)."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def section_parts(zf: zipfile.ZipFile) -> list[str]:
+    """Contents/section0.xml, section1.xml ... 을 번호 순서대로."""
+    parts = [n for n in zf.namelist() if re.fullmatch(r"Contents/section\d+\.xml", n)]
+    return sorted(parts, key=lambda n: int(re.search(r"\d+", n.rsplit("/", 1)[-1]).group()))
+
+
+def iter_hwpx(source) -> tuple[list[list[str]], list[str]]:
+    """본문 섹션 XML에서 (최상위 표 행 목록, 표 밖 단락 목록)을 추출한다."""
+    rows: list[list[str]] = []
+    paragraphs: list[str] = []
+
+    with zipfile.ZipFile(source) as zf:
+        for part in section_parts(zf):
+            depth = 0                   # 표 중첩 깊이
+            grid: dict[int, dict] = {}  # 행 번호 → {열 번호: 텍스트}
+            tr_index = -1               # cellAddr가 없을 때 쓰는 현재 행 번호
+            cell: dict = {}
+            para_text: list[str] = []
+            cell_text: list[str] = []
+            with zf.open(part) as f:
+                for event, el in iterparse(f, events=("start", "end")):
+                    name = local_name(el.tag)
+                    if event == "start":
+                        if name == "tbl":
+                            depth += 1
+                        elif depth == 1 and name == "tr":
+                            tr_index += 1
+                        elif depth == 1 and name == "tc":
+                            cell, cell_text = {"col": None, "row": None, "colspan": 1, "rowspan": 1}, []
+                        continue
+
+                    if name == "t":
+                        para_text.append("".join(el.itertext()))
+                    elif name == "p":
+                        text = "".join(para_text)
+                        para_text = []
+                        if depth == 0:
+                            if text.strip():
+                                paragraphs.append(text.strip())
+                        elif depth == 1:
+                            cell_text.append(text)
+                    elif depth == 1 and name == "cellAddr":
+                        cell["col"] = int(el.get("colAddr", 0))
+                        cell["row"] = int(el.get("rowAddr", 0))
+                    elif depth == 1 and name == "cellSpan":
+                        cell["colspan"] = max(int(el.get("colSpan", 1)), 1)
+                        cell["rowspan"] = max(int(el.get("rowSpan", 1)), 1)
+                    elif depth == 1 and name == "tc":
+                        r = cell["row"] if cell["row"] is not None else tr_index
+                        c = cell["col"]
+                        if c is None:
+                            # 주소가 없으면 위 행에서 내려온 병합 영역을 건너뛴 첫 빈 열
+                            c = 0
+                            while c in grid.get(r, {}):
+                                c += 1
+                        text = "\n".join(cell_text).strip()
+                        for dr in range(cell["rowspan"]):
+                            for dc in range(cell["colspan"]):
+                                grid.setdefault(r + dr, {})[c + dc] = text
+                    elif depth == 1 and name == "tr":
+                        el.clear()  # 셀 텍스트는 grid에 옮겼으므로 행 단위로 해제
+                    elif name == "tbl":
+                        depth -= 1
+                        if depth == 0:
+                            width = max((max(cols) + 1 for cols in grid.values() if cols), default=0)
+                            for r in sorted(grid):
+                                if grid[r]:
+                                    rows.append([grid[r].get(c, "") for c in range(width)])
+                            grid, tr_index = {}, -1
+
+                    if depth == 0 and name in ("p", "tbl"):
+                        el.clear()  # 처리가 끝난 최상위 요소는 메모리에서 해제
+
+    return rows, paragraphs
@@ -4,38 +4,62 @@
 변환이 불가능한 파일은 원본 그대로 보존한다.
 """
 import csv
+import mmap
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Callable
 
 import pandas as pd
 
+import storage
+from formats import expected_format, sniff
+
+PDF_BATCH_PAGES = 50  # 이 쪽수를 넘는 PDF는 배치 단위로 단명 프로세스에서 처리
+PDF_WORKERS = 2       # PDF 배치 처리 프로세스 수
+PDF_BATCHING = True   # 파일마다 격리 프로세스에서 측정하는 parse --profile은 끈다 (측정·상한이 자식에만 걸리므로)
+
+
+# 형식 이름(formats.sniff 결과) → 파서 함수
+PARSERS: dict[str, Callable[[Path], pd.DataFrame | None]] = {}
+
+
+def register_parser(*formats: str):
+    """파서 함수를 하나 이상의 형식 이름으로 등록한다. 같은 형식을 다시 등록하면 덮어쓴다."""
+    def register(func):
+        for fmt in formats:
+            PARSERS[fmt] = func
+        return func
+    return register
+
 
 def parse_file(file_path: Path) -> pd.DataFrame | None:
-    """파일 형식에 따라 적절한 파서를 호출하고, DataFrame을 반환한다.
+    """파일 내용으로 형식을 판별해 등록된 파서를 호출하고, DataFrame을 반환한다.
+    확장자가 틀린 파일도 실제 형식의 파서로 보내고, 지원하지 않는 형식은 열어 보지 않고 건너뛴다.
     파싱 불가 시 None을 반환한다."""
-    suffix = file_path.suffix.lower()
     try:
-        if suffix in (".xlsx", ".xls"):
-            return parse_excel(file_path)
-        elif suffix == ".pdf":
-            return parse_pdf(file_path)
-        elif suffix in (".doc", ".docx"):
-            return parse_docx(file_path)
-        elif suffix in (".ppt", ".pptx"):
-            return parse_pptx(file_path)
-        elif suffix in (".hwp", ".hwpx"):
-            return parse_hwp(file_path)
-        elif suffix in (".jpg", ".jpeg", ".png", ".gif"):
-            return parse_image(file_path)
-        elif suffix == ".txt":
-            return parse_txt(file_path)
+        fmt = sniff(file_path)
+    except Exception as e:
+        print(f"    [파싱 실패] {file_path.name}: 형식 판별 오류 — {e}")
+        return None
+    parser = PARSERS.get(fmt)
+    if parser is None:
+        print(f"    [건너뜀] {file_path.name}: {'형식 판별 불가' if fmt is None else f'미지원 형식({fmt})'}")
+        return None
+    if fmt != expected_format(file_path):
+        print(f"    [형식] {file_path.name}: 확장자와 달리 {fmt} 형식으로 처리")
+    try:
+        return parser(file_path)
     except Exception as e:
         print(f"    [파싱 실패] {file_path.name}: {e}")
     return None
 
 
+@register_parser("xlsx", "xls")
 def parse_excel(path: Path) -> pd.DataFrame | None:
-    """엑셀 파일의 모든 시트를 합쳐 DataFrame으로 반환."""
-    xls = pd.ExcelFile(path, engine="openpyxl" if path.suffix == ".xlsx" else None)
+    """엑셀 파일의 모든 시트를 합쳐 DataFrame으로 반환. (엔진은 pandas가 내용으로 고른다)"""
+    xls = pd.ExcelFile(storage.seekable_source(path))
     frames = []
     for sheet in xls.sheet_names:
         df = pd.read_excel(xls, sheet_name=sheet, header=None)
@@ -46,12 +70,80 @@ def parse_excel(path: Path) -> pd.DataFrame | None:
     return None
 
 
+@register_parser("pdf")
 def parse_pdf(path: Path) -> pd.DataFrame | None:
-    """PDF에서 테이블을 추출한다."""
+    """PDF에서 테이블을 추출한다.
+    긴 문서는 PDF_BATCH_PAGES쪽씩 나눠 작업마다 새로 뜨는 프로세스에서 처리해
+    pdfminer 객체가 메인 프로세스에 누적되지 않게 한다.
+    압축 저장본은 메모리 버퍼로 풀어 읽고, 배치로 나눌 때만 작업자들이 같은 파일을 메모리 맵으로
+    열 수 있게 경로가 있는 임시 파일로 한 번 옮긴다."""
+    source = storage.seekable_source(path)
+    try:
+        page_count = pdf_page_count(source)
+        if PDF_BATCHING and page_count > PDF_BATCH_PAGES:
+            with storage.materialized(path, source) as plain:
+                rows = extract_pdf_batches(plain, page_count)
+        else:
+            rows = extract_pdf_rows(source)
+    finally:
+        if not isinstance(source, Path):
+            source.close()
+    if rows:
+        max_cols = max(len(r) for r in rows)
+        rows = [r + [""] * (max_cols - len(r)) for r in rows]
+        df = pd.DataFrame(rows)
+        df.attrs["pages"] = page_count
+        return df
+    return None
+
+
+def extract_pdf_batches(path: Path, page_count: int) -> list[list]:
+    batches = [
+        (path, start, min(start + PDF_BATCH_PAGES, page_count))
+        for start in range(0, page_count, PDF_BATCH_PAGES)
+    ]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(PDF_WORKERS, len(batches)), mp_context=ctx, max_tasks_per_child=1,
+        initializer=ignore_sigint,
+    ) as pool:
+        return [row for part in pool.map(extract_pdf_rows, *zip(*batches)) for row in part]
+
+
+def ignore_sigint():
+    """배치 작업자는 Ctrl+C를 무시한다 — 종료 시점은 부모(GracefulShutdown)가 정한다."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def open_pdf(source):
+    """경로는 파일 전체를 읽어 들이지 않고 메모리 맵 버퍼로, 압축 해제 버퍼(seekable_source)는 그대로 연다.
+    (buf, pdf)를 반환하며 buf는 여기서 만든 메모리 맵일 때만 닫는다."""
     import pdfplumber
+    if not isinstance(source, Path):
+        source.seek(0)
+        return None, pdfplumber.open(source)
+    with open(source, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return buf, pdfplumber.open(buf)
+
+
+def pdf_page_count(source) -> int:
+    buf, pdf = open_pdf(source)
+    try:
+        return len(pdf.pages)
+    finally:
+        pdf.close()
+        if buf is not None:
+            buf.close()
+
+
+def extract_pdf_rows(source, start: int = 0, stop: int | None = None) -> list[list]:
+    """[start, stop) 쪽의 테이블 행(테이블이 없으면 텍스트 줄)을 추출한다.
+    쪽마다 처리 직후 캐시(chars/lines/rects 등)를 비운다."""
     rows = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
+    buf, pdf = open_pdf(source)
+    try:
+        for page in pdf.pages[start:stop]:
             tables = page.extract_tables()
             for table in tables:
                 for row in table:
@@ -62,6 +154,22 @@ def parse_pdf(path: Path) -> pd.DataFrame | None:
                 if text:
                     for line in text.split("\n"):
                         rows.append([line.strip()])
+            page.close()
+    finally:
+        pdf.close()
+        if buf is not None:
+            buf.close()
+    return rows
+
+
+@register_parser("docx")
+def parse_docx(path: Path) -> pd.DataFrame | None:
+    """DOCX에서 테이블과 텍스트를 추출한다. (word/document.xml 직접 파싱)"""
+    from ooxml import iter_docx
+    rows, paragraphs = iter_docx(storage.seekable_source(path))
+    # 테이블이 없으면 단락 텍스트
+    if not rows:
+        rows = [[text] for text in paragraphs]
     if rows:
         max_cols = max(len(r) for r in rows)
         rows = [r + [""] * (max_cols - len(r)) for r in rows]
@@ -69,20 +177,14 @@ def parse_pdf(path: Path) -> pd.DataFrame | None:
     return None
 
 
-def parse_docx(path: Path) -> pd.DataFrame | None:
-    """DOCX에서 테이블과 텍스트를 추출한다."""
-    from docx import Document
-    doc = Document(str(path))
-    rows = []
-    # 테이블 추출
-    for table in doc.tables:
-        for row in table.rows:
-            rows.append([cell.text.strip() for cell in row.cells])
+@register_parser("hwpx")
+def parse_hwpx(path: Path) -> pd.DataFrame | None:
+    """HWPX(한글 2014+ XML 형식)에서 테이블과 텍스트를 추출한다. (Contents/section*.xml 직접 파싱)"""
+    from ooxml import iter_hwpx
+    rows, paragraphs = iter_hwpx(storage.seekable_source(path))
     # 테이블이 없으면 단락 텍스트
     if not rows:
-        for para in doc.paragraphs:
-            if para.text.strip():
-                rows.append([para.text.strip()])
+        rows = [[text] for text in paragraphs]
     if rows:
         max_cols = max(len(r) for r in rows)
         rows = [r + [""] * (max_cols - len(r)) for r in rows]
@@ -90,36 +192,36 @@ def parse_docx(path: Path) -> pd.DataFrame | None:
     return None
 
 
+@register_parser("pptx")
 def parse_pptx(path: Path) -> pd.DataFrame | None:
-    """PPTX에서 테이블과 텍스트를 추출한다."""
-    from pptx import Presentation
-    prs = Presentation(str(path))
+    """PPTX에서 테이블과 텍스트를 추출한다. (슬라이드 XML 직접 파싱)"""
+    from ooxml import iter_pptx
     rows = []
-    for slide_num, slide in enumerate(prs.slides, 1):
-        for shape in slide.shapes:
-            if shape.has_table:
-                for row in shape.table.rows:
-                    cells = [cell.text.strip() for cell in row.cells]
-                    rows.append([f"slide_{slide_num}"] + cells)
-            elif shape.has_text_frame:
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    if text:
-                        rows.append([f"slide_{slide_num}", text])
+    for slide_num, content in iter_pptx(storage.seekable_source(path)):
+        if isinstance(content, list):
+            rows.append([f"slide_{slide_num}"] + content)
+        else:
+            rows.append([f"slide_{slide_num}", content])
     if rows:
         max_cols = max(len(r) for r in rows)
         rows = [r + [""] * (max_cols - len(r)) for r in rows]
-        return pd.DataFrame(rows)
+        df = pd.DataFrame(rows)
+        df.attrs["pages"] = slide_num  # 내용이 있는 마지막 슬라이드 번호
+        return df
     return None
 
 
+@register_parser("hwp")
 def parse_hwp(path: Path) -> pd.DataFrame | None:
     """HWP 파일에서 텍스트를 추출한다. (olefile 기반)"""
     try:
         import olefile
-        if not olefile.isOleFile(str(path)):
+        source = storage.seekable_source(path)
+        if isinstance(source, Path):
+            source = str(source)
+        if not olefile.isOleFile(source):
             return None
-        ole = olefile.OleFileIO(str(path))
+        ole = olefile.OleFileIO(source)
         if ole.exists("PrvText"):
             data = ole.openstream("PrvText").read()
             text = data.decode("utf-16-le", errors="ignore")
@@ -134,12 +236,13 @@ def parse_hwp(path: Path) -> pd.DataFrame | None:
     return None
 
 
+@register_parser("png", "jpeg", "gif", "bmp", "tiff")
 def parse_image(path: Path) -> pd.DataFrame | None:
     """이미지에서 OCR로 텍스트를 추출한다."""
     try:
         import pytesseract
         from PIL import Image
-        img = Image.open(path)
+        img = Image.open(storage.seekable_source(path))
         text = pytesseract.image_to_string(img, lang="kor+eng")
         rows = [[line.strip()] for line in text.split("\n") if line.strip()]
         if rows:
@@ -151,11 +254,13 @@ def parse_image(path: Path) -> pd.DataFrame | None:
     return None
 
 
+@register_parser("txt")
 def parse_txt(path: Path) -> pd.DataFrame | None:
     """텍스트 파일을 DataFrame으로 변환."""
+    data = storage.read_blob(path)
     for enc in ("utf-8", "cp949", "euc-kr"):
         try:
-            text = path.read_text(encoding=enc)
+            text = data.decode(enc)
             rows = [[line.strip()] for line in text.split("\n") if line.strip()]
             if rows:
                 return pd.DataFrame(rows, columns=["text"])
@@ -165,5 +270,7 @@ def parse_txt(path: Path) -> pd.DataFrame | None:
 
 
 def save_as_csv(df: pd.DataFrame, output_path: Path):
-    """DataFrame을 CSV로 저장."""
-    df.to_csv(output_path, index=False, encoding="utf-8-sig")
\ No newline at end of file
+    """DataFrame을 CSV로 저장. 임시 파일에 쓴 뒤 교체해 중단돼도 잘린 CSV가 남지 않게 한다."""
+    tmp = output_path.with_suffix(".tmp")
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    tmp.replace(output_path)
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+단지별 장기수선계획 개정 이력 (output/plan_history.sqlite).
+같은 단지(kaptCode)가 올린 계획서(원본, 정기조정 개정본)마다 정규화 비용표 행
+(output/normalized/{seq}_{file_seq}.csv)을 저장하고, 새 개정본이 들어오면
+직전 현재본과 행 단위로 비교해 변경분(diff)만으로 집계를 갱신한다.
+
+  revisions    — 단지별 개정본 (seq, 날짜, 행 수, 직전 대비 추가/삭제/변경 수, 현재본 여부)
+  plan_rows    — 개정본별 정규화 행 (구분/항목/수선방법/열 + 같은 키 안의 순번으로 식별)
+  plan_diffs   — 현재본이 바뀔 때의 행 단위 변경 내역 (added / removed / changed)
+  plan_totals  — 단지·연도별 계획 금액 합 (현재본 기준, 변경분만큼만 가감)
+  region_totals — 시도·시군구·연도별 계획 금액 합 (plan_totals와 함께 가감)
+
+바뀐 정규화 CSV만 다시 읽으므로(sources 테이블), 야간 갱신 비용은 전체 건수가 아니라
+새로 들어오거나 바뀐 개정본 수에 비례한다. 현재본보다 오래된 개정본(예전 정기조정을
+뒤늦게 받은 경우)은 이력에만 넣고 집계는 건드리지 않는다.
+
+예) 한 단지의 최근 변경 내역:
+    SELECT kind, item, "column", old_value, new_value FROM plan_diffs
+    WHERE kapt_code = 'A41782301' ORDER BY to_seq DESC;
+"""
+import csv
+import re
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+
+import storage
+import targeting
+
+BASE_DIR = Path(__file__).parent
+OUTPUT_DIR = BASE_DIR / "output"
+HISTORY_DB = OUTPUT_DIR / "plan_history.sqlite"
+NORMALIZED_DIR = OUTPUT_DIR / "normalized"
+APT_MAPPING_CSV = OUTPUT_DIR / "apt_mapping.csv"
+
+NORMALIZED_NAME_RE = re.compile(r"^(\d+)_(\d+)\.csv$")
+ROW_KEY = ("section", "item", "method", "column")  # 개정본 사이에서 같은 행을 찾는 키 (+ 순번)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS revisions (
+    kapt_code TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    date TEXT,
+    row_count INTEGER NOT NULL,
+    added INTEGER, removed INTEGER, changed INTEGER,
+    is_current INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kapt_code, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_revisions_seq ON revisions (seq);
+
+CREATE TABLE IF NOT EXISTS plan_rows (
+    kapt_code TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    section TEXT NOT NULL, item TEXT NOT NULL, method TEXT NOT NULL, "column" TEXT NOT NULL,
+    nth INTEGER NOT NULL,
+    year INTEGER, cycle_years REAL, value REAL,
+    PRIMARY KEY (kapt_code, seq, section, item, method, "column", nth)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS plan_diffs (
+    kapt_code TEXT NOT NULL,
+    from_seq INTEGER,
+    to_seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    section TEXT, item TEXT, method TEXT, "column" TEXT, nth INTEGER,
+    old_value REAL, new_value REAL, old_cycle REAL, new_cycle REAL
+);
+CREATE INDEX IF NOT EXISTS idx_plan_diffs_code ON plan_diffs (kapt_code, to_seq);
+
+CREATE TABLE IF NOT EXISTS plan_totals (
+    kapt_code TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (kapt_code, year)
+);
+
+CREATE TABLE IF NOT EXISTS region_totals (
+    sido TEXT NOT NULL,
+    sigungu TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (sido, sigungu, year)
+);
+
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def to_float(value) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number  # NaN → None
+
+
+# ── 정규화 행 읽기 / 비교 ──
+
+def read_plan_rows(paths: list[Path]) -> dict[tuple, tuple]:
+    """한 개정본(게시글)의 정규화 CSV들 → {(구분, 항목, 방법, 열, 순번): (연도, 주기, 금액)}.
+    행 번호와 시트 이름은 개정본마다 달라지므로 키에 넣지 않고, 같은 키가 반복되면 순번으로 구분한다."""
+    rows = {}
+    seen = defaultdict(int)
+    for path in paths:
+        with storage.open_text(path) as f:
+            for r in csv.DictReader(f):
+                key = tuple((r.get(k) or "").strip() for k in ROW_KEY)
+                nth = seen[key]
+                seen[key] += 1
+                year = to_float(r.get("year"))
+                rows[(*key, nth)] = (
+                    int(year) if year is not None else None, to_float(r.get("cycle_years")), to_float(r.get("value")),
+                )
+    return rows
+
+
+def diff_rows(old: dict[tuple, tuple], new: dict[tuple, tuple]) -> list[tuple]:
+    """(kind, key, old, new) 목록. kind는 added / removed / changed (금액 또는 주기 변경)."""
+    changes = []
+    for key, after in new.items():
+        before = old.get(key)
+        if before is None:
+            changes.append(("added", key, None, after))
+        elif before != after:
+            changes.append(("changed", key, before, after))
+    for key, before in old.items():
+        if key not in new:
+            changes.append(("removed", key, before, None))
+    return changes
+
+
+def total_deltas(changes: list[tuple]) -> dict[int, float]:
+    """변경 내역 → 연도별 계획 금액 증감. 연도 열의 금액만 더한다 (단가·수량 열은 합산 대상이 아님)."""
+    deltas = defaultdict(float)
+    for _, _, before, after in changes:
+        for row, sign in ((before, -1), (after, 1)):
+            if row and row[0] is not None and row[2] is not None:
+                deltas[row[0]] += sign * row[2]
+    return {year: delta for year, delta in deltas.items() if delta}
+
+
+# ── 이력 저장소 ──
+
+class PlanHistory:
+    def __init__(self, path: Path = HISTORY_DB):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        self._regions = None
+
+    # ── 변경 추적 ──
+
+    def changed(self, name: str, path: Path) -> bool:
+        st = path.stat()
+        row = self.db.execute("SELECT mtime, size FROM sources WHERE name = ?", (name,)).fetchone()
+        return row != (st.st_mtime, st.st_size)
+
+    def mark(self, name: str, path: Path):
+        st = path.stat()
+        self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (name, st.st_mtime, st.st_size))
+
+    def regions(self) -> dict[str, tuple[str, str]]:
+        """kaptCode → (시도, 시군구)."""
+        if self._regions is None:
+            self._regions = {}
+            if APT_MAPPING_CSV.exists():
+                with storage.open_text(APT_MAPPING_CSV) as f:
+                    self._regions = {r["kaptCode"]: (r.get("시도") or "", r.get("시군구") or "")
+                                     for r in csv.DictReader(f) if r.get("kaptCode")}
+        return self._regions
+
+    # ── 조회 ──
+
+    def current(self, kapt_code: str) -> tuple[int, str] | None:
+        """단지의 현재본 (seq, date)."""
+        return self.db.execute(
+            "SELECT seq, date FROM revisions WHERE kapt_code = ? AND is_current = 1", (kapt_code,)
+        ).fetchone()
+
+    def stored_rows(self, kapt_code: str, seq: int) -> dict[tuple, tuple]:
+        return {
+            (section, item, method, column, nth): (year, cycle, value)
+            for section, item, method, column, nth, year, cycle, value in self.db.execute(
+                'SELECT section, item, method, "column", nth, year, cycle_years, value '
+                "FROM plan_rows WHERE kapt_code = ? AND seq = ?", (kapt_code, seq),
+            )
+        }
+
+    # ── 갱신 ──
+
+    def ingest(self, kapt_code: str, seq: int, date: str, rows: dict[tuple, tuple]) -> list[tuple] | None:
+        """개정본 하나를 저장한다. 현재본 이후의 개정본(또는 현재본을 다시 파싱한 것)이면
+        현재본과 비교한 변경 내역으로 집계를 가감하고 현재본으로 삼는다. 변경 내역(현재본이 아니면 None) 반환."""
+        current = self.current(kapt_code)
+        becomes_current = current is None or (date or "", seq) >= (current[1] or "", current[0])
+        # 비교 기준은 덮어쓰기 전에 읽는다 (현재본을 다시 파싱한 경우 같은 seq의 예전 행)
+        baseline = self.stored_rows(kapt_code, current[0]) if becomes_current and current else {}
+
+        self.db.execute("DELETE FROM plan_rows WHERE kapt_code = ? AND seq = ?", (kapt_code, seq))
+        self.db.executemany(
+            "INSERT INTO plan_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(kapt_code, seq, *key, *values) for key, values in rows.items()],
+        )
+        if not becomes_current:
+            self.db.execute(
+                "INSERT OR REPLACE INTO revisions (kapt_code, seq, date, row_count) VALUES (?, ?, ?, ?)",
+                (kapt_code, seq, date, len(rows)),
+            )
+            return None
+
+        changes = diff_rows(baseline, rows)
+        counts = {kind: sum(1 for c in changes if c[0] == kind) for kind in ("added", "removed", "changed")}
+
+        self.db.execute("UPDATE revisions SET is_current = 0 WHERE kapt_code = ?", (kapt_code,))
+        self.db.execute(
+            "INSERT OR REPLACE INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+            (kapt_code, seq, date, len(rows), counts["added"], counts["removed"], counts["changed"]),
+        )
+        self.db.executemany(
+            "INSERT INTO plan_diffs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(
+                kapt_code, current[0] if current else None, seq, kind, *key,
+                before[2] if before else None, after[2] if after else None,
+                before[1] if before else None, after[1] if after else None,
+            ) for kind, key, before, after in changes],
+        )
+        self.apply_deltas(kapt_code, total_deltas(changes))
+        return changes
+
+    def apply_deltas(self, kapt_code: str, deltas: dict[int, float]):
+        if not deltas:
+            return
+        sido, sigungu = self.regions().get(kapt_code, ("", ""))
+        self.db.executemany("""
+            INSERT INTO plan_totals VALUES (?, ?, ?)
+            ON CONFLICT (kapt_code, year) DO UPDATE SET total = total + excluded.total
+        """, [(kapt_code, year, delta) for year, delta in deltas.items()])
+        self.db.executemany("""
+            INSERT INTO region_totals VALUES (?, ?, ?, ?)
+            ON CONFLICT (sido, sigungu, year) DO UPDATE SET total = total + excluded.total
+        """, [(sido, sigungu, year, delta) for year, delta in deltas.items()])
+
+    def update(self, normalized_dir: Path = NORMALIZED_DIR) -> dict:
+        """바뀐 정규화 CSV가 있는 게시글만 단지별 이력에 반영한다.
+        단지는 targeting.annotate로 한 단지로 좁혀진 게시글만 쓰고, 단지를 모르는 게시글은
+        반영된 것으로 기록하지 않아 매핑이 늘어난 뒤의 갱신에서 다시 시도한다."""
+        groups = defaultdict(list)  # seq → 정규화 CSV 경로들
+        if normalized_dir.exists():
+            for path in normalized_dir.glob("*.csv*"):
+                m = NORMALIZED_NAME_RE.match(storage.logical_path(path).name)
+                if m:
+                    groups[m.group(1)].append(path)
+        pending = {seq: sorted(paths) for seq, paths in groups.items()
+                   if any(self.changed(f"normalized/{storage.logical_path(p).name}", p) for p in paths)}
+        counts = {"revisions": 0, "current": 0, "unmatched": 0, "added": 0, "removed": 0, "changed": 0}
+        if not pending:
+            return counts
+
+        posts = {p["seq"]: p for p in targeting.load_posts()}
+        rows = [posts.get(seq, {"seq": seq, "title": "", "date": ""}) for seq in pending]
+        # 같은 단지의 개정본은 오래된 것부터 넣어야 diff가 개정 순서를 따른다
+        for post in sorted(targeting.annotate(rows), key=targeting.revision_key):
+            seq = post["seq"]
+            if len(post["_codes"]) != 1:
+                # 처리 완료로 기록하지 않는다 — apt_mapping.csv나 확인된 kaptCode가 늘면 다음 갱신에서 다시 시도
+                counts["unmatched"] += 1
+                continue
+            with self.db:
+                kapt_code = post["_codes"][0]
+                changes = self.ingest(kapt_code, int(seq), post.get("date", ""), read_plan_rows(pending[seq]))
+                for path in pending[seq]:
+                    self.mark(f"normalized/{storage.logical_path(path).name}", path)
+                counts["revisions"] += 1
+                if changes is not None:
+                    counts["current"] += 1
+                    for kind, *_ in changes:
+                        counts[kind] += 1
+        return counts
+
+    def close(self):
+        self.db.close()
+
+
+def update_history():
+    history = PlanHistory()
+    try:
+        print(f"[이력 갱신] {HISTORY_DB}")
+        counts = history.update()
+        print(f"    개정본 {counts['revisions']}건 반영 (현재본 갱신 {counts['current']}건, 단지 미확인 {counts['unmatched']}건)")
+        print(f"    변경 행: 추가 {counts['added']}, 삭제 {counts['removed']}, 변경 {counts['changed']}")
+    finally:
+        history.close()
+
+
+def print_history(kapt_code: str):
+    history = PlanHistory()
+    try:
+        revisions = history.db.execute(
+            "SELECT seq, date, row_count, added, removed, changed, is_current FROM revisions "
+            "WHERE kapt_code = ? ORDER BY date, seq", (kapt_code,),
+        ).fetchall()
+        if not revisions:
+            print(f"{kapt_code}: 저장된 개정본이 없습니다.")
+            return
+        print(f"[이력] {kapt_code} — 개정본 {len(revisions)}건")
+        for seq, date, row_count, added, removed, changed, is_current in revisions:
+            delta = f"+{added} -{removed} ~{changed}" if added is not None else "이력만 저장"
+            print(f"    {'*' if is_current else ' '} {date or '-':<10}  seq={seq:<8} {row_count:>5}행  {delta}")
+        totals = history.db.execute(
+            "SELECT year, total FROM plan_totals WHERE kapt_code = ? AND total != 0 ORDER BY year", (kapt_code,),
+        ).fetchall()
+        if totals:
+            print("    연도별 계획 금액: " + ", ".join(f"{year} {total:,.0f}" for year, total in totals))
+    finally:
+        history.close()
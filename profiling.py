@@ -0,0 +1,250 @@
+"""
+파일별 파싱 프로파일링과 격리.
+parse --profile 모드에서 파일마다 새 프로세스를 띄워 파싱하면서
+wall/CPU 시간, 메모리 최고치(tracemalloc, RSS), 쪽 수, 행 수를 output/parse_profile.csv에 기록한다.
+
+시간 상한(PARSE_TIMEOUT)을 넘기거나 메모리 상한(MAX_MEMORY_MB)에 걸린 파일은
+output/parse_deferred.json 지연 대기열로 옮겨 본 배치를 막지 않게 하고,
+나중에 parse --deferred로 상한 없이 따로 처리한다.
+--cprofile 초를 주면 그보다 오래 걸린 파일의 cProfile 통계를 output/profiles/에 남긴다.
+tracemalloc은 pdfminer 같은 순수 파이썬 파서를 몇 배 느리게 하므로 --tracemalloc을 줄 때만 켠다
+(기본은 RSS 최고치만 기록).
+격리 프로세스 안에서는 PDF 배치 풀을 끄고(측정과 메모리 상한이 한 프로세스에 걸리게),
+OCR 등 파서가 띄운 자식 프로세스의 CPU 시간도 더한다. 자식은 자기 세션(프로세스 그룹)에서 돌므로
+시간 초과 때 그룹 전체를 종료한다.
+"""
+import cProfile
+import csv
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource  # Unix 전용 — 없으면 RSS 측정/메모리 상한 생략
+except ImportError:
+    resource = None
+
+import parsers
+import storage
+from formats import sniff
+from parsers import PARSERS
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+PROFILE_CSV = OUTPUT_DIR / "parse_profile.csv"
+DEFERRED_FILE = OUTPUT_DIR / "parse_deferred.json"
+PROFILE_DIR = OUTPUT_DIR / "profiles"
+
+PARSE_TIMEOUT = 300    # 파일 하나의 파싱 시간 상한 (초)
+MAX_MEMORY_MB = 2048   # 파일 하나의 추가 메모리 상한 (MB, 주소 공간 기준)
+
+PROFILE_FIELDS = [
+    "file", "format", "size_kb", "status", "wall_s", "cpu_s",
+    "peak_mb", "rss_mb", "pages", "rows", "error",
+]
+QUARANTINE = {"timeout", "memory", "crashed"}
+
+# 메모리 상한을 걸기 전에 미리 불러 둘 파서 의존성 (공유 라이브러리 매핑이 상한에 걸리지 않게)
+PRELOAD_MODULES = ("pdfplumber", "openpyxl", "olefile", "PIL.Image", "pytesseract")
+
+
+# ── 측정 ──
+
+def children_cpu() -> float:
+    """종료된 자식 프로세스(OCR 등)가 쓴 CPU 시간 합 (초)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def rss_mb() -> float | None:
+    """현재 프로세스와 (종료된) 자식 프로세스의 최대 RSS (MB)."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / 1024  # Linux는 KB 단위
+
+
+def profile_parse(path: Path, trace_memory: bool = False, profiler: cProfile.Profile | None = None):
+    """파일 하나를 파싱하며 측정한다. (DataFrame 또는 None, 측정값 dict) 반환.
+    parse_file과 달리 예외를 삼키지 않고 status/error에 기록한다."""
+    stats = {
+        "file": storage.logical_path(path).name, "format": "", "size_kb": round(path.stat().st_size / 1024, 1),
+        "status": "", "wall_s": 0.0, "cpu_s": 0.0, "peak_mb": "", "rss_mb": "",
+        "pages": "", "rows": 0, "error": "",
+    }
+    df = None
+    w0, c0, k0 = time.perf_counter(), time.process_time(), children_cpu()
+    if trace_memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        fmt = sniff(path)
+        stats["format"] = fmt or ""
+        parser = PARSERS.get(fmt)
+        if parser is None:
+            stats["status"] = "unsupported"
+        else:
+            df = parser(path)
+            stats["status"] = "ok" if df is not None and not df.empty else "empty"
+    except MemoryError:
+        df = None
+        stats["status"] = "memory"
+    except Exception as e:
+        stats["status"] = "error"
+        stats["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if profiler:
+            profiler.disable()
+        if trace_memory:
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.stop()
+    stats["wall_s"] = round(time.perf_counter() - w0, 3)
+    stats["cpu_s"] = round(time.process_time() - c0 + children_cpu() - k0, 3)
+    rss = rss_mb()
+    stats["rss_mb"] = round(rss, 1) if rss is not None else ""
+    if df is not None:
+        stats["rows"] = len(df)
+        stats["pages"] = df.attrs.get("pages", "")
+    return df, stats
+
+
+def limit_memory(max_mb: int):
+    """현재 주소 공간 크기 + max_mb로 RLIMIT_AS를 건다 (Linux, /proc 있을 때만)."""
+    if resource is None or not os.path.exists("/proc/self/statm"):
+        return
+    with open("/proc/self/statm") as f:
+        current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    limit = current + max_mb * 2**20
+    resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+
+def child(conn, path: Path, max_mb: int | None, cprofile_over: float | None, trace_memory: bool):
+    """격리 프로세스 본체: 상한을 걸고 파싱한 뒤 결과를 파이프로 돌려준다.
+    Ctrl+C는 부모가 정상 종료로 처리하므로 무시한다 (파싱 중인 파일이 crashed로 격리되지 않게)."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(os, "setsid"):
+        os.setsid()  # 손자 프로세스까지 한 그룹으로 묶어 시간 초과 때 함께 종료
+    parsers.PDF_BATCHING = False
+    if max_mb:
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+        limit_memory(max_mb)
+    profiler = cProfile.Profile() if cprofile_over is not None else None
+    df, stats = profile_parse(path, trace_memory, profiler)
+    if profiler and stats["wall_s"] >= cprofile_over:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(PROFILE_DIR / f"{stats['file']}.prof")
+    try:
+        conn.send((df, stats))
+    except MemoryError:
+        stats["status"] = "memory"
+        conn.send((None, stats))
+    conn.close()
+
+
+# ── 격리 실행 ──
+
+def kill_group(proc):
+    """격리 프로세스와 그것이 띄운 프로세스(같은 프로세스 그룹)를 모두 종료한다."""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:  # setsid 전이라 아직 그룹이 없으면 자식만
+            proc.kill()
+    else:
+        proc.terminate()
+    proc.join()
+
+
+class ProfiledRunner:
+    """파일마다 새 프로세스에서 시간/메모리 상한을 걸고 파싱한다.
+    (PDF 배치처럼 파서가 자식 프로세스를 띄울 수 있어 데몬이 아닌 일반 Process를 쓴다)"""
+
+    def __init__(self, timeout: float | None = PARSE_TIMEOUT, max_mb: int | None = MAX_MEMORY_MB,
+                 cprofile_over: float | None = None, trace_memory: bool = False):
+        self.timeout = timeout
+        self.max_mb = max_mb
+        self.cprofile_over = cprofile_over
+        self.trace_memory = trace_memory
+        self.ctx = multiprocessing.get_context()
+
+    def run(self, path: Path):
+        recv, send = self.ctx.Pipe(duplex=False)
+        proc = self.ctx.Process(
+            target=child, args=(send, path, self.max_mb, self.cprofile_over, self.trace_memory)
+        )
+        start = time.perf_counter()
+        proc.start()
+        send.close()
+        result = None
+        if recv.poll(self.timeout):
+            try:
+                result = recv.recv()
+            except EOFError:
+                result = None
+            proc.join(5)
+        if proc.is_alive():
+            kill_group(proc)
+        recv.close()
+        if result is not None:
+            return result
+
+        elapsed = time.perf_counter() - start
+        status = "timeout" if self.timeout is not None and elapsed >= self.timeout else "crashed"
+        if status == "crashed" and proc.exitcode is not None and proc.exitcode < 0:
+            status = "memory" if self.max_mb else status  # OOM으로 강제 종료된 경우가 대부분
+        return None, {
+            "file": storage.logical_path(path).name, "format": "",
+            "size_kb": round(path.stat().st_size / 1024, 1), "status": status,
+            "wall_s": round(elapsed, 3), "cpu_s": "", "peak_mb": "", "rss_mb": "",
+            "pages": "", "rows": 0, "error": f"exitcode={proc.exitcode}",
+        }
+
+
+# ── 보고서 / 지연 대기열 ──
+
+def write_report(rows: list[dict], path: Path = PROFILE_CSV):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_slowest(rows: list[dict], top: int = 10):
+    timed = sorted((r for r in rows if isinstance(r["wall_s"], float)), key=lambda r: r["wall_s"], reverse=True)
+    print(f"\n[프로파일] 느린 파일 상위 {min(top, len(timed))}개")
+    for r in timed[:top]:
+        print(f"    {r['wall_s']:>8.2f}s  cpu {r['cpu_s']:>7}s  peak {r['peak_mb']:>7}MB  "
+              f"rss {r['rss_mb']:>7}MB  {r['pages'] or '-':>4}쪽  {r['rows']:>6}행  {r['file']}")
+
+
+def load_deferred(path: Path = DEFERRED_FILE) -> dict:
+    """file_path → 격리 사유와 측정값."""
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_deferred(deferred: dict, path: Path = DEFERRED_FILE):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(deferred, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+
+def defer(deferred: dict, file_path: str, stats: dict):
+    deferred[file_path] = {
+        "reason": stats["status"], "wall_s": stats["wall_s"], "error": stats["error"],
+        "at": datetime.now().isoformat(timespec="seconds"),
+    }
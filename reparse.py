@@ -0,0 +1,112 @@
+"""
+응답 캐시만으로 metadata.csv / result.csv를 다시 만든다 (네트워크 요청 없음).
+parse_list_page나 extract_apt_name을 고친 뒤 재크롤링 없이 결과에 반영할 때 쓴다.
+"""
+import csv
+import json
+
+from bs4 import BeautifulSoup
+
+import collect_metadata
+import crawler
+import storage
+from response_cache import ResponseCache
+
+
+def write_csv(path, fieldnames: list[str], rows: list[dict]):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    tmp.replace(path)
+
+
+def write_checkpoint(path, state: dict, csv_path):
+    state["csv_offset"] = csv_path.stat().st_size
+    path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+
+
+def reparse_metadata(cache: ResponseCache) -> int:
+    """캐시된 목록 페이지 HTML에서 metadata.csv를 재생성한다."""
+    pages = {int(params["pageNo"]): html for params, html in cache.entries("boardList")}
+    if not pages:
+        print("    캐시된 목록 페이지가 없습니다.")
+        return 0
+
+    rows, seen = [], set()
+    for page_no in sorted(pages):
+        for item in collect_metadata.parse_list_page(pages[page_no]):
+            if item["seq"] not in seen:
+                seen.add(item["seq"])
+                rows.append(item)
+    write_csv(collect_metadata.METADATA_CSV, collect_metadata.METADATA_FIELDS, rows)
+
+    # 1페이지부터 끊김 없이 캐시된 구간까지만 완료로 기록
+    last_page = 0
+    while last_page + 1 in pages:
+        last_page += 1
+    write_checkpoint(collect_metadata.CHECKPOINT_FILE, {"last_page": last_page}, collect_metadata.METADATA_CSV)
+    print(f"    metadata.csv: 목록 {len(pages)}페이지 → {len(rows)}건")
+    return len(rows)
+
+
+def reparse_results(cache: ResponseCache) -> int:
+    """캐시된 상세 페이지/파일 목록에서 result.csv를 재생성한다.
+    캐시에 없는 게시글은 기존 result.csv 행을 그대로 둔다."""
+    views = {params["seq"]: html for params, html in cache.entries("boardView")}
+    file_lists = {params["seq"]: json.loads(body) for params, body in cache.entries("fileListData")}
+    if not views:
+        print("    캐시된 상세 페이지가 없습니다.")
+        return 0
+
+    existing = {}
+    if crawler.RESULT_CSV.exists():
+        with open(crawler.RESULT_CSV, "r", encoding="utf-8-sig") as f:
+            existing = {r["seq"]: r for r in csv.DictReader(f)}
+
+    rebuilt = 0
+    for item in crawler.load_metadata():
+        seq = item["seq"]
+        if seq not in views:
+            continue
+        soup = BeautifulSoup(views[seq], "lxml")
+        content = soup.select_one(".boardV_cont")
+        apt_name = crawler.extract_apt_name(item["title"], content.get_text() if content else "")
+
+        file_list = file_lists.get(seq) or {}
+        files = file_list.get("data", []) if file_list.get("code") == "SCC" else []
+        file_names, file_paths, status = [], [], "NO_FILE"
+        for f in files:
+            file_names.append(f.get("fileName", "unknown"))
+            dest = crawler.file_dest(f, seq)
+            stored = storage.resolve(dest)
+            if stored and stored.stat().st_size > 0:
+                file_paths.append(str(dest))
+                status = "OK"
+            else:
+                file_paths.append("")
+                status = "FAIL"
+        existing[seq] = crawler.result_row(item, apt_name, files, file_names, file_paths, status)
+        rebuilt += 1
+
+    rows = sorted(existing.values(), key=lambda r: int(r["seq"]), reverse=True)
+    write_csv(crawler.RESULT_CSV, crawler.RESULT_FIELDS, rows)
+    done_seqs = crawler.load_checkpoint() | set(existing)
+    write_checkpoint(
+        crawler.CHECKPOINT_FILE,
+        {"done_seqs": sorted(done_seqs), "retries": crawler.load_retries()},
+        crawler.RESULT_CSV,
+    )
+    print(f"    result.csv: 캐시 {rebuilt}건 재생성, 전체 {len(rows)}건")
+    return rebuilt
+
+
+def reparse_all():
+    cache = ResponseCache()
+    try:
+        print("[재파싱] 응답 캐시 → metadata.csv / result.csv")
+        reparse_metadata(cache)
+        reparse_results(cache)
+    finally:
+        cache.close()
@@ -0,0 +1,99 @@
+"""
+Playwright 라우팅 기반 리소스 차단 정책.
+단계(stage)별로 필요 없는 리소스 유형과 외부 호스트 요청을 abort 하고,
+차단한 요청 수와 절감 바이트(추정)를 집계한다.
+
+  list   — 목록 페이지: HTML 문서만 받는다 (폼 submit은 사이트 JS 없이 동작)
+  detail — 상세 페이지: DextUpload가 fileListData.do를 호출해야 하므로 스크립트/XHR 허용,
+           DextUpload SVG·CSS·이미지·웹폰트는 차단
+
+참고: Playwright는 route가 걸린 컨텍스트에서 HTTP 캐시를 사용하지 않는다.
+"""
+from collections import Counter
+from urllib.parse import urlparse
+
+ALLOWED_HOSTS = ("k-apt.go.kr",)
+
+STAGE_RESOURCE_TYPES = {
+    "list": {"document"},
+    "detail": {"document", "script", "xhr", "fetch"},
+}
+
+# 허용 유형의 응답 크기를 아직 관측하지 못했을 때 쓰는 유형별 평균 크기 추정치 (바이트)
+DEFAULT_SIZES = {
+    "image": 20_000,
+    "font": 60_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+    "media": 200_000,
+}
+
+
+class ResourcePolicy:
+    """컨텍스트 단위 요청 차단기. `stage`를 바꾸면 이후 요청부터 해당 단계 규칙이 적용된다."""
+
+    def __init__(
+        self,
+        stage: str = "list",
+        stage_types: dict[str, set[str]] | None = None,
+        allowed_hosts: tuple[str, ...] = ALLOWED_HOSTS,
+        enabled: bool = True,
+    ):
+        self.stage = stage
+        self.stage_types = stage_types or STAGE_RESOURCE_TYPES
+        self.allowed_hosts = allowed_hosts
+        self.enabled = enabled
+        self.blocked = Counter()        # 유형별 차단 요청 수
+        self.allowed = Counter()        # 유형별 완료된 허용 요청 수
+        self.allowed_bytes = Counter()  # 유형별 허용 응답 본문 크기 합
+
+    async def attach(self, context):
+        """컨텍스트의 모든 요청에 정책을 건다."""
+        if not self.enabled:
+            return
+        await context.route("**/*", self.handle)
+        context.on("requestfinished", self.on_finished)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if host and not any(host == h or host.endswith("." + h) for h in self.allowed_hosts):
+            return True
+        return resource_type not in self.stage_types.get(self.stage, {resource_type})
+
+    async def handle(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked[request.resource_type] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def on_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.allowed[request.resource_type] += 1
+        self.allowed_bytes[request.resource_type] += sizes.get("responseBodySize", 0)
+
+    def saved_bytes(self) -> int:
+        """차단한 요청이 받았을 바이트 추정치. 같은 유형의 관측 평균, 없으면 기본값을 쓴다."""
+        total = 0
+        for rtype, count in self.blocked.items():
+            if self.allowed[rtype]:
+                avg = self.allowed_bytes[rtype] / self.allowed[rtype]
+            else:
+                avg = DEFAULT_SIZES.get(rtype, 0)
+            total += int(avg * count)
+        return total
+
+    def summary(self) -> str:
+        blocked = sum(self.blocked.values())
+        if not blocked:
+            return "[리소스] 차단된 요청 없음"
+        by_type = ", ".join(f"{t} {n}" for t, n in self.blocked.most_common())
+        return (
+            f"[리소스] 차단 {blocked}건 ({by_type}), "
+            f"절감 추정 {self.saved_bytes() / 1_048_576:.1f} MB, "
+            f"허용 응답 {sum(self.allowed_bytes.values()) / 1_048_576:.1f} MB"
+        )
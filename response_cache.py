@@ -0,0 +1,125 @@
+"""
+HTTP 응답 본문 캐시 (boardList.do / boardView.do / fileListData.do).
+본문은 내용 해시(SHA-256)로 주소를 붙여 zlib 압축 파일로 저장하고,
+요청 파라미터 → 본문 해시 매핑은 SQLite 인덱스에 둔다.
+같은 본문은 한 번만 저장되며, TTL이 지난 항목과 용량 초과분(LRU)은 정리된다.
+파서 버그를 고친 뒤 `main.py reparse`로 네트워크 없이 결과를 다시 만들 수 있다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+DEFAULT_TTL = 90 * 24 * 3600      # 초
+MAX_BYTES = 2 * 1024 ** 3         # 압축 후 전체 용량 상한
+COMPRESS_LEVEL = 6
+EVICT_GRACE = 300                 # 이보다 최근에 쓰인 객체는 인덱스에 없어도 지우지 않는다 (초)
+
+
+class ResponseCache:
+    def __init__(self, root: Path = CACHE_DIR, ttl: float = DEFAULT_TTL, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        (root / "objects").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(root / "index.sqlite")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_kind ON entries(kind)")
+        self.db.commit()
+        self._puts = 0
+
+    @staticmethod
+    def make_key(kind: str, params: dict) -> str:
+        raw = json.dumps([kind, sorted((k, str(v)) for k, v in params.items())], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.z"
+
+    # ── 저장 / 조회 ──
+
+    def put(self, kind: str, params: dict, body: str | bytes):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        try:
+            # 이미 있는 객체는 수정시각만 갱신한다 — 다른 샤드의 evict가 인덱스 커밋 전에 지우지 않도록
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(zlib.compress(data, COMPRESS_LEVEL))
+            tmp.replace(path)
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.make_key(kind, params), kind, json.dumps(params, ensure_ascii=False),
+             digest, path.stat().st_size, now, now),
+        )
+        self.db.commit()
+        self._puts += 1
+        if self._puts % 500 == 0:
+            self.evict()
+
+    def entries(self, kind: str):
+        """kind의 모든 캐시 항목을 (params, 본문 텍스트)로 순회한다. 재파싱용이라 TTL은 보지 않는다."""
+        rows = self.db.execute(
+            "SELECT params, digest FROM entries WHERE kind = ?", (kind,)
+        ).fetchall()
+        for params, digest in rows:
+            data = self._read(digest)
+            if data is not None:
+                yield json.loads(params), data.decode("utf-8")
+
+    def _read(self, digest: str) -> bytes | None:
+        path = self._object_path(digest)
+        if not path.exists():
+            return None
+        return zlib.decompress(path.read_bytes())
+
+    # ── 정리 ──
+
+    def evict(self):
+        """만료 항목을 지우고, 용량이 상한을 넘으면 오래 안 쓴 항목부터 지운다.
+        인덱스에 없는 객체 파일도 지우되, 정리 시작 EVICT_GRACE초 전 이후에 쓰인(또는 put이 다시 건드린) 객체는
+        다른 샤드 프로세스가 막 저장하고 아직 인덱스를 커밋하지 않았을 수 있으므로 남겨 둔다."""
+        cutoff = time.time() - EVICT_GRACE
+        self.db.execute("DELETE FROM entries WHERE stored_at < ?", (time.time() - self.ttl,))
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self.db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at"
+            ).fetchall():
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self.db.commit()
+
+        live = {d for (d,) in self.db.execute("SELECT DISTINCT digest FROM entries")}
+        for path in (self.root / "objects").glob("*/*.z"):
+            if path.stem in live:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,124 @@
+"""
+결과 CSV + 체크포인트 배치 기록기.
+행을 메모리에 모았다가 건수/시간 임계치에 도달하면 CSV 추가와
+체크포인트 갱신을 한 번에 커밋한다. 체크포인트에는 커밋 시점의
+CSV 바이트 오프셋이 함께 기록되므로, 재시작 시 그 이후에 쓰인
+(체크포인트에 반영되지 않은) 행은 잘라내어 결과와 체크포인트가
+어긋나지 않는다.
+"""
+import csv
+import io
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+BOM = "\ufeff".encode("utf-8")
+
+
+class ResultSink:
+    """CSV 행과 체크포인트 상태를 묶어서 원자적으로 커밋한다.
+
+    state: 커밋 시점의 체크포인트 내용(dict)을 돌려주는 함수.
+    batch_size / flush_interval: 이 중 하나라도 넘으면 커밋.
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        fieldnames: list[str],
+        checkpoint_path: Path,
+        state: Callable[[], dict],
+        batch_size: int = 50,
+        flush_interval: float = 10.0,
+    ):
+        self.csv_path = csv_path
+        self.fieldnames = fieldnames
+        self.checkpoint_path = checkpoint_path
+        self.state = state
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: list[dict] = []
+        self._dirty = False
+        self._last_commit = time.monotonic()
+
+    # ── 열기 / 복구 ──
+
+    def open(self, resume: bool):
+        """resume이면 CSV를 마지막 커밋 지점으로 되돌리고, 아니면 새로 만든다."""
+        if resume and self.csv_path.exists():
+            offset = self._committed_offset()
+            if offset is not None and self.csv_path.stat().st_size > offset:
+                with open(self.csv_path, "r+b") as f:
+                    f.truncate(offset)
+        else:
+            self.csv_path.write_bytes(b"")
+        if self.csv_path.stat().st_size == 0:
+            # BOM과 헤더는 파일 맨 앞에 한 번만 쓴다 (append 모드의 utf-8-sig 사용 금지)
+            with open(self.csv_path, "wb") as f:
+                f.write(BOM + self._encode([], header=True))
+                f.flush()
+                os.fsync(f.fileno())
+        self._last_commit = time.monotonic()
+        return self
+
+    def _committed_offset(self) -> int | None:
+        if not self.checkpoint_path.exists():
+            return None
+        data = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        return data.get("csv_offset")
+
+    # ── 기록 ──
+
+    def add(self, rows: list[dict]):
+        """행을 버퍼에 추가하고 진행 상태가 바뀌었음을 표시한다.
+        빈 리스트를 넘기면 행 없이 진행 상태만 갱신된다."""
+        self._rows.extend(rows)
+        self._dirty = True
+        if (
+            len(self._rows) >= self.batch_size
+            or time.monotonic() - self._last_commit >= self.flush_interval
+        ):
+            self.commit()
+
+    def commit(self):
+        """버퍼의 행을 CSV에 추가하고, 그 결과 오프셋과 함께 체크포인트를 교체한다."""
+        if not self._dirty:
+            return
+        with open(self.csv_path, "ab") as f:
+            if self._rows:
+                f.write(self._encode(self._rows))
+                f.flush()
+                os.fsync(f.fileno())
+            offset = f.tell()
+
+        state = dict(self.state())
+        state["csv_offset"] = offset
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+        self._rows.clear()
+        self._dirty = False
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        self.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _encode(self, rows: list[dict], header: bool = False) -> bytes:
+        buf = io.StringIO(newline="")
+        writer = csv.DictWriter(buf, fieldnames=self.fieldnames)
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buf.getvalue().encode("utf-8")
@@ -0,0 +1,144 @@
+"""
+크롤링 대기열 우선순위 스케줄러.
+metadata.csv 순서 대신 여러 우선순위 함수의 가중합으로 게시글 처리 순서를 정한다.
+
+  recency — 최신 게시글 먼저 (date 기준)
+  size    — 예상 첨부 크기가 작은 것 먼저 (캐시된 fileListData.do 응답 기준)
+  region  — 관심 지역(--prefer-sido / --prefer-sigungu) 게시글 먼저
+  retry   — 이전 실행에서 FAIL이었던 게시글은 재시도 횟수만큼 뒤로
+
+예상 크기가 LARGE_FILE_BYTES 이상인 게시글은 large 대기열로 보내, 큰 압축파일 하나가
+작은 파일들의 처리를 막지 않게 한다. 캐시된 응답이 없어 크기를 모르는 게시글은 small로
+섞지 않고 unknown 대기열에 둔다 (첫 크롤링에서는 대부분 여기에 들어간다).
+작업자는 자기 대기열 → unknown → 나머지 순으로 작업을 가져온다.
+우선순위 함수는 @priority("이름")으로 추가하고 PRIORITY_WEIGHTS에 가중치를 준다.
+"""
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable
+
+from config import MAX_RETRIES
+
+LARGE_FILE_BYTES = 20 * 2**20  # 이 이상이면 large 대기열
+SIZE_SCALE = 2 * 2**20         # size 점수가 0.5가 되는 예상 크기
+LANES = ("small", "unknown", "large")
+
+PRIORITY_WEIGHTS = {"recency": 1.0, "size": 1.0, "region": 2.0, "retry": 1.0}
+
+
+@dataclass
+class Context:
+    """우선순위 함수가 참고하는 대기열 전체 정보."""
+    sizes: dict[str, int] = field(default_factory=dict)       # seq → 예상 첨부 크기 합 (바이트)
+    region_seqs: set[str] = field(default_factory=set)       # 관심 지역 게시글
+    retries: dict[str, int] = field(default_factory=dict)    # seq → 지금까지 재시도 횟수
+    max_retries: int = MAX_RETRIES
+    oldest: int = 0                                          # date.toordinal() 범위
+    newest: int = 0
+
+
+PRIORITIES: dict[str, Callable[[dict, Context], float]] = {}
+
+
+def priority(name: str):
+    """item, context → 0~1 점수(클수록 먼저)를 내는 우선순위 함수를 등록한다."""
+    def register(func):
+        PRIORITIES[name] = func
+        return func
+    return register
+
+
+def date_ordinal(text: str) -> int | None:
+    try:
+        return date.fromisoformat((text or "").strip()[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+@priority("recency")
+def recency(item: dict, ctx: Context) -> float:
+    day = date_ordinal(item.get("date", ""))
+    if day is None or ctx.newest == ctx.oldest:
+        return 0.5
+    return (day - ctx.oldest) / (ctx.newest - ctx.oldest)
+
+
+@priority("size")
+def smaller_first(item: dict, ctx: Context) -> float:
+    size = ctx.sizes.get(item["seq"])
+    if size is None:
+        return 0.5
+    return 1 / (1 + size / SIZE_SCALE)
+
+
+@priority("region")
+def region(item: dict, ctx: Context) -> float:
+    return 1.0 if item["seq"] in ctx.region_seqs else 0.0
+
+
+@priority("retry")
+def fewer_retries(item: dict, ctx: Context) -> float:
+    return 1 - min(ctx.retries.get(item["seq"], 0), ctx.max_retries) / ctx.max_retries
+
+
+class Scheduler:
+    def __init__(
+        self,
+        items: list[dict],
+        sizes: dict[str, int] | None = None,
+        region_seqs: set[str] | None = None,
+        retries: dict[str, int] | None = None,
+        weights: dict[str, float] | None = None,
+    ):
+        days = [d for d in (date_ordinal(i.get("date", "")) for i in items) if d is not None]
+        self.ctx = Context(
+            sizes=sizes or {}, region_seqs=region_seqs or set(), retries=retries or {},
+            oldest=min(days, default=0), newest=max(days, default=0),
+        )
+        self.weights = PRIORITY_WEIGHTS if weights is None else weights
+        self.lanes: dict[str, list] = {lane: [] for lane in LANES}
+        for order, item in enumerate(items):
+            heapq.heappush(self.lanes[self.lane(item)], (-self.score(item), order, item))
+
+    def score(self, item: dict) -> float:
+        return sum(w * PRIORITIES[name](item, self.ctx) for name, w in self.weights.items() if w)
+
+    def lane(self, item: dict) -> str:
+        size = self.ctx.sizes.get(item["seq"])
+        if size is None:
+            return "unknown"
+        return "large" if size >= LARGE_FILE_BYTES else "small"
+
+    def next(self, lane: str = "small") -> dict | None:
+        """lane에서 가장 우선순위가 높은 게시글. 비어 있으면 unknown, 그다음 남은 대기열에서 가져오고, 모두 비면 None."""
+        for name in dict.fromkeys((lane, "unknown", *LANES)):
+            if self.lanes[name]:
+                return heapq.heappop(self.lanes[name])[2]
+        return None
+
+    def __len__(self):
+        return sum(len(q) for q in self.lanes.values())
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{lane} {len(q)}건" for lane, q in self.lanes.items())
+        known = sum(1 for q in self.lanes.values() for _, _, item in q if item["seq"] in self.ctx.sizes)
+        return f"    [스케줄] {counts} (예상 크기 확인 {known}건, 관심 지역 {len(self.ctx.region_seqs)}건)"
+
+
+class Pacer:
+    """여러 작업자가 공유하는 요청 간격 제한. 작업 시작 사이에 최소 interval초를 둔다."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
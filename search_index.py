@@ -0,0 +1,189 @@
+"""
+파싱 결과 전문 검색 인덱스 (SQLite FTS5, trigram 토크나이저).
+output/parsed/*.csv의 각 행(표 셀, OCR/HWP 텍스트 포함)을 한 문서로 색인한다.
+trigram은 띄어쓰기와 무관하게 한국어 부분 문자열을 찾을 수 있어 형태소 분석기가 필요 없다.
+trigram이 다루지 못하는 1~2글자 검색어('배관', '창호' 등)는 같은 행의 글자·두 글자 조각을 담은
+보조 FTS 테이블(grams, 내용 없이 색인만 저장)로 찾는다.
+파일의 수정시각/크기를 기록해 바뀐 파일만 다시 색인한다. 압축 저장본(.csv.zst/.csv.gz)도 원래 이름으로 색인한다.
+"""
+import csv
+import re
+import sqlite3
+from pathlib import Path
+
+import storage
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+PARSED_DIR = OUTPUT_DIR / "parsed"
+INDEX_DB = OUTPUT_DIR / "search.sqlite"
+
+META_COLUMNS = ("_seq", "_apt_name", "_title", "_date", "_file_name")
+
+WORD_RE = re.compile(r"[^\W_]+")        # unicode61 토크나이저가 한 토큰으로 보는 글자 연속 구간
+SHORT_TERM_RE = re.compile(r"[^\W_]{1,2}")
+
+
+def grams(text: str) -> str:
+    """행 텍스트의 서로 다른 한 글자·두 글자 조각을 공백으로 이은 문자열 (grams 테이블 색인용)."""
+    found = set()
+    for word in WORD_RE.findall(text or ""):
+        found.update(word)
+        found.update(word[i:i + 2] for i in range(len(word) - 1))
+    return " ".join(found)
+
+
+class SearchIndex:
+    def __init__(self, path: Path = INDEX_DB):
+        self.db = sqlite3.connect(path)
+        self.db.create_function("grams", 1, grams, deterministic=True)
+        has_grams = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'grams'"
+        ).fetchone() is not None
+        self.db.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+                content, seq UNINDEXED, apt_name UNINDEXED, file UNINDEXED, row_no UNINDEXED,
+                tokenize = 'trigram'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS grams USING fts5(
+                text, content = '', detail = 'none', tokenize = 'unicode61 remove_diacritics 0'
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                file TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                first_rowid INTEGER,
+                last_rowid INTEGER
+            );
+        """)
+        if not has_grams:
+            # grams 테이블이 생기기 전에 만든 색인이면 기존 행으로 채운다
+            self.db.execute("INSERT INTO grams (rowid, text) SELECT rowid, grams(content) FROM docs")
+            self.db.commit()
+
+    # ── 색인 ──
+
+    def index_csv(self, path: Path, force: bool = False) -> bool:
+        """파싱 CSV 하나를 (바뀌었으면) 다시 색인한다. 색인했으면 True."""
+        stat = path.stat()
+        name = storage.logical_path(path).name
+        row = self.db.execute(
+            "SELECT mtime, size FROM sources WHERE file = ?", (name,)
+        ).fetchone()
+        if row and not force and row == (stat.st_mtime, stat.st_size):
+            return False
+        self._remove(name)
+
+        with storage.open_text(path) as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            meta = {name: header.index(name) for name in META_COLUMNS if name in header}
+            body = [i for i, name in enumerate(header) if name not in META_COLUMNS]
+            docs = []
+            for row_no, cells in enumerate(reader, 1):
+                if row_no == 1:
+                    # 제목도 검색되도록 0번 행으로 넣는다
+                    docs.append(self._doc(cells, meta, name, 0, cells[meta["_title"]] if "_title" in meta else ""))
+                text = " ".join(cells[i] for i in body if i < len(cells) and cells[i])
+                if text:
+                    docs.append(self._doc(cells, meta, name, row_no, text))
+
+        first = last = None
+        if docs:
+            cur = self.db.executemany(
+                "INSERT INTO docs (content, seq, apt_name, file, row_no) VALUES (?, ?, ?, ?, ?)", docs
+            )
+            last = self.db.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first = last - cur.rowcount + 1
+            self.db.execute(
+                "INSERT INTO grams (rowid, text) SELECT rowid, grams(content) FROM docs WHERE rowid BETWEEN ? AND ?",
+                (first, last),
+            )
+        self.db.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+            (name, stat.st_mtime, stat.st_size, first, last),
+        )
+        self.db.commit()
+        return True
+
+    @staticmethod
+    def _doc(cells, meta, file_name, row_no, text):
+        def get(name):
+            i = meta.get(name)
+            return cells[i] if i is not None and i < len(cells) else ""
+        return (text, get("_seq"), get("_apt_name"), file_name, row_no)
+
+    def _remove(self, file_name: str):
+        row = self.db.execute(
+            "SELECT first_rowid, last_rowid FROM sources WHERE file = ?", (file_name,)
+        ).fetchone()
+        if row and row[0] is not None:
+            # 내용 없는 FTS 테이블은 색인했던 값을 다시 넘겨야 지울 수 있다
+            self.db.execute(
+                "INSERT INTO grams (grams, rowid, text) "
+                "SELECT 'delete', rowid, grams(content) FROM docs WHERE rowid BETWEEN ? AND ?",
+                row,
+            )
+            self.db.execute("DELETE FROM docs WHERE rowid BETWEEN ? AND ?", row)
+        self.db.execute("DELETE FROM sources WHERE file = ?", (file_name,))
+
+    def update(self, parsed_dir: Path = PARSED_DIR) -> int:
+        """parsed_dir 전체를 증분 색인한다. 새로/다시 색인한 파일 수를 반환."""
+        present = set()
+        changed = 0
+        names = {storage.logical_path(p).name for p in parsed_dir.glob("*.csv*")}
+        for name in sorted(n for n in names if n.endswith(".csv")):
+            present.add(name)
+            changed += self.index_csv(storage.resolve(parsed_dir / name))
+        for (name,) in self.db.execute("SELECT file FROM sources").fetchall():
+            if name not in present:
+                self._remove(name)
+        self.db.commit()
+        return changed
+
+    # ── 검색 ──
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """공백으로 나눈 모든 검색어를 포함하는 행을 찾아 파일 단위로 묶어 반환한다.
+        3글자 이상은 trigram 인덱스, 글자·숫자로만 된 1~2글자는 grams 인덱스로 찾는다.
+        기호가 섞인 짧은 검색어만 부분 문자열 검사(instr)로 거른다."""
+        terms = [t for t in query.split() if t]
+        long_terms = [t for t in terms if len(t) >= 3]
+        gram_terms = [t for t in terms if len(t) < 3 and SHORT_TERM_RE.fullmatch(t)]
+        short_terms = [t for t in terms if len(t) < 3 and not SHORT_TERM_RE.fullmatch(t)]
+        if not terms:
+            return []
+
+        def match(ts):
+            return " AND ".join('"' + t.replace('"', '""') + '"' for t in ts)
+
+        params = []
+        if long_terms:
+            sql = ("SELECT seq, apt_name, file, row_no, snippet(docs, 0, '[', ']', '…', 12) "
+                   "FROM docs WHERE docs MATCH ?")
+            params.append(match(long_terms))
+        else:
+            sql = "SELECT seq, apt_name, file, row_no, substr(content, 1, 80) FROM docs WHERE 1"
+        if gram_terms:
+            sql += " AND rowid IN (SELECT rowid FROM grams WHERE grams MATCH ?)"
+            params.append(match(gram_terms))
+        for t in short_terms:
+            sql += " AND instr(content, ?) > 0"
+            params.append(t)
+        if long_terms:
+            sql += " ORDER BY rank"
+
+        hits: dict[str, dict] = {}
+        for seq, apt_name, file_name, row_no, snippet in self.db.execute(sql, params):
+            hit = hits.get(file_name)
+            if hit is None:
+                if len(hits) >= limit:
+                    continue
+                hit = hits[file_name] = {
+                    "seq": seq, "apt_name": apt_name, "file": file_name,
+                    "rows": 0, "snippet": snippet,
+                }
+            hit["rows"] += 1
+        return list(hits.values())
+
+    def close(self):
+        self.db.close()
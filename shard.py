@@ -0,0 +1,97 @@
+"""
+샤드 분할 크롤링 지원.
+여러 프로세스(또는 호스트)가 `--shard i/N`으로 작업을 나눠 맡는다.
+  - 메타데이터 수집: 목록 페이지 범위를 N개의 연속 구간으로 분할
+  - 상세/다운로드: seq를 N으로 나눈 나머지로 분할 (신규 게시글이 추가돼도 배정이 바뀌지 않음)
+샤드별 결과는 output/shards/ 아래에 따로 쓰이고, merge 단계에서
+metadata.csv / result.csv 하나로 합쳐진다.
+"""
+import csv
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+SHARD_DIR = Path(__file__).parent / "output" / "shards"
+
+# 전체 샤드를 합친 초당 요청 상한. 샤드 수가 늘면 샤드별 딜레이가 늘어난다.
+GLOBAL_MAX_RPS = 2.0
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int  # 1부터 시작
+    count: int
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        """'2/4' 형식의 문자열을 Shard로 변환한다."""
+        m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text)
+        if not m:
+            raise ValueError(f"샤드 형식 오류: {text!r} (예: --shard 1/4)")
+        index, count = int(m.group(1)), int(m.group(2))
+        if not 1 <= index <= count:
+            raise ValueError(f"샤드 번호 범위 오류: {text!r} (1 ≤ i ≤ N)")
+        return cls(index, count)
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def owns_seq(self, seq) -> bool:
+        return int(seq) % self.count == self.index - 1
+
+    def page_range(self, first: int, last: int) -> range:
+        """[first, last] 페이지 구간 중 이 샤드가 맡을 연속 구간."""
+        total = last - first + 1
+        size, extra = divmod(total, self.count)
+        start = first + (self.index - 1) * size + min(self.index - 1, extra)
+        end = start + size + (1 if self.index <= extra else 0)
+        return range(start, end)
+
+    def path(self, path: Path) -> Path:
+        """샤드 전용 출력 경로 (예: output/shards/metadata.2of4.csv)."""
+        SHARD_DIR.mkdir(parents=True, exist_ok=True)
+        return SHARD_DIR / f"{path.stem}.{self.index}of{self.count}{path.suffix}"
+
+    def delay(self, base_delay: float) -> float:
+        """전역 요청 상한을 지키기 위한 샤드별 요청 간 딜레이."""
+        return max(base_delay, self.count / GLOBAL_MAX_RPS)
+
+
+def shard_paths(path: Path) -> list[Path]:
+    """path에 해당하는 샤드 출력 파일 목록."""
+    return sorted(SHARD_DIR.glob(f"{path.stem}.*of*{path.suffix}"))
+
+
+def read_rows(path: Path) -> list[dict]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def merge_csv(target: Path, fieldnames: list[str]) -> int:
+    """기존 target과 샤드 출력들을 seq 기준으로 합쳐 target을 교체한다.
+    같은 seq는 샤드 쪽(나중 결과)이 우선한다. 합쳐진 행 수를 반환."""
+    parts = shard_paths(target)
+    if not parts:
+        return 0
+
+    merged: dict[str, dict] = {}
+    for path in ([target] if target.exists() else []) + parts:
+        for row in read_rows(path):
+            merged[row["seq"]] = row
+
+    rows = sorted(merged.values(), key=lambda r: int(r["seq"]), reverse=True)
+    tmp = target.with_suffix(".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    tmp.replace(target)
+    return len(rows)
+
+
+def read_checkpoints(checkpoint: Path) -> list[dict]:
+    return [
+        json.loads(p.read_text(encoding="utf-8"))
+        for p in shard_paths(checkpoint)
+    ]
@@ -0,0 +1,45 @@
+"""
+정상 종료 처리.
+Ctrl+C / SIGTERM을 받으면 곧바로 죽지 않고 '중단 요청' 상태만 표시한다.
+작업 루프는 requested를 보고 새 작업을 더 가져오지 않고, 진행 중인 게시글·파일을
+마저 끝낸 뒤 결과와 체크포인트를 커밋하고 빠져나간다.
+같은 신호를 한 번 더 받으면 KeyboardInterrupt로 즉시 중단한다
+(이때도 받는 중인 파일은 .part로만 남고, 결과는 마지막 커밋 지점부터 이어진다).
+
+사용:
+    with GracefulShutdown() as stop:
+        for item in items:
+            if stop.requested:
+                break
+            ...
+"""
+import signal
+
+SIGNALS = tuple(getattr(signal, name) for name in ("SIGINT", "SIGTERM", "SIGBREAK") if hasattr(signal, name))
+
+
+class GracefulShutdown:
+    def __init__(self, signals: tuple = SIGNALS):
+        self.signals = signals
+        self.requested = False
+        self._previous = {}
+
+    def _handle(self, signum, frame):
+        if self.requested:
+            raise KeyboardInterrupt
+        self.requested = True
+        print(f"\n[중단 요청] {signal.Signals(signum).name} — 진행 중인 작업을 마무리하고 저장 후 종료합니다 "
+              f"(한 번 더 누르면 즉시 종료)")
+
+    def __enter__(self):
+        for sig in self.signals:
+            try:
+                self._previous[sig] = signal.signal(sig, self._handle)
+            except (ValueError, OSError):  # 메인 스레드가 아니거나 지원하지 않는 신호
+                pass
+        return self
+
+    def __exit__(self, *exc):
+        for sig, handler in self._previous.items():
+            signal.signal(sig, handler)
+        self._previous.clear()
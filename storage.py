@@ -0,0 +1,276 @@
+"""
+압축 저장소.
+downloads/와 output/parsed 등의 파일을 형식별 압축 수준으로 제자리 압축하고
+(zstandard가 있으면 .zst, 없으면 표준 라이브러리 gzip으로 .gz),
+디렉터리마다 .storage.json 매니페스트에 원본 크기·SHA-256·압축 방식을 기록한다.
+
+압축본은 원래 이름(확장자 앞부분)으로 찾을 수 있다 — resolve('1_1_a.pdf')는
+1_1_a.pdf가 없으면 1_1_a.pdf.zst / 1_1_a.pdf.gz를 돌려준다.
+파서는 open_blob(스트리밍 해제)로 순차 읽기하고, 임의 접근이 필요하면 seekable_source로 메모리 버퍼에
+풀어서 읽는다 (SPOOL_MAX_BYTES를 넘는 큰 파일만 임시 파일로 넘긴다). 경로가 꼭 필요한 곳은
+여러 프로세스가 같은 파일을 mmap으로 여는 PDF 배치 하나뿐이라, materialized는 그때만 쓴다.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성 — 없으면 gzip으로 대체
+    zstandard = None
+
+MANIFEST_NAME = ".storage.json"
+CODEC_SUFFIXES = {".zst": "zstd", ".gz": "gzip"}
+CHUNK = 1 << 20
+SPOOL_MAX_BYTES = 64 * 2**20  # 압축 해제본을 메모리에 두는 상한. 넘으면 임시 파일로
+
+# 확장자별 압축 수준 (zstd 기준 1~22, gzip은 최대 9로 잘라 씀). None이면 압축하지 않음
+COMPRESSION_LEVELS = {
+    ".pdf": 6, ".hwp": 9, ".doc": 9, ".ppt": 9, ".xls": 9,
+    ".txt": 9, ".csv": 9, ".bmp": 9, ".tif": 6, ".tiff": 6,
+    # 이미 압축된 형식
+    ".jpg": None, ".jpeg": None, ".png": None, ".gif": None,
+    ".zip": None, ".xlsx": None, ".docx": None, ".pptx": None, ".hwpx": None,
+}
+DEFAULT_LEVEL = 6
+MIN_SAVING = 0.05  # 이보다 적게 줄면 원본 유지
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard else "gzip"
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix.lower() in CODEC_SUFFIXES
+
+
+def logical_path(path: Path) -> Path:
+    """압축 확장자를 뗀 원래 경로 ('a.pdf.zst' → 'a.pdf')."""
+    return path.with_suffix("") if is_compressed(path) else path
+
+
+def resolve(path: Path) -> Path | None:
+    """원본이 있으면 원본, 없으면 압축본 경로. 둘 다 없으면 None."""
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in CODEC_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+# ── 읽기 ──
+
+def open_blob(path: Path):
+    """압축 여부와 관계없이 원본 바이트를 읽는 바이너리 스트림을 연다 (순차 읽기용)."""
+    path = Path(path)
+    codec = CODEC_SUFFIXES.get(path.suffix.lower())
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard 미설치 — .zst 파일을 읽을 수 없음")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def read_blob(path: Path) -> bytes:
+    with open_blob(path) as f:
+        return f.read()
+
+
+def seekable_source(path: Path):
+    """임의 접근이 필요한 파서(zip, OLE, PDF, 이미지)용 입력.
+    원본은 경로 그대로, 압축본은 풀어 쓴 메모리 버퍼. SpooledTemporaryFile이라 SPOOL_MAX_BYTES까지는
+    BytesIO로 메모리에만 있고, 그보다 큰 파일만 익명 임시 파일(닫히면 지워짐)로 넘어간다."""
+    path = Path(path)
+    if not is_compressed(path):
+        return path
+    buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with open_blob(path) as src:
+        shutil.copyfileobj(src, buf, CHUNK)
+    buf.seek(0)
+    return buf
+
+
+@contextmanager
+def materialized(path: Path, source=None):
+    """압축본을 경로가 있는 임시 파일로 풀어 주고, 끝나면 지운다. 원본은 경로 그대로.
+    여러 프로세스가 같은 파일을 mmap으로 열어야 하는 PDF 배치 전용 — 각 작업자가 다시 풀지 않게 한다.
+    이미 푼 source(seekable_source 결과)를 주면 다시 풀지 않고 그것을 옮겨 쓴다."""
+    path = Path(path)
+    if not is_compressed(path):
+        yield path
+        return
+    fd, name = tempfile.mkstemp(suffix=logical_path(path).suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if source is not None:
+                source.seek(0)
+                shutil.copyfileobj(source, out, CHUNK)
+            else:
+                with open_blob(path) as src:
+                    shutil.copyfileobj(src, out, CHUNK)
+        yield Path(name)
+    finally:
+        os.unlink(name)
+
+
+def open_text(path: Path, encoding: str = "utf-8-sig"):
+    """CSV 등 텍스트 파일을 (압축본이면 풀면서) 연다."""
+    return io.TextIOWrapper(open_blob(path), encoding=encoding, newline="")
+
+
+# ── 매니페스트 ──
+
+def load_manifest(root: Path) -> dict:
+    path = root / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+_manifest_cache: dict[Path, tuple[int, dict]] = {}
+
+
+def cached_manifest(root: Path) -> dict:
+    """읽기 전용 매니페스트. 파일 수정시각이 그대로면 다시 파싱하지 않는다."""
+    path = root / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _manifest_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, json.loads(path.read_text(encoding="utf-8")))
+        _manifest_cache[path] = cached
+    return cached[1]
+
+
+def save_manifest(root: Path, manifest: dict):
+    path = root / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(path)
+    _manifest_cache.pop(path, None)
+
+
+def original_size(path: Path) -> int | None:
+    """압축본이면 매니페스트에 기록된 원본 크기, 원본이면 파일 크기."""
+    path = Path(path)
+    if not is_compressed(path):
+        return path.stat().st_size
+    entry = cached_manifest(path.parent).get(logical_path(path).name)
+    return entry["size"] if entry else None
+
+
+def discard_compressed(path: Path):
+    """원본을 새로 쓴 뒤 남아 있는 예전 압축본과 매니페스트 항목을 지운다."""
+    path = Path(path)
+    removed = False
+    for suffix in CODEC_SUFFIXES:
+        stale = path.with_name(path.name + suffix)
+        if stale.exists():
+            stale.unlink()
+            removed = True
+    if removed:
+        manifest = load_manifest(path.parent)
+        if manifest.pop(path.name, None) is not None:
+            save_manifest(path.parent, manifest)
+
+
+# ── 압축 ──
+
+def level_for(path: Path, levels: dict | None = None) -> int | None:
+    levels = COMPRESSION_LEVELS if levels is None else levels
+    return levels.get(path.suffix.lower(), DEFAULT_LEVEL)
+
+
+def compress_file(path: Path, level: int, codec: str | None = None) -> tuple[Path, dict] | None:
+    """파일을 스트리밍으로 압축해 원본을 대체한다. 충분히 줄지 않으면 그대로 두고 None.
+    원본의 수정시각을 압축본에 옮겨 '파싱 결과가 원본보다 새로운가' 판단이 유지되게 한다."""
+    codec = codec or default_codec()
+    suffix = ".zst" if codec == "zstd" else ".gz"
+    target = path.with_name(path.name + suffix)
+    tmp = target.with_name(target.name + ".tmp")
+    st = path.stat()
+    h = hashlib.sha256()
+
+    with open(path, "rb") as src, open(tmp, "wb") as raw:
+        if codec == "zstd":
+            out = zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+        else:
+            out = gzip.GzipFile(filename=path.name, mode="wb", compresslevel=min(level, 9), fileobj=raw, mtime=0)
+        with out:
+            for chunk in iter(lambda: src.read(CHUNK), b""):
+                h.update(chunk)
+                out.write(chunk)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    stored_size = tmp.stat().st_size
+    if stored_size > st.st_size * (1 - MIN_SAVING):
+        tmp.unlink()
+        return None
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    tmp.replace(target)
+    path.unlink()
+    return target, {
+        "stored": target.name, "codec": codec, "level": level,
+        "size": st.st_size, "stored_size": stored_size, "sha256": h.hexdigest(),
+    }
+
+
+def compact(root: Path, levels: dict | None = None, codec: str | None = None) -> tuple[int, int]:
+    """root 바로 아래 파일을 형식별 수준으로 압축한다. (압축한 파일 수, 절약 바이트) 반환.
+    압축해도 줄지 않은 파일은 매니페스트에 원본 유지로 기록해 다음번에 다시 시도하지 않는다."""
+    if not root.exists():
+        return 0, 0
+    manifest = load_manifest(root)
+    count = saved = 0
+    for path in sorted(root.iterdir()):
+        name = path.name
+        if (not path.is_file() or is_compressed(path) or name.startswith(".")
+                or name.endswith((".tmp", ".part", ".crdownload")) or name == "manifest.json"):
+            continue
+        level = level_for(path, levels)
+        entry = manifest.get(name)
+        if level is None or (entry and entry.get("codec") is None and entry.get("size") == path.stat().st_size):
+            continue
+        result = compress_file(path, level, codec)
+        if result is None:
+            manifest[name] = {"stored": name, "codec": None, "size": path.stat().st_size}
+            continue
+        target, manifest[name] = result
+        count += 1
+        saved += manifest[name]["size"] - manifest[name]["stored_size"]
+        if count % 100 == 0:
+            save_manifest(root, manifest)
+    save_manifest(root, manifest)
+    return count, saved
+
+
+def verify(root: Path) -> list[str]:
+    """압축본을 풀어 매니페스트의 SHA-256과 비교한다. 불일치한 파일 이름 목록을 반환."""
+    bad = []
+    for name, entry in load_manifest(root).items():
+        if not entry.get("codec"):
+            continue
+        path = root / entry["stored"]
+        if not path.exists():
+            continue
+        h = hashlib.sha256()
+        with open_blob(path) as f:
+            for chunk in iter(lambda: f.read(CHUNK), b""):
+                h.update(chunk)
+        if h.hexdigest() != entry["sha256"]:
+            bad.append(name)
+    return bad
@@ -0,0 +1,212 @@
+"""
+지역/단지 단위 대상 선정.
+output/apt_mapping.csv(시도, 시군구, kaptCode)로 단지명 인덱스를 미리 만들어 두고,
+게시글 제목(및 이미 크롤링된 상세 본문에서 뽑은 단지명)을 매칭해
+--sido / --sigungu / --kapt-code 조건에 맞는 게시글만 골라낸다.
+
+제목만으로는 단지를 알 수 없는 게시글('장기수선계획서' 등)이 대부분이므로,
+result.csv의 apt_name과 kaptCode가 이미 붙어 있는 결과 CSV(incheon_metadata_result.csv 등)를
+함께 사용한다.
+
+같은 단지가 원본과 매년 '정기조정' 개정본을 반복해서 올리므로, latest_per_complex로
+단지별 최신 K건만 남길 수 있다 (예전 개정본은 필요할 때 --kapt-code로 따로 받는다).
+"""
+import csv
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from apt_matcher import extended_matcher
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+APT_MAPPING_CSV = OUTPUT_DIR / "apt_mapping.csv"
+ALL_METADATA_CSV = OUTPUT_DIR / "all_metadata.csv"
+METADATA_CSV = OUTPUT_DIR / "metadata.csv"
+RESULT_CSV = OUTPUT_DIR / "result.csv"
+INDEX_FILE = OUTPUT_DIR / "apt_index.json"
+KNOWN_CODE_CSVS = [OUTPUT_DIR / "incheon_metadata_result.csv"]  # seq ↔ kaptCode가 확인된 결과
+
+MIN_COVERAGE = 0.8  # 후보 이름의 bigram 중 단지명에 포함돼야 하는 비율
+
+# 단지명이 아닌 제목 상투어
+NOISE_RE = re.compile(
+    r"\d{2,4}\s*년도?|\d+월|\(.*?\)|\[.*?\]|장기\s*수선\s*(계획서?|충당금)?|정기\s*조정|수시\s*조정|"
+    r"계획서|계획|조정|수립|변경|검토|제출|공고|결과|동의서|접수|적립|사용현황|및|의|우리\s*단지|당\s*아파트"
+)
+
+
+def normalize_name(text: str) -> str:
+    """공백·기호·'아파트'를 없앤 비교용 이름."""
+    text = re.sub(r"[^\w가-힣]", "", text or "")
+    return re.sub(r"아파트$", "", text)
+
+
+def bigrams(text: str) -> set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+# ── 인덱스 ──
+
+def build_index() -> dict:
+    """apt_mapping.csv → {"complexes": {kaptCode: {...}}, "grams": {bigram: [kaptCode...]}}"""
+    complexes, grams = {}, defaultdict(set)
+    with open(APT_MAPPING_CSV, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            code = row["kaptCode"]
+            key = normalize_name(row["단지명"])
+            complexes[code] = {
+                "name": row["단지명"], "key": key,
+                "sido": row["시도"], "sigungu": row["시군구"],
+            }
+            for g in bigrams(key):
+                grams[g].add(code)
+    index = {"complexes": complexes, "grams": {g: sorted(c) for g, c in grams.items()}}
+    INDEX_FILE.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    return index
+
+
+def load_index() -> dict:
+    """미리 만든 인덱스를 읽는다. apt_mapping.csv가 더 새로우면 다시 만든다."""
+    if INDEX_FILE.exists() and INDEX_FILE.stat().st_mtime >= APT_MAPPING_CSV.stat().st_mtime:
+        return json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+    return build_index()
+
+
+def match_name(index: dict, text: str, target_coverage: float = 0.0) -> list[str]:
+    """text에 가장 잘 맞는 kaptCode 목록 (동점이면 여러 개, 없으면 빈 목록).
+    target_coverage를 주면 단지명 bigram 중 그 비율 이상이 text에도 있어야 한다 (짧은 후보 이름용)."""
+    key = normalize_name(NOISE_RE.sub(" ", text or ""))
+    cand = bigrams(key)
+    if len(key) < 2:
+        return []
+    hits = defaultdict(int)
+    for g in cand:
+        for code in index["grams"].get(g, ()):
+            hits[code] += 1
+
+    best, best_score = [], 0.0
+    for code, common in hits.items():
+        if common / len(cand) < MIN_COVERAGE:
+            continue
+        target = bigrams(index["complexes"][code]["key"])
+        if common / len(target) < target_coverage:
+            continue
+        score = common / len(cand) + common / len(target)
+        if score > best_score + 1e-9:
+            best, best_score = [code], score
+        elif abs(score - best_score) <= 1e-9:
+            best.append(code)
+    return best
+
+
+def load_known_codes() -> dict[str, str]:
+    """seq → kaptCode (이미 확인된 결과 CSV 기준)."""
+    known = {}
+    for path in KNOWN_CODE_CSVS:
+        if path.exists():
+            with open(path, "r", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    if row.get("kaptCode"):
+                        known[row["seq"]] = row["kaptCode"]
+    return known
+
+
+def load_apt_names() -> dict[str, str]:
+    """seq → 상세 본문에서 뽑은 단지명 (result.csv)."""
+    if not RESULT_CSV.exists():
+        return {}
+    with open(RESULT_CSV, "r", encoding="utf-8-sig") as f:
+        return {r["seq"]: r.get("apt_name", "") for r in csv.DictReader(f)}
+
+
+def annotate(rows: list[dict], index: dict | None = None) -> list[dict]:
+    """각 게시글에 kaptCode 후보 목록(`_codes`)을 붙인다.
+    제목 전체로 못 찾으면 제목에서 뽑은 단지명 후보(apt_mapping 브랜드 사전, 열 단위로 한 번에)로 찾되
+    '4단지' 같은 짧은 후보가 엉뚱한 단지에 붙지 않게 양쪽 모두 MIN_COVERAGE 이상 겹쳐야 한다.
+    그래도 없으면 상세 본문에서 뽑은 단지명으로 찾는다."""
+    index = index or load_index()
+    known = load_known_codes()
+    apt_names = load_apt_names()
+    title_candidates = extended_matcher().candidates_many(row.get("title", "") for row in rows)
+    for row, found in zip(rows, title_candidates):
+        seq = row["seq"]
+        if seq in known:
+            row["_codes"] = [known[seq]]
+            continue
+        codes = match_name(index, row.get("title", ""))
+        for _, _, name in found:
+            if codes:
+                break
+            codes = match_name(index, name, target_coverage=MIN_COVERAGE)
+        if not codes and apt_names.get(seq):
+            codes = match_name(index, apt_names[seq])
+        row["_codes"] = codes
+    return rows
+
+
+# ── 선택 ──
+
+def load_posts() -> list[dict]:
+    """전체 게시글 목록 (all_metadata.csv, 없으면 metadata.csv). 비공개 글 제외."""
+    path = ALL_METADATA_CSV if ALL_METADATA_CSV.exists() else METADATA_CSV
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return [r for r in csv.DictReader(f) if r.get("board_secret", "0") == "0"]
+
+
+def select_posts(
+    rows: list[dict],
+    sido: str | None = None,
+    sigungu: str | None = None,
+    kapt_codes: set[str] | None = None,
+) -> list[dict]:
+    """조건에 맞는 게시글만 반환한다. 후보가 여러 단지면 모두 조건을 만족할 때만 선택."""
+    index = load_index()
+    complexes = index["complexes"]
+
+    def ok(code: str) -> bool:
+        c = complexes.get(code)
+        if c is None:
+            return False
+        if kapt_codes and code not in kapt_codes:
+            return False
+        if sido and not c["sido"].startswith(sido):
+            return False
+        if sigungu and not c["sigungu"].startswith(sigungu):
+            return False
+        return True
+
+    selected = []
+    for row in annotate(rows, index):
+        codes = row["_codes"]
+        if codes and all(ok(c) for c in codes):
+            if len(codes) == 1:
+                row["kaptCode"] = codes[0]
+            selected.append(row)
+    return selected
+
+
+def revision_key(row: dict) -> tuple:
+    """최신순 정렬 키 (날짜, seq)."""
+    seq = row.get("seq", "")
+    return row.get("date", ""), int(seq) if seq.isdigit() else 0
+
+
+def latest_per_complex(rows: list[dict], keep: int = 1) -> list[dict]:
+    """annotate/select_posts를 거친 게시글을 단지별로 묶어 최신 keep건만 남긴다.
+    후보가 여러 단지인 게시글은 같은 후보 집합끼리 묶고, 단지를 알 수 없는 게시글은 묶지 않고 모두 남긴다.
+    원래 순서를 유지해 반환한다."""
+    groups = defaultdict(list)
+    kept = set()
+    for i, row in enumerate(rows):
+        codes = row.get("_codes") or ([row["kaptCode"]] if row.get("kaptCode") else [])
+        if codes:
+            groups[tuple(sorted(codes))].append(i)
+        else:
+            kept.add(i)
+    for members in groups.values():
+        members.sort(key=lambda i: revision_key(rows[i]), reverse=True)
+        kept.update(members[:keep])
+    return [row for i, row in enumerate(rows) if i in kept]
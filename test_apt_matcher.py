@@ -0,0 +1,80 @@
+"""단지명 추출기 테스트 — apt_mapping.csv 브랜드 사전과 열 단위 추출"""
+import csv
+import tempfile
+from pathlib import Path
+
+from apt_matcher import AptMatcher, default_matcher, mapping_keywords
+
+MAPPING_ROWS = [
+    # (단지명, 시도, 시군구, 동리)
+    ("청라호반베르디움 1차 아파트", "인천광역시", "서구", "청라동"),
+    ("송도호반베르디움", "인천광역시", "연수구", "송도동"),
+    ("당하힐스테이트", "인천광역시", "서구", "당하동"),
+    ("논현힐스테이트", "인천광역시", "남동구", "논현동"),
+    ("만수 주공1단지 아파트", "인천광역시", "남동구", "만수동"),
+    ("만수주공2단지", "인천광역시", "남동구", "만수동"),
+    ("옥련현대", "인천광역시", "연수구", "옥련동"),
+    ("부평현대", "인천광역시", "부평구", "부평동"),
+    ("갈산 A 아파트", "인천광역시", "부평구", "갈산동"),
+    ("갈산 A 2차", "인천광역시", "부평구", "갈산동"),
+]
+
+
+def write_mapping(root: Path) -> Path:
+    path = root / "apt_mapping.csv"
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        w = csv.writer(f)
+        w.writerow(["단지명", "주소", "전화번호", "세대수", "시도", "시군구", "동리", "kaptCode"])
+        for i, (name, sido, sigungu, dong) in enumerate(MAPPING_ROWS):
+            w.writerow([name, "", "", "", sido, sigungu, dong, f"A{i:08d}"])
+    return path
+
+
+def extended(root: Path) -> AptMatcher:
+    return AptMatcher(brands=mapping_keywords(write_mapping(root)))
+
+
+def test_mapping_keywords_filter():
+    with tempfile.TemporaryDirectory() as tmp:
+        words = mapping_keywords(write_mapping(Path(tmp)))
+    assert "호반베르디움" in words       # 지명 어간(청라, 송도)을 뗀 브랜드
+    assert "힐스테이트" in words
+    assert "현대" in words
+    assert "주공" not in words           # 상투어
+    assert "만수" not in words and "갈산" not in words  # 지명
+    assert all(len(w) >= 2 for w in words)  # 'A' 같은 한 글자 제외
+
+
+def test_mapping_brands_only_in_extended():
+    with tempfile.TemporaryDirectory() as tmp:
+        matcher = extended(Path(tmp))
+    title = "호반베르디움 스테이원 장기수선계획서"
+    assert default_matcher().first(title) is None
+    assert matcher.first(title) == "호반베르디움"
+    assert matcher.first("중앙동 힐스테이트 1차 장기수선계획") == "힐스테이트"
+    assert matcher.first("송천현대2차 장기수선계획") == "송천현대2차"
+
+
+def test_short_brand_needs_prefix():
+    with tempfile.TemporaryDirectory() as tmp:
+        matcher = extended(Path(tmp))
+    assert matcher.first("현대화 공사 장기수선계획") is None
+    assert matcher.first("옥련현대 장기수선계획") == "옥련현대"
+
+
+def test_many_matches_single():
+    with tempfile.TemporaryDirectory() as tmp:
+        matcher = extended(Path(tmp))
+    titles = ["호반베르디움 장기수선계획", "", None, "래미안 아파트", "현대화", "정기조정 송도자이 2단지"]
+    contents = ["", "본문 당하힐스테이트 관리사무소", "", "", "", ""]
+    texts = [t or "" for t in titles]
+    assert matcher.candidates_many(titles) == [matcher.candidates(t) for t in texts]
+    assert matcher.extract_many(titles, contents) == [matcher.extract(t, c) for t, c in zip(texts, contents)]
+    assert matcher.extract_many(["현대화"], default="") == [""]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"[통과] {name}")
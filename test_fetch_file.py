@@ -0,0 +1,147 @@
+"""첨부파일 검증·이어받기 테스트 — 가짜 서버/페이지로 crawler의 다운로드 판정을 확인"""
+import asyncio
+import http.server
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import crawler
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: bytes, headers: dict | None = None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+
+    async def body(self):
+        return self._body
+
+
+class FakeRequest:
+    """getFileDownload.do 흉내. Range 요청에는 206, 그 밖에는 전체 본문."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.calls = []
+
+    async def get(self, url, headers=None):
+        self.calls.append(headers)
+        if headers and "Range" in headers:
+            start = int(headers["Range"].split("=")[1].rstrip("-"))
+            total = len(self.content)
+            return FakeResponse(206, self.content[start:], {"content-range": f"bytes {start}-{total - 1}/{total}"})
+        return FakeResponse(200, self.content)
+
+
+class FakePage:
+    def __init__(self, content: bytes):
+        self.request = FakeRequest(content)
+
+
+def run_fetch(root: Path, page: FakePage, f: dict, manifest: dict, browser_body: bytes | None):
+    """download_via_browser를 browser_body를 쓰는 함수로 바꿔 fetch_file을 돌린다."""
+    async def fake_browser(page, dest, bseq, fseq):
+        if browser_body is None:
+            raise RuntimeError("다운로드 이벤트 없음")
+        dest.write_bytes(browser_body)
+
+    saved = crawler.DOWNLOAD_DIR, crawler.download_via_browser
+    crawler.DOWNLOAD_DIR, crawler.download_via_browser = root, fake_browser
+    try:
+        return asyncio.run(crawler.fetch_file(page, f, "1", manifest))
+    finally:
+        crawler.DOWNLOAD_DIR, crawler.download_via_browser = saved
+
+
+def file_item(content: bytes) -> dict:
+    return {"seq": 1, "boardSeq": 10, "fileName": "계획서.pdf", "fileSize": str(len(content))}
+
+
+def test_check_local_states():
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = Path(tmp) / "10_1_a.pdf"
+        dest.write_bytes(b"x" * 100)
+        manifest = {}
+        assert crawler.check_local(dest, 150, manifest) == "partial"  # 검증 기록 없는 잘린 파일
+        crawler.record_file(manifest, dest)
+        assert crawler.check_local(dest, 100, manifest) == "complete"
+        assert crawler.check_local(dest, 150, manifest) == "stale"    # 서버에 더 큰 파일이 다시 올라옴
+        dest.write_bytes(b"y" * 90)
+        assert crawler.check_local(dest, 150, manifest) == "stale"    # 기록과 다른 파일
+
+
+def test_reuploaded_file_is_not_resumed():
+    old, new = b"old-" * 25, b"new-" * 40
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        f = file_item(new)
+        dest = crawler.file_dest({**f}, "1").name
+        (root / dest).write_bytes(old)
+        manifest = {}
+        crawler.record_file(manifest, root / dest)
+        page = FakePage(new)
+        path = run_fetch(root, page, f, manifest, browser_body=new)
+        assert path.read_bytes() == new
+        assert not any(h and "Range" in h for h in page.request.calls)
+        assert manifest[dest]["size"] == len(new)
+
+
+def test_short_browser_download_falls_back_to_direct_url():
+    content = bytes(range(256)) * 8
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        page = FakePage(content)
+        path = run_fetch(root, page, file_item(content), {}, browser_body=b"other" * 10)
+        assert path.read_bytes() == content
+        assert page.request.calls == [None]  # Range로 이어 붙이지 않고 처음부터 한 번
+        assert not list(root.glob("*.part"))
+
+
+def test_part_file_is_resumed():
+    content = bytes(range(256)) * 8
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        f = file_item(content)
+        (root / (crawler.file_dest(f, "1").name + ".part")).write_bytes(content[:300])
+        page = FakePage(content)
+        path = run_fetch(root, page, f, {}, browser_body=None)
+        assert path.read_bytes() == content
+        assert page.request.calls == [{"Range": "bytes=300-"}]
+
+
+def test_probe_range_ignored_reads_headers_only():
+    size = 50 * 2**20
+    release = threading.Event()
+
+    class IgnoresRange(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            # Range를 무시하고 200 + 전체 크기를 보낸 뒤, 본문은 조금만 쓰고 멈춘다
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            self.wfile.write(b"\0" * 1024)
+            self.wfile.flush()
+            release.wait(10)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), IgnoresRange)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        t0 = time.monotonic()
+        url = f"http://127.0.0.1:{server.server_port}/board/getFileDownload.do"
+        assert crawler.probe_range(url, {}, timeout=5) == size
+        assert time.monotonic() - t0 < 3  # 본문을 기다리지 않았다
+    finally:
+        release.set()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"[통과] {name}")
@@ -0,0 +1,37 @@
+"""비용표 정규화 테스트 — 구분 열 처리"""
+import pandas as pd
+
+from normalize import normalize_table
+
+
+def test_numeric_section_column_is_not_a_value():
+    df = pd.DataFrame([
+        ["구분", "공종", "수선방법", "수선주기", "2025", "2026"],
+        [1, "외벽 도장", "전면도장", "5", "10,000,000", ""],
+        [1, "옥상 방수", "부분보수", "10", "", "3,000,000"],
+        [2, "승강기", "전면교체", "15", "20,000,000", ""],
+    ])
+    out = normalize_table(df)
+    assert "구분" not in set(out["column"])
+    assert set(out["column"]) == {"2025", "2026"}
+    assert list(out["section"]) == ["1", "1", "2"]
+    assert list(out["item"]) == ["외벽 도장", "옥상 방수", "승강기"]
+
+
+def test_section_text_column_and_repeated_header():
+    df = pd.DataFrame([
+        ["구분", "공종", "수선방법", "2025"],
+        ["1. 건축", "외벽 도장", "전면도장", "10,000,000"],
+        ["구분", "공종", "수선방법", "2025"],  # 다음 쪽에서 반복된 헤더
+        ["2. 전기", "승강기", "전면교체", "20,000,000"],
+    ])
+    out = normalize_table(df)
+    assert list(out["section"]) == ["1. 건축", "2. 전기"]
+    assert list(out["value"]) == [10_000_000.0, 20_000_000.0]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"[통과] {name}")
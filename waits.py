@@ -0,0 +1,49 @@
+"""
+이벤트 기반 페이지 대기 헬퍼.
+networkidle + 고정 wait_for_timeout 대신, 각 단계에 필요한 신호
+(목록 selector, fileListData.do 응답, 다운로드 이벤트)가 도착하는 즉시 진행한다.
+timeout은 상한으로만 쓴다.
+"""
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+LIST_READY = "ul.boardList"       # 목록 페이지 렌더링 완료 신호
+BOOT_READY = "div.pagination"     # 최초 접속 시 세션/페이지네이션 확보 신호
+NAV_TIMEOUT = 15000               # 페이지 이동 상한 (ms)
+RESPONSE_TIMEOUT = 15000          # 특정 응답 대기 상한 (ms)
+
+
+async def goto(page, url: str, ready_selector: str | None = None, timeout: int = NAV_TIMEOUT):
+    """URL로 이동해 DOM이 만들어지고 ready_selector가 붙으면 바로 반환한다."""
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    if ready_selector:
+        await page.wait_for_selector(ready_selector, state="attached", timeout=timeout)
+
+
+async def submit(page, script: str, ready_selector: str | None = None, timeout: int = NAV_TIMEOUT):
+    """폼 submit 스크립트를 실행하고 새 문서의 ready_selector가 붙을 때까지 기다린다."""
+    async with page.expect_navigation(wait_until="domcontentloaded", timeout=timeout):
+        await page.evaluate(script)
+    if ready_selector:
+        await page.wait_for_selector(ready_selector, state="attached", timeout=timeout)
+
+
+async def submit_for_json(
+    page, script: str, url_part: str,
+    timeout: int = RESPONSE_TIMEOUT, nav_timeout: int = NAV_TIMEOUT,
+):
+    """폼 submit으로 이동하면서 URL에 url_part가 포함된 응답이 오는 즉시 JSON을 반환한다.
+    이동 자체는 성공했지만 상한 시간 안에 응답이 없으면 None."""
+    navigated = False
+    try:
+        async with page.expect_response(lambda r: url_part in r.url, timeout=timeout) as info:
+            await submit(page, script, timeout=nav_timeout)
+            navigated = True
+        response = await info.value
+        return await response.json()
+    except PlaywrightTimeoutError:
+        if not navigated:
+            raise
+        return None
+    except ValueError:
+        # JSON이 아닌 응답
+        return None
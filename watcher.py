@@ -0,0 +1,111 @@
+"""
+downloads/ 감시기.
+watchdog(inotify 등 OS 파일 이벤트)이 설치돼 있으면 이벤트로, 없으면 주기적인
+디렉터리 스캔으로 새로 생기거나 바뀐 파일을 찾는다. 크기와 수정시각이
+DEBOUNCE초 동안 그대로인 파일만 '다운로드 완료'로 보고 돌려준다.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+DEBOUNCE = 3.0        # 이 시간 동안 크기/수정시각이 변하지 않아야 완료로 판단 (초)
+SCAN_INTERVAL = 2.0   # watchdog이 없을 때 디렉터리 스캔 주기 (초)
+IGNORED_SUFFIXES = (".tmp", ".part", ".crdownload")
+
+
+class DownloadWatcher:
+    def __init__(self, root: Path, accept=None, debounce: float = DEBOUNCE, scan_interval: float = SCAN_INTERVAL):
+        """accept(path) -> bool 로 감시 대상 파일을 거른다."""
+        self.root = root
+        self.accept = accept or (lambda path: True)
+        self.debounce = debounce
+        self.scan_interval = scan_interval
+        self._pending: dict[Path, tuple] = {}   # path → (size, mtime, 마지막 변화 시각)
+        self._emitted: dict[Path, tuple] = {}   # path → 완료로 내보낸 시점의 (size, mtime)
+        self._dirty: set[Path] = set()
+        self._lock = threading.Lock()
+        self._observer = None
+        self._last_scan = 0.0
+
+    def start(self):
+        """기존 파일을 한 번 훑고, 가능하면 파일 시스템 이벤트 감시를 시작한다."""
+        self._scan()
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            print(f"    [감시] watchdog 미설치 — {self.scan_interval:.0f}초 주기 스캔으로 대체")
+            return self
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for attr in ("src_path", "dest_path"):
+                    path = getattr(event, attr, None)
+                    if path:
+                        watcher._mark(Path(os.fsdecode(path)))
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), str(self.root), recursive=False)
+        self._observer.start()
+        return self
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+
+    def _mark(self, path: Path):
+        if path.suffix.lower() in IGNORED_SUFFIXES or not self.accept(path):
+            return
+        with self._lock:
+            self._dirty.add(path)
+
+    def _scan(self):
+        self._last_scan = time.monotonic()
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file():
+                    self._mark(Path(entry.path))
+
+    def poll(self) -> list[Path]:
+        """쓰기가 끝난(디바운스가 지난) 파일 목록을 반환한다."""
+        if self._observer is None and time.monotonic() - self._last_scan >= self.scan_interval:
+            self._scan()
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+
+        now = time.monotonic()
+        for path in dirty:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                self._pending.pop(path, None)
+                continue
+            if self._emitted.get(path) == (st.st_size, st.st_mtime_ns):
+                continue
+            prev = self._pending.get(path)
+            if prev is None or prev[:2] != (st.st_size, st.st_mtime_ns):
+                self._pending[path] = (st.st_size, st.st_mtime_ns, now)
+
+        ready = []
+        for path, (size, mtime, changed_at) in list(self._pending.items()):
+            if now - changed_at < self.debounce:
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                self._pending[path] = (st.st_size, st.st_mtime_ns, now)
+                continue
+            del self._pending[path]
+            self._emitted[path] = (size, mtime)
+            if size > 0:
+                ready.append(path)
+        return ready